@@ -28,14 +28,15 @@ class JdgProbe(JolokiaProbe):
     accessible via DMR in JDG 6.5.
     """
 
-    def __init__(self):
+    def __init__(self, target = None):
         super(JdgProbe, self).__init__(
             [
                 CacheStatusTest(),
                 JoinStatusTest(),
                 StateTransferStateTest(),
                 CacheManagerTest()
-            ]
+            ],
+            target
         )
 
 __nameGrabber = re.compile(r'.*name="([^"]*)"')
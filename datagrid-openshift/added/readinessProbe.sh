@@ -3,6 +3,7 @@
 OUTPUT=/tmp/readiness-output
 ERROR=/tmp/readiness-error
 LOG=/tmp/readiness-log
+HISTORY=/tmp/readiness-history
 
 COUNT=30
 SLEEP=1
@@ -25,11 +26,22 @@ if [ $# -gt 3 ] ; then
     PROBE_IMPL=$4
 fi
 
+# gate the readiness on stable cluster views, unless the probes are passed as argument
+if [ -n "$PROBE_CLUSTER_VIEW_STABLE_SECONDS" ] && [ $# -lt 4 ]; then
+    PROBE_IMPL="$PROBE_IMPL probe.jgroups.ClusterViewProbe"
+fi
+
+# results of the probe runs, reported by probes/probehistory.py
+HISTORY_OPTIONS="--history $HISTORY"
+if [ -n "$PROBE_READINESS_HYSTERESIS" ]; then
+    HISTORY_OPTIONS="$HISTORY_OPTIONS --hysteresis $PROBE_READINESS_HYSTERESIS"
+fi
+
 if [ "$DEBUG" = "true" ]; then
     DEBUG_OPTIONS="--debug --logfile $LOG --loglevel DEBUG"
 fi
 
-if python $JBOSS_HOME/bin/probes/runner.py -c READY --maxruns $COUNT --sleep $SLEEP $DEBUG_OPTIONS $PROBE_IMPL; then
+if python $JBOSS_HOME/bin/probes/runner.py -c READY --maxruns $COUNT --sleep $SLEEP $DEBUG_OPTIONS $HISTORY_OPTIONS $PROBE_IMPL; then
     exit 0
 fi
 exit 1
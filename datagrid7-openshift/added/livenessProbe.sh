@@ -8,6 +8,7 @@ fi
 OUTPUT=/tmp/liveness-output
 ERROR=/tmp/liveness-error
 LOG=/tmp/liveness-log
+HISTORY=/tmp/liveness-history
 
 # liveness failure before management interface is up will cause the probe to fail
 COUNT=30
@@ -31,11 +32,22 @@ if [ $# -gt 3 ] ; then
     PROBE_IMPL=$4
 fi
 
+# results of the probe runs, reported by probes/probehistory.py
+HISTORY_OPTIONS="--history $HISTORY"
+
 if [ "$DEBUG_SCRIPT" = "true" ]; then
     DEBUG_OPTIONS="--debug --logfile $LOG --loglevel DEBUG"
 fi
 
-if python $JBOSS_HOME/bin/probes/runner.py -c READY -c NOT_READY --maxruns $COUNT --sleep $SLEEP $DEBUG_OPTIONS $PROBE_IMPL; then
+if [ "${PROBE_DISABLE_HOT_THREADS,,}" != "true" ]; then
+    HOT_THREADS_OPTIONS="--hotthreads /tmp/liveness-hot-threads.json"
+fi
+
+# the probe finishes and captures the hot threads within the deadline, e.g. the
+# timeoutSeconds of the liveness probe
+DEADLINE_OPTIONS="--deadline ${PROBE_LIVENESS_DEADLINE:-$((COUNT * SLEEP))}"
+
+if python $JBOSS_HOME/bin/probes/runner.py -c READY -c NOT_READY --maxruns $COUNT --sleep $SLEEP $DEBUG_OPTIONS $HISTORY_OPTIONS $HOT_THREADS_OPTIONS $DEADLINE_OPTIONS $PROBE_IMPL; then
     exit 0
 fi
 
@@ -9,6 +9,8 @@ fi
 JAVA_MAX_MEM_RATIO=${JAVA_MAX_MEM_RATIO:-$(echo "${CONTAINER_HEAP_PERCENT:-0.5}" "100" | awk '{ printf "%d", $1 * $2 }')}
 JAVA_INITIAL_MEM_RATIO=${JAVA_INITIAL_MEM_RATIO:-${INITIAL_HEAP_PERCENT:+$(echo "${INITIAL_HEAP_PERCENT}" "100" | awk '{ printf "%d", $1 * $2 }')}}
 
+source "${BASH_SOURCE[0]%/*}/jvm-capabilities.sh"
+
 function source_java_run_scripts() {
     local java_scripts_dir="/opt/run-java"
     # set CONTAINER_MAX_MEMORY and CONTAINER_CORE_LIMIT
@@ -56,9 +58,11 @@ adjust_java_heap_settings() {
 # implementations of java-default-options for each version of the jvm (e.g. a
 # private implementation that is sourced by java-default-options based on the
 # jvm version).  This would allow for the defaults to be tuned for the version
-# of the jvm being used.
+# of the jvm being used.  The version is detected when the image is built, see
+# jvm-capabilities.sh.
 unsupported_options() {
-    if [[ $($JAVA_HOME/bin/java -version 2>&1 | awk -F "\"" '/version/{ print $2}') == *"1.7"* ]]; then
+    load_jvm_capabilities
+    if [[ "${JVM_VERSION}" == *"1.7"* ]]; then
         echo "(-XX:NativeMemoryTracking=[^ ]*|-XX:+PrintGCDateStamps|-XX:+UnlockDiagnosticVMOptions|-XX:CICompilerCount=[^ ]*|-XX:GCTimeRatio=[^ ]*|-XX:MaxMetaspaceSize=[^ ]*|-XX:AdaptiveSizePolicyWeight=[^ ]*)"
     else
         echo "(--XX:MaxPermSize=[^ ]*)"
@@ -74,11 +78,12 @@ adjust_java_options() {
     # if they're already specified
     JAVA_OPTS="$(echo $JAVA_OPTS| sed -re 's/(-Xmx[^ ]*|-Xms[^ ]*)//g')"
     local java_options=$(source "${java_scripts_dir}/java-default-options")
+    load_jvm_capabilities
     local unsupported="$(unsupported_options)"
     for option in $java_options; do
         if [[ ${option} == "-Xmx"* ]]; then
-            if [[ "$options" == *"-Xmx"* ]]; then
-                options=$(echo $options | sed -e "s/-Xmx[^ ]*/${option}/")
+            if [[ "$options" =~ -Xmx[^\ ]* ]]; then
+                options="${options/"${BASH_REMATCH[0]}"/${option}}"
             else
                 options="${options} ${option}"
             fi
@@ -86,14 +91,17 @@ adjust_java_options() {
                 remove_xms=1
             fi
         elif [[ ${option} == "-Xms"* ]]; then
-            if [[ "$options" == *"-Xms"* ]]; then
-                options=$(echo $options | sed -e "s/-Xms[^ ]*/${option}/")
+            if [[ "$options" =~ -Xms[^\ ]* ]]; then
+                options="${options/"${BASH_REMATCH[0]}"/${option}}"
             else
                 options="${options} ${option}"
             fi
             remove_xms=0
-        elif $(echo "$options" | grep -Eq -- "${option%=*}(=[^ ]*)?(\s|$)") ; then
-            options=$(echo $options | sed -re "s@${option%=*}(=[^ ]*)?(\s|$)@${option}\2@")
+        elif [[ ${option} == "-XX:"* ]] && ! is_jvm_option_supported "${option}"; then
+            # not supported by the jvm, e.g. removed by a later version
+            continue
+        elif [[ "$options" =~ ${option%=*}(=[^\ ]*)?([[:space:]]|$) ]]; then
+            options="${options/"${BASH_REMATCH[0]}"/${option}${BASH_REMATCH[2]}}"
         else
             options="${options} ${option}"
         fi
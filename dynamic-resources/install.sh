@@ -6,7 +6,13 @@ SCRIPT_DIR=$(dirname $0)
 usermod -g root -G jboss jboss
 
 mkdir -p /usr/local/dynamic-resources
-cp -p $SCRIPT_DIR/dynamic_resources.sh /usr/local/dynamic-resources/
+cp -p $SCRIPT_DIR/dynamic_resources.sh $SCRIPT_DIR/jvm-capabilities.sh /usr/local/dynamic-resources/
+
+# detect the jvm once, instead of at every start of the container
+source /usr/local/dynamic-resources/jvm-capabilities.sh
+if [ -x "$JAVA_HOME/bin/java" ]; then
+  detect_jvm_capabilities || echo "Unable to detect the capabilities of $JAVA_HOME/bin/java, they will be detected at runtime"
+fi
 
 chown -R jboss:root /usr/local/dynamic-resources/
 chmod -R g+rwX $dir /usr/local/dynamic-resources/
@@ -0,0 +1,59 @@
+#!/bin/sh
+# Capabilities of the JVM (version and the supported -XX flags) detected when the
+# image is built, so that the options can be adjusted without starting the JVM
+# when the container starts. The detection is repeated only when $JAVA_HOME/bin/java
+# is not the binary which was detected (e.g. JAVA_HOME or java alternatives changed).
+
+JVM_CAPABILITIES_FILE=${JVM_CAPABILITIES_FILE:-/usr/local/dynamic-resources/jvm-capabilities}
+
+# Detects the capabilities of $JAVA_HOME/bin/java with a single start of the JVM
+# and writes them to JVM_CAPABILITIES_FILE, if writable
+function detect_jvm_capabilities() {
+    local java="$JAVA_HOME/bin/java"
+    local flags_file=$(mktemp)
+    local version_output
+
+    # -version prints to the stderr, the flags are printed to the stdout
+    version_output=$($java -XX:+UnlockDiagnosticVMOptions -XX:+UnlockExperimentalVMOptions -XX:+PrintFlagsFinal -version 2>&1 >"$flags_file")
+    if [ $? -ne 0 ]; then
+        # unknown flags, the supported flags are not checked
+        version_output=$($java -version 2>&1)
+        : > "$flags_file"
+    fi
+
+    JVM_CAPABILITIES_JAVA="$(readlink -f "$java")"
+    JVM_VERSION="$(echo "$version_output" | awk -F "\"" '/version/{ print $2}')"
+    JVM_FLAGS="$(awk '/=/{ printf " %s", $2 } END { printf " " }' "$flags_file")"
+    rm -f "$flags_file"
+
+    if [ -z "$JVM_VERSION" ]; then
+        return 1
+    fi
+    if [ -w "$(dirname "$JVM_CAPABILITIES_FILE")" ]; then
+        declare -p JVM_CAPABILITIES_JAVA JVM_VERSION JVM_FLAGS | sed -e 's/^declare -- /declare -g /' > "$JVM_CAPABILITIES_FILE.$$" \
+            && mv "$JVM_CAPABILITIES_FILE.$$" "$JVM_CAPABILITIES_FILE"
+    fi
+}
+
+# Sets JVM_VERSION and JVM_FLAGS, the detected flags are separated and surrounded by spaces
+function load_jvm_capabilities() {
+    if [ -n "$JVM_CAPABILITIES_JAVA" ] && [ "$JAVA_HOME/bin/java" -ef "$JVM_CAPABILITIES_JAVA" ]; then
+        return
+    fi
+    if [ -r "$JVM_CAPABILITIES_FILE" ]; then
+        source "$JVM_CAPABILITIES_FILE"
+        if [ "$JAVA_HOME/bin/java" -ef "$JVM_CAPABILITIES_JAVA" ]; then
+            return
+        fi
+    fi
+    detect_jvm_capabilities
+}
+
+# Returns 0 if the -XX option is supported by the JVM, or the flags are unknown
+# $1 - option, e.g. -XX:+UseParallelOldGC or -XX:MaxMetaspaceSize=100m
+function is_jvm_option_supported() {
+    local flag="${1#-XX:}"
+    flag="${flag#[+-]}"
+    flag="${flag%%=*}"
+    [ -z "${JVM_FLAGS// /}" ] || [[ "$JVM_FLAGS" == *" $flag "* ]]
+}
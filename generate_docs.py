@@ -1,9 +1,18 @@
 #!/usr/bin/env python
 
+import argparse
+import hashlib
+import json
+import multiprocessing
 import os
 import yaml
-import sys
-from jinja2 import Environment, Template
+from jinja2 import Template
+from module_index import ModuleIndex
+
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
 
 autogen_warning="""////
     AUTOGENERATED FILE - this file was generated via ./gen_template_docs.py.
@@ -13,39 +22,115 @@ autogen_warning="""////
 
 """
 
-template = Template(open('./template.adoc.jinja').read())
+# change when the output changes for the same module.yaml and template
+generator_version = "2"
+template_file = './template.adoc.jinja'
+manifest_file = './.generate_docs.json'
 module_dirs = ['./jboss']
 
-def generate_doc_for_module(module_file):
-    with open(module_file) as open_file:
-        data = yaml.load(open_file)
+template = None
+
+def digest(content):
+    return hashlib.sha1(content).hexdigest()
+
+def read_bytes(path):
+    with open(path, "rb") as open_file:
+        return open_file.read()
+
+def get_template():
+    global template
+    if template is None:
+        template = Template(read_bytes(template_file).decode("utf-8"))
+    return template
+
+def render_doc_for_module(module_file):
+    data = yaml.load(read_bytes(module_file), Loader = YamlLoader)
+    return (autogen_warning + get_template().render(data)).encode("utf-8")
+
+def generate_doc_for_module(module_file, input_digest):
+    """
+    Renders the README.adoc of the module, the file is written only if the
+    content changed.  Returns the module file, the input and output digests
+    and whether the file was written.
+    """
+    output_file = os.path.join(os.path.dirname(module_file), 'README.adoc')
+    content = render_doc_for_module(module_file)
+    written = not os.path.isfile(output_file) or read_bytes(output_file) != content
+    if written:
+        print ("Generating %s..." % os.path.relpath(output_file, os.getcwd()))
+        with open(output_file, "wb") as text_file:
+            text_file.write(content)
+    return (module_file, input_digest, digest(content), written)
+
+def generate_doc_for_module_args(args):
+    return generate_doc_for_module(*args)
+
+def read_manifest():
+    try:
+        with open(manifest_file) as open_file:
+            return json.load(open_file)
+    except (IOError, ValueError):
+        return {}
+
+def write_manifest(manifest):
+    with open(manifest_file, "w") as open_file:
+        json.dump(manifest, open_file, indent = 2, separators = (",", ": "), sort_keys = True)
+        open_file.write("\n")
+
+def is_unchanged(manifest, module_file, input_digest):
+    """
+    True if the module.yaml, the template and the generator are unchanged since
+    the README.adoc was generated, and the README.adoc was not modified.
+    """
+    entry = manifest.get(module_file)
+    if not entry or entry["input"] != input_digest:
+        return False
     output_file = os.path.join(os.path.dirname(module_file), 'README.adoc')
-    print ("Generating %s..." % os.path.join(os.path.relpath(output_file, os.getcwd())), os.path.basename(output_file))
-    with open(output_file, "w") as text_file:
-        text_file.write(autogen_warning)
-        text_file.write(template.render(data))
-
-def scan_for_modules(curdir=os.getcwd()):
-    if not os.path.isdir(curdir):
-        return
-    for file in sorted(os.listdir(curdir)):
-        full_file = os.path.join(curdir, file)
-        if os.path.isdir(full_file):
-            scan_for_modules(full_file)
-        elif os.path.basename(full_file) == 'module.yaml':
-            generate_doc_for_module(full_file)
+    return os.path.isfile(output_file) and digest(read_bytes(output_file)) == entry["output"]
+
+def generate_docs(module_files, jobs, force):
+    manifest = {} if force else read_manifest()
+    template_digest = digest(read_bytes(template_file))
+    pending = []
+    for module_file in module_files:
+        module_file = os.path.normpath(module_file)
+        input_digest = digest((generator_version + template_digest).encode("utf-8") + read_bytes(module_file))
+        if not is_unchanged(manifest, module_file, input_digest):
+            pending.append((module_file, input_digest))
+
+    if jobs > 1 and len(pending) > 1:
+        pool = multiprocessing.Pool(min(jobs, len(pending)))
+        try:
+            results = pool.map(generate_doc_for_module_args, pending)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        results = [generate_doc_for_module_args(args) for args in pending]
+
+    written = 0
+    for (module_file, input_digest, output_digest, was_written) in results:
+        manifest[module_file] = {"input": input_digest, "output": output_digest}
+        written += 1 if was_written else 0
+    write_manifest(manifest)
+    print ("%d modules, %d rendered, %d written" % (len(module_files), len(results), written))
 
 # expects to be run from the root of the repository
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Generates the README.adoc of the modules from their module.yaml")
+    parser.add_argument("-j", "--jobs", type = int, default = multiprocessing.cpu_count(), help = "Number of processes rendering the modules.")
+    parser.add_argument("-f", "--force", action = "store_true", help = "Render all the modules, even if unchanged since the last run.")
+    parser.add_argument("modules", nargs = "*", help = "The module.yaml files to generate, all the modules if not specified.")
+    args = parser.parse_args()
 
     # the user may specify a particular template to parse,
-    if 1 < len(sys.argv):
-        sys.argv.pop(0)
-        for t in sys.argv:
-            generate_doc_for_module(t)
+    if args.modules:
+        generate_docs(args.modules, args.jobs, args.force)
 
     # otherwise we'll look for them all (and do an index)
     else:
+        index = ModuleIndex().refresh()
+        module_files = []
         for dir in module_dirs:
-            scan_for_modules(dir)
-
+            module_files.extend(index.paths(dir))
+        generate_docs(module_files, args.jobs, args.force)
@@ -0,0 +1,216 @@
+#!/bin/python
+"""
+Copyright 2018 Red Hat, Inc.
+
+Red Hat licenses this file to you under the Apache License, version
+2.0 (the "License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+implied.  See the License for the specific language governing
+permissions and limitations under the License.
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+
+
+class CgroupController():
+    """
+    A cgroup controller (e.g. cpu, memory) of the current process. The limits
+    are read from the cgroup of the process and from all its ancestors visible
+    in the mount, as a nested cgroup is limited by its parents too.
+    """
+
+    def __init__(self, version, mountPoint, root, path, prefix = ""):
+        self.version = version
+        self.mountPoint = mountPoint
+        self.prefix = prefix
+        # without a cgroup namespace the mount root is the cgroup of the container
+        relative = path[len(root):] if path.startswith(root) else ""
+        self.path = os.path.normpath(mountPoint + "/" + relative.strip("/"))
+
+    def directories(self):
+        directory = self.path
+        while True:
+            yield self.prefix + directory
+            if directory == self.mountPoint or directory == os.path.dirname(directory):
+                return
+            directory = os.path.dirname(directory)
+
+    def read(self, name):
+        """
+        Returns the values of the file in the cgroup and its ancestors, starting
+        with the cgroup of the process.
+        """
+        values = []
+        for directory in self.directories():
+            try:
+                with open(os.path.join(directory, name), "r") as limitFile:
+                    values.append(limitFile.read().strip())
+            except (IOError, OSError):
+                pass
+        return values
+
+
+class ContainerLimits():
+    """
+    Resolves the cpu and memory limits of the container from cgroup v1, v2 or
+    hybrid hierarchies.
+    """
+
+    # unlimited cpu.max, memory.max and cpu.cfs_quota_us, the unlimited cgroup v1
+    # memory is a huge number which is greater than the memory of the host
+    UNLIMITED = ("max", "-1")
+
+    def __init__(self, prefix = ""):
+        self.prefix = prefix
+        self.controllers = {}
+        self.readControllers()
+
+    def readLines(self, path):
+        with open(self.prefix + path, "r") as lines:
+            return lines.read().splitlines()
+
+    def readControllers(self):
+        paths = {}
+        for line in self.readLines("/proc/self/cgroup"):
+            (hierarchy, controllers, path) = line.split(":", 2)
+            for controller in controllers.split(",") if controllers else [""]:
+                paths[controller] = path
+
+        for line in self.readLines("/proc/self/mountinfo"):
+            (mount, separator, superBlock) = line.partition(" - ")
+            fields = mount.split()
+            (fsType, source, options) = (superBlock.split() + ["", "", ""])[:3]
+            (root, mountPoint) = (fields[3], fields[4])
+            if fsType == "cgroup2" and "" in paths:
+                v2 = CgroupController(2, mountPoint, root, paths[""], self.prefix)
+                for name in (v2.read("cgroup.controllers") or [""])[-1].split():
+                    self.controllers.setdefault(name, v2)
+            elif fsType == "cgroup":
+                for name in options.split(","):
+                    if name in paths:
+                        # v1 controllers take precedence in hybrid hierarchies
+                        self.controllers[name] = CgroupController(1, mountPoint, root, paths[name], self.prefix)
+
+    def cgroupVersion(self):
+        versions = set(controller.version for controller in self.controllers.values())
+        return max(versions) if len(versions) == 1 else (1 if versions else None)
+
+    def cpuQuota(self):
+        """
+        Returns the number of cpus the container may use, None when unlimited.
+        """
+        controller = self.controllers.get("cpu")
+        quotas = []
+        if controller and controller.version == 2:
+            for value in controller.read("cpu.max"):
+                (quota, period) = (value.split() + ["100000"])[:2]
+                if quota not in ContainerLimits.UNLIMITED:
+                    quotas.append(float(quota) / float(period))
+        elif controller:
+            for (quota, period) in zip(controller.read("cpu.cfs_quota_us"), controller.read("cpu.cfs_period_us")):
+                if quota not in ContainerLimits.UNLIMITED:
+                    quotas.append(float(quota) / float(period))
+        return min(quotas) if quotas else None
+
+    def memoryLimits(self, names):
+        controller = self.controllers.get("memory")
+        limits = []
+        for name in names:
+            if controller:
+                limits.extend(int(value) for value in controller.read(name) if value not in ContainerLimits.UNLIMITED)
+        return min(limits) if limits else None
+
+    def memTotal(self):
+        for line in self.readLines("/proc/meminfo"):
+            if line.startswith("MemTotal:"):
+                return int(line.split()[1]) * 1024
+        return None
+
+    def resolve(self):
+        """
+        Returns the limits and the values derived from them, the keys in upper
+        case are exported to the environment by container-limits.
+        """
+        quota = self.cpuQuota()
+        memTotal = self.memTotal()
+        controller = self.controllers.get("memory")
+        if controller and controller.version == 2:
+            memoryMax = self.memoryLimits(["memory.max"])
+            # the processes are throttled and reclaimed above memory.high
+            memoryHigh = self.memoryLimits(["memory.high"])
+        else:
+            memoryMax = self.memoryLimits(["memory.limit_in_bytes"])
+            memoryHigh = None
+        maxMemory = min(limit for limit in (memoryMax, memoryHigh) if limit is not None) if memoryMax or memoryHigh else None
+        if maxMemory is not None and memTotal is not None and maxMemory >= memTotal:
+            maxMemory = None
+
+        limits = {
+            "cgroupVersion": self.cgroupVersion(),
+            "cpuQuota": quota,
+            "memoryMax": memoryMax,
+            "memoryHigh": memoryHigh,
+            "memTotal": memTotal
+        }
+        if quota is not None:
+            limits["CONTAINER_CORE_LIMIT"] = int(math.ceil(quota))
+        if maxMemory is not None:
+            limits["CONTAINER_MAX_MEMORY"] = maxMemory
+        return limits
+
+
+def writeAtomically(path, content):
+    tmpPath = "%s.%d" % (path, os.getpid())
+    with open(tmpPath, "w") as tmpFile:
+        tmpFile.write(content)
+    os.rename(tmpPath, path)
+
+def writeLimits(limits, cacheFile, key = None):
+    """
+    Writes the limits as JSON to the cache file and the exported variables to the
+    file with the same name and the .env extension, to be sourced by the scripts.
+    The key identifies the container the limits are resolved for, container-limits
+    only sources the .env file written with the key of its container.
+    """
+    writeAtomically(cacheFile, json.dumps(dict(limits, key = key), indent = 2, separators = (",", ": "), sort_keys = True) + "\n")
+    exports = ["export %s=\"%s\"\n" % (name, limits[name]) for name in sorted(limits) if name.isupper()]
+    writeAtomically(os.path.splitext(cacheFile)[0] + ".env", "".join(["# key: %s\n" % (key)] + exports))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Resolves the cpu and memory limits of the container from its cgroups")
+    parser.add_argument("--cache", required = False, type = str, default = None,
+        help = "JSON file to write the limits to, the exported variables are written to the file with the .env extension")
+    parser.add_argument("--key", required = False, type = str, default = None,
+        help = "Key of the container written with the cached limits, the cache of another container is stale")
+    parser.add_argument("--root", required = False, type = str, default = "", help = "Prefix of the /proc and cgroup file system paths")
+    parser.add_argument("-l", "--loglevel", default="CRITICAL", help="Log level",
+        choices=["debug", "DEBUG", "info", "INFO", "warning", "WARNING", "error", "ERROR", "critical", "CRITICAL"])
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level = args.loglevel.upper())
+    logger = logging.getLogger(__name__)
+
+    try:
+        limits = ContainerLimits(args.root).resolve()
+    except (IOError, OSError, ValueError) as e:
+        logger.critical("Unable to resolve the container limits: %s", e)
+        exit(1)
+
+    logger.debug("Resolved container limits: %s", limits)
+    if args.cache:
+        writeLimits(limits, args.cache, args.key)
+    else:
+        print(json.dumps(limits, indent = 2, separators = (",", ": "), sort_keys = True))
+
+    exit(0)
@@ -0,0 +1,14 @@
+export JBOSS_CONTAINER_JAVA_JVM_MODULE=$BATS_TEST_DIRNAME/../../artifacts/opt/jboss/container/java/jvm
+export CONTAINER_LIMITS_CACHE=$BATS_TMPDIR/container-limits.json
+# the exported variables cached by container-limits, next to the JSON cache
+CONTAINER_LIMITS_ENV=${CONTAINER_LIMITS_CACHE%.json}.env
+
+# container-limits is meant to be sourced by a function
+source_container_limits() {
+  source $JBOSS_CONTAINER_JAVA_JVM_MODULE/container-limits
+}
+
+setup() {
+  rm -f $CONTAINER_LIMITS_CACHE $CONTAINER_LIMITS_ENV
+  unset CONTAINER_CORE_LIMIT CONTAINER_MAX_MEMORY CORE_LIMIT JAVA_CORE_LIMIT
+}
@@ -0,0 +1,49 @@
+#!/usr/bin/env bats
+
+load common
+
+@test "container-limits: Should source the cached limits of the same container" {
+  source_container_limits
+  container_limits_key key
+  printf '# key: %s\nexport CONTAINER_CORE_LIMIT="99"\n' "$key" > $CONTAINER_LIMITS_ENV
+  unset CONTAINER_CORE_LIMIT CORE_LIMIT
+
+  source_container_limits
+
+  [ "$CONTAINER_CORE_LIMIT" = "99" ]
+  [ "$CORE_LIMIT" = "99" ]
+}
+
+@test "container-limits: Should source the cached limits without running any command" {
+  source_container_limits
+  container_limits_key key
+  printf '# key: %s\nexport CONTAINER_CORE_LIMIT="99"\n' "$key" > $CONTAINER_LIMITS_ENV
+  unset CONTAINER_CORE_LIMIT CORE_LIMIT
+
+  PATH=/nonexistent source_container_limits
+
+  [ "$CONTAINER_CORE_LIMIT" = "99" ]
+  [ "$CORE_LIMIT" = "99" ]
+}
+
+@test "container-limits: Should resolve the limits again when the cache is of another container" {
+  # e.g. the cache of the S2I build pod committed into the application image
+  printf '# key: 0\nexport CONTAINER_CORE_LIMIT="99"\n' > $CONTAINER_LIMITS_ENV
+
+  source_container_limits
+
+  [ "$CONTAINER_CORE_LIMIT" != "99" ]
+  [ "$CORE_LIMIT" != "99" ]
+  container_limits_key key
+  grep -qxF "# key: $key" $CONTAINER_LIMITS_ENV
+}
+
+@test "container-limits: Should resolve the limits again when the cache has no key" {
+  printf 'export CONTAINER_CORE_LIMIT="99"\n' > $CONTAINER_LIMITS_ENV
+
+  source_container_limits
+
+  [ "$CONTAINER_CORE_LIMIT" != "99" ]
+  container_limits_key key
+  grep -qxF "# key: $key" $CONTAINER_LIMITS_ENV
+}
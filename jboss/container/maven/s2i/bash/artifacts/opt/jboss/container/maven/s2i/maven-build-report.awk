@@ -0,0 +1,125 @@
+#!/usr/bin/awk -f
+# Prints the build time of the modules from the reactor summary of a Maven build
+# log, the longest first, and the critical path of the build: the chain of
+# modules, starting with the last one to finish, where each module started when
+# the previous one of the chain had finished.  The critical path requires the
+# time stamps of the log (org.slf4j.simpleLogger.showDateTime, HH:mm:ss.SSS).
+#
+# usage: awk -f maven-build-report.awk build.log
+
+# seconds of the HH:mm:ss.SSS time stamp at the start of the line, -1 if none
+function timestamp(line,    fields) {
+  if (match(line, /^[0-9][0-9]:[0-9][0-9]:[0-9][0-9]\.[0-9]+ /)) {
+    split(substr(line, 1, RLENGTH - 1), fields, ":")
+    return fields[1] * 3600 + fields[2] * 60 + fields[3]
+  }
+  return -1
+}
+
+# seconds of the duration of the reactor summary, e.g. 1.234 s, 01:05 min or 01:02 h
+function duration(text,    fields) {
+  gsub(/[\[\] ]/, "", text)
+  if (text ~ /min$/) {
+    split(substr(text, 1, length(text) - 3), fields, ":")
+    return fields[1] * 60 + fields[2]
+  } else if (text ~ /h$/) {
+    split(substr(text, 1, length(text) - 1), fields, ":")
+    return fields[1] * 3600 + fields[2] * 60
+  }
+  sub(/s$/, "", text)
+  return text + 0
+}
+
+{
+  time = timestamp($0)
+  line = $0
+  sub(/^[0-9:.]* ?\[INFO\] /, "", line)
+}
+
+# module started, e.g. Building my-module 1.0 [2/5]
+line ~ /^Building .* \[[0-9]+\/[0-9]+\]$/ {
+  name = line
+  sub(/^Building /, "", name)
+  sub(/ \[[0-9]+\/[0-9]+\]$/, "", name)
+  started[name] = time
+  next
+}
+
+line ~ /^Reactor Summary/ {
+  summary = 1
+  next
+}
+
+# module finished, e.g. my-module 1.0 ........ SUCCESS [  1.234 s]
+summary && match(line, / \.+ (SUCCESS|FAILURE) \[.*\]$/) {
+  name = substr(line, 1, RSTART - 1)
+  result = substr(line, RSTART, RLENGTH)
+  modules[++count] = name
+  sub(/^[ .]*/, "", result)
+  status[name] = substr(result, 1, index(result, " ") - 1)
+  seconds[name] = duration(substr(result, index(result, "[")))
+  total += seconds[name]
+  # the summary omits the version of the modules
+  start[name] = -1
+  if (name in started) {
+    start[name] = started[name]
+  } else {
+    for (building in started) {
+      if (index(building, name " ") == 1) {
+        start[name] = started[building]
+      }
+    }
+  }
+}
+
+END {
+  if (count == 0) {
+    exit
+  }
+
+  # sort the modules by the build time, the longest first
+  for (i = 2; i <= count; i++) {
+    for (j = i; j > 1 && seconds[modules[j]] > seconds[modules[j - 1]]; j--) {
+      name = modules[j]; modules[j] = modules[j - 1]; modules[j - 1] = name
+    }
+  }
+  printf "Build time of %d modules: %.1f s\n", count, total
+  for (i = 1; i <= count; i++) {
+    printf "  %8.1f s  %s (%s)\n", seconds[modules[i]], modules[i], status[modules[i]]
+  }
+
+  # walk back from the module which finished last
+  last = ""
+  first = ""
+  for (i = 1; i <= count; i++) {
+    name = modules[i]
+    if (start[name] < 0) {
+      exit
+    }
+    finish[name] = start[name] + seconds[name]
+    if (last == "" || finish[name] > finish[last]) {
+      last = name
+    }
+    if (first == "" || start[name] < start[first]) {
+      first = name
+    }
+  }
+  path = last
+  pathSeconds = seconds[last]
+  for (current = last; current != "";) {
+    previous = ""
+    for (i = 1; i <= count; i++) {
+      name = modules[i]
+      # the durations of the summary are rounded
+      if (start[name] < start[current] && finish[name] <= start[current] + 0.5 && (previous == "" || finish[name] > finish[previous])) {
+        previous = name
+      }
+    }
+    if (previous != "") {
+      path = previous " -> " path
+      pathSeconds += seconds[previous]
+    }
+    current = previous
+  }
+  printf "Critical path: %.1f s of %.1f s elapsed: %s\n", pathSeconds, finish[last] - start[first], path
+}
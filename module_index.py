@@ -0,0 +1,262 @@
+#!/bin/python
+"""
+Copyright 2018 Red Hat, Inc.
+
+Red Hat licenses this file to you under the Apache License, version
+2.0 (the "License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+implied.  See the License for the specific language governing
+permissions and limitations under the License.
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import time
+import yaml
+
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
+logger = logging.getLogger(__name__)
+
+def versionKey(version):
+    """
+    Key ordering the versions numerically, e.g. 1.10 after 1.9.  The numeric
+    parts are tagged so they are never compared with the other parts, and a
+    missing version orders first.
+    """
+    if version is None:
+        return []
+    return [(True, int(part)) if part.isdigit() else (False, part) for part in re.split(r"[.-]", str(version))]
+
+def readModule(path, loader = YamlLoader):
+    """
+    Returns the compact index entry of a module.yaml.
+    """
+    with open(path, "rb") as moduleFile:
+        data = yaml.load(moduleFile, Loader = loader) or {}
+    modules = data.get("modules") or {}
+    return {
+        "name": data.get("name"),
+        "version": None if data.get("version") is None else str(data.get("version")),
+        "envs": dict((env["name"], env.get("value")) for env in data.get("envs") or [] if env.get("name")),
+        "ports": [port.get("value") for port in data.get("ports") or []],
+        "install": [dict((key, str(value)) for (key, value) in module.items() if key in ("name", "version")) for module in modules.get("install") or []],
+        "execute": [execute.get("script") for execute in data.get("execute") or []]
+    }
+
+class ModuleIndex(object):
+    """
+    Index of the module.yaml files of the repository, cached in a JSON file.
+    The index is refreshed by walking the tree, only the module.yaml files with
+    a different modification time or size are parsed again.
+    """
+
+    def __init__(self, root = ".", indexFile = None):
+        self.root = root
+        self.indexFile = indexFile or os.path.join(root, ".module_index.json")
+        self.entries = {}
+        self.byName = None
+        try:
+            with open(self.indexFile, "r") as cache:
+                self.entries = json.load(cache)
+        except (IOError, ValueError):
+            pass
+
+    def refresh(self):
+        """
+        Updates the index with the current module.yaml files, returns the index.
+        """
+        found = {}
+        parsed = 0
+        for (directory, directories, files) in os.walk(self.root):
+            directories[:] = sorted(name for name in directories if not name.startswith("."))
+            if "module.yaml" not in files:
+                continue
+            path = os.path.normpath(os.path.relpath(os.path.join(directory, "module.yaml"), self.root))
+            stat = os.stat(os.path.join(self.root, path))
+            entry = self.entries.get(path)
+            if entry is None or entry["mtime"] != stat.st_mtime or entry["size"] != stat.st_size:
+                logger.debug("Parsing %s", path)
+                entry = readModule(os.path.join(self.root, path))
+                (entry["mtime"], entry["size"]) = (stat.st_mtime, stat.st_size)
+                parsed += 1
+            found[path] = entry
+
+        if parsed or set(found) != set(self.entries):
+            logger.info("Indexed %d modules, %d parsed", len(found), parsed)
+            self.entries = found
+            self.write()
+        self.byName = None
+        return self
+
+    def write(self):
+        tmpFile = "%s.%d" % (self.indexFile, os.getpid())
+        with open(tmpFile, "w") as cache:
+            json.dump(self.entries, cache, separators = (",", ":"), sort_keys = True)
+        os.rename(tmpFile, self.indexFile)
+
+    def paths(self, directory = None):
+        """
+        Returns the sorted paths of the module.yaml files, relative to the root,
+        in the directory if specified.
+        """
+        prefix = None if directory is None else os.path.normpath(directory) + os.sep
+        return sorted(path for path in self.entries if prefix is None or path.startswith(prefix))
+
+    def modules(self):
+        """
+        Returns the (path, entry) of all the modules, ordered by path.
+        """
+        return [(path, self.entries[path]) for path in self.paths()]
+
+    def find(self, name, version = None):
+        """
+        Returns the (path, entry) of the module, the latest version if not
+        specified, None if not in the index.
+        """
+        if self.byName is None:
+            self.byName = {}
+            for (path, entry) in self.modules():
+                self.byName.setdefault(entry["name"], []).append((path, entry))
+        candidates = [candidate for candidate in self.byName.get(name, []) if version is None or candidate[1]["version"] == version]
+        return max(candidates, key = lambda candidate: versionKey(candidate[1]["version"])) if candidates else None
+
+    def withEnv(self, name):
+        """
+        Returns the (path, entry) of the modules defining the environment variable.
+        """
+        return [(path, entry) for (path, entry) in self.modules() if name in entry["envs"]]
+
+    def installedBy(self, name):
+        """
+        Returns the (path, entry) of the modules installing the module directly.
+        """
+        return [(path, entry) for (path, entry) in self.modules() if any(module["name"] == name for module in entry["install"])]
+
+    def installOrder(self, name, version = None):
+        """
+        Returns the names of the transitive dependencies of the module in the
+        order of installation, ending with the module, and the names of the
+        modules which are not in the index.
+        """
+        order = []
+        missing = []
+        state = {}
+
+        def visit(name, version, chain):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError("Circular module dependency: %s" % (" -> ".join(chain + [name])))
+            found = self.find(name, version)
+            if found is None:
+                if name not in missing:
+                    missing.append(name)
+                state[name] = "done"
+                return
+            state[name] = "visiting"
+            for module in found[1]["install"]:
+                visit(module["name"], module.get("version"), chain + [name])
+            state[name] = "done"
+            order.append(name)
+
+        visit(name, version, [])
+        return (order, missing)
+
+def benchmark(root, indexFile, runs):
+    """
+    Compares parsing all the module.yaml files with loading and refreshing the
+    cached index, and times the queries.
+    """
+    def timed(function):
+        start = time.time()
+        for run in range(runs):
+            function()
+        return (time.time() - start) * 1000 / runs
+
+    if os.path.exists(indexFile):
+        os.remove(indexFile)
+    index = ModuleIndex(root, indexFile).refresh()
+    paths = index.paths()
+    name = max(index.modules(), key = lambda module: len(index.installOrder(module[1]["name"])[0]))[1]["name"]
+    print("%d modules, deepest dependency tree: %s" % (len(paths), name))
+    for loader in sorted(set([YamlLoader, yaml.SafeLoader, yaml.Loader]), key = lambda loader: loader.__name__):
+        print("  %-40s %8.2f ms" % ("parse all module.yaml (%s)" % (loader.__name__), timed(lambda: [readModule(os.path.join(root, path), loader) for path in paths])))
+    print("  %-40s %8.2f ms" % ("load cached index", timed(lambda: ModuleIndex(root, indexFile))))
+    print("  %-40s %8.2f ms" % ("load and refresh unchanged index", timed(lambda: ModuleIndex(root, indexFile).refresh())))
+    print("  %-40s %8.2f ms" % ("install order of %s" % (name), timed(lambda: index.installOrder(name))))
+    print("  %-40s %8.2f ms" % ("modules defining JAVA_OPTS", timed(lambda: index.withEnv("JAVA_OPTS"))))
+
+def printModules(modules):
+    for (path, entry) in modules:
+        print("%s %s %s" % (entry["name"], entry["version"], path))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Indexes the module.yaml files of the repository and queries the index")
+    parser.add_argument("--root", default = ".", help = "Root directory of the modules.")
+    parser.add_argument("--index", default = None, help = "Index file, defaults to .module_index.json in the root directory.")
+    parser.add_argument("-l", "--loglevel", default="WARNING", help="Log level",
+        choices=["debug", "DEBUG", "info", "INFO", "warning", "WARNING", "error", "ERROR", "critical", "CRITICAL"])
+    commands = parser.add_subparsers(dest = "command")
+    commands.add_parser("list", help = "Lists the modules.")
+    show = commands.add_parser("show", help = "Prints the index entry of a module.")
+    show.add_argument("name")
+    show.add_argument("version", nargs = "?")
+    env = commands.add_parser("env", help = "Lists the modules defining an environment variable.")
+    env.add_argument("name")
+    deps = commands.add_parser("deps", help = "Prints the transitive install order of a module.")
+    deps.add_argument("name")
+    deps.add_argument("version", nargs = "?")
+    rdeps = commands.add_parser("rdeps", help = "Lists the modules installing a module.")
+    rdeps.add_argument("name")
+    bench = commands.add_parser("benchmark", help = "Times the index against parsing all the module.yaml files.")
+    bench.add_argument("--runs", type = int, default = 10)
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level = args.loglevel.upper())
+
+    indexFile = args.index or os.path.join(args.root, ".module_index.json")
+    if args.command == "benchmark":
+        benchmark(args.root, indexFile, args.runs)
+        exit(0)
+
+    index = ModuleIndex(args.root, indexFile).refresh()
+    if args.command == "show":
+        found = index.find(args.name, args.version)
+        if found is None:
+            logger.error("Module %s not found", args.name)
+            exit(1)
+        print(json.dumps(dict(found[1], path = found[0]), indent = 2, separators = (",", ": "), sort_keys = True))
+    elif args.command == "env":
+        for (path, entry) in index.withEnv(args.name):
+            value = entry["envs"][args.name]
+            print("%s %s %s%s" % (entry["name"], entry["version"], path, "" if value is None else " = %s" % (value)))
+    elif args.command == "deps":
+        try:
+            (order, missing) = index.installOrder(args.name, args.version)
+        except ValueError as e:
+            logger.error("%s", e)
+            exit(1)
+        for name in order:
+            print(name)
+        for name in missing:
+            print("%s (not found)" % (name))
+    elif args.command == "rdeps":
+        printModules(index.installedBy(args.name))
+    else:
+        printModules(index.modules())
+
+    exit(0)
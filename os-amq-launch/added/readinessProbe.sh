@@ -5,8 +5,6 @@ if [ true = "${DEBUG}" ] ; then
     exit 0
 fi
 
-OUTPUT=/tmp/readiness-output
-ERROR=/tmp/readiness-error
 LOG=/tmp/readiness-log
 
 CONFIG_FILE=$AMQ_HOME/conf/activemq.xml
@@ -14,60 +12,7 @@ CONFIG_FILE=$AMQ_HOME/conf/activemq.xml
 COUNT=30
 SLEEP=1
 DEBUG_SCRIPT=false
-
-EVALUATE_SCRIPT=`cat <<EOF
-import xml.etree.ElementTree
-from urlparse import urlsplit
-import socket
-import sys
-
-# calculate the open ports
-try:
-  tcp_file = open("/proc/net/tcp6", "r")
-except IOError:
-  tcp_file = open("/proc/net/tcp", "r")
-tcp_lines = tcp_file.readlines()
-header = tcp_lines.pop(0)
-tcp_file.close()
-
-listening_ports = []
-for tcp_line in tcp_lines:
-  stripped = tcp_line.strip()
-  contents = stripped.split()
-  # Is the status listening?
-  if contents[3] == '0A':
-    netaddr = contents[1].split(":")
-    port = int(netaddr[1], 16)
-    listening_ports.append(port)
-
-#parse the config file to retrieve the transport connectors
-xmldoc = xml.etree.ElementTree.parse("${CONFIG_FILE}")
-
-ns = {"core" : "http://activemq.apache.org/schema/core"}
-transportConnectors = xmldoc.findall("core:broker/core:transportConnectors/core:transportConnector", ns)
-
-result=0
-
-for transportConnector in transportConnectors:
-  name = transportConnector.get("name")
-  uri = transportConnector.get("uri")
-  spliturl = urlsplit(uri)
-  port = spliturl.port
-
-  print "{} port {}".format(name, port)
-
-  if port == None:
-    print "    {} does not define a port, cannot check transport".format(name)
-    continue
-
-  try:
-    listening_ports.index(port)
-    print "    Transport is listening on port {}".format(port)
-  except ValueError, e:
-    print "    Nothing listening on port {}, transport not yet running".format(port)
-    result=1
-sys.exit(result)
-EOF`
+PROBE_IMPL=probe.amq.AmqProbe
 
 if [ $# -gt 0 ] ; then
     COUNT=$1
@@ -81,41 +26,16 @@ if [ $# -gt 2 ] ; then
     DEBUG_SCRIPT=$3
 fi
 
-if [ true = "${DEBUG_SCRIPT}" ] ; then
-    echo "Count: ${COUNT}, sleep: ${SLEEP}" > "${LOG}"
+if [ ! -f "${CONFIG_FILE}" ] ; then
+    echo "No configuration file located: ${CONFIG_FILE}"
+    exit 1
 fi
 
-while : ; do
-    CONNECT_RESULT=1
-    PROBE_MESSAGE="No configuration file located: ${CONFIG_FILE}"
-
-    if [ -f "${CONFIG_FILE}" ] ; then
-        python -c "$EVALUATE_SCRIPT" >"${OUTPUT}" 2>"${ERROR}"
-
-        CONNECT_RESULT=$?
-        if [ true = "${DEBUG_SCRIPT}" ] ; then
-            (
-                echo "$(date) Connect: ${CONNECT_RESULT}"
-                echo "========================= OUTPUT =========================="
-                cat "${OUTPUT}"
-                echo "========================= ERROR =========================="
-                cat "${ERROR}"
-                echo "=========================================================="
-            ) >> "${LOG}"
-        fi
-
-        PROBE_MESSAGE="No transport listening on ports $(grep "Nothing listening" "${OUTPUT}" | sed -e 's+^.*on port ++' -e 's+,.*$++')"
-        rm -f  "${OUTPUT}" "${ERROR}"
-    fi
-
-    if [ "${CONNECT_RESULT}" -eq 0 ] ; then
-        exit 0;
-    fi
+if [ true = "${DEBUG_SCRIPT}" ] ; then
+    DEBUG_OPTIONS="--debug --logfile $LOG --loglevel DEBUG"
+fi
 
-    COUNT=$(expr "$COUNT" - 1)
-    if [ "$COUNT" -eq 0 ] ; then
-        echo ${PROBE_MESSAGE}
-        exit 1;
-    fi
-    sleep "${SLEEP}"
-done
+if python $AMQ_HOME/bin/probes/runner.py -c READY --maxruns $COUNT --sleep $SLEEP $DEBUG_OPTIONS $PROBE_IMPL; then
+    exit 0
+fi
+exit 1
@@ -47,13 +47,13 @@ function configure_access_log_valve() {
     if [ "${ENABLE_ACCESS_LOG^^}" == "TRUE" ]; then
         log_info "Configuring Access Log Valve."
         if [[ "$JBOSS_EAP_VERSION" == "6.4"* ]]; then
-            sed -i "s|<!-- ##ACCESS_LOG_VALVE## -->|${EAP6_VALVE}|" $CONFIG_FILE
+            sed_config "s|<!-- ##ACCESS_LOG_VALVE## -->|${EAP6_VALVE}|" $CONFIG_FILE
         fi
         if [[ "$JBOSS_DATAGRID_VERSION" == "6.5"* ]]; then
-            sed -i "s|<!-- ##ACCESS_LOG_VALVE## -->|${EAP6_VALVE}|" $CONFIG_FILE
+            sed_config "s|<!-- ##ACCESS_LOG_VALVE## -->|${EAP6_VALVE}|" $CONFIG_FILE
         fi
         if [[ "$JBOSS_EAP_VERSION" == "7."* ]]; then
-            sed -i "s|<!-- ##ACCESS_LOG_VALVE## -->|${EAP7x_VALVE}|" $CONFIG_FILE
+            sed_config "s|<!-- ##ACCESS_LOG_VALVE## -->|${EAP7x_VALVE}|" $CONFIG_FILE
         fi
     else
         log_info "Access log is disabled, ignoring configuration."
@@ -69,9 +69,9 @@ function configure_access_log_handler() {
     IS_NEWER_OR_EQUAL_TO_7_2=$(version_compare "$JBOSS_DATAGRID_VERSION" "7.2")
     # In this piece we check whether this is JDG and whether the version is >= 7.2
     if [ ! -z $JBOSS_DATAGRID_VERSION ] && [ $IS_NEWER_OR_EQUAL_TO_7_2 = "newer" ]; then
-      sed -i "s|<!-- ##ACCESS_LOG_HANDLER## -->|<logger category=\"org.infinispan.REST_ACCESS_LOG\"><level name=\"TRACE\"/></logger>|" $CONFIG_FILE
+      sed_config "s|<!-- ##ACCESS_LOG_HANDLER## -->|<logger category=\"org.infinispan.REST_ACCESS_LOG\"><level name=\"TRACE\"/></logger>|" $CONFIG_FILE
     else
-      sed -i "s|<!-- ##ACCESS_LOG_HANDLER## -->|<logger category=\"org.infinispan.rest.logging.RestAccessLoggingHandler\"><level name=\"TRACE\"/></logger>|" $CONFIG_FILE
+      sed_config "s|<!-- ##ACCESS_LOG_HANDLER## -->|<logger category=\"org.infinispan.rest.logging.RestAccessLoggingHandler\"><level name=\"TRACE\"/></logger>|" $CONFIG_FILE
     fi
   fi
 }
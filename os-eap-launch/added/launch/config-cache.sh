@@ -0,0 +1,102 @@
+#!/bin/sh
+# Cache of the configuration done by the configure modules. When CONFIG_CACHE_DIR
+# points to a directory surviving container restarts (e.g. an emptyDir volume),
+# the configuration directory and the shell variables set by the modules are
+# stored there and restored by the next start of the container, as long as the
+# environment, the configuration templates and the launch scripts are the same.
+
+source $JBOSS_HOME/bin/launch/logging.sh
+
+# modules changing the container outside of the configuration directory, those
+# are executed even when the configuration is restored from the cache
+CONFIG_CACHE_RERUN_SCRIPTS=(
+  passwd.sh
+  standalone.sh
+)
+
+# shell variables never restored from the cache, including the local variables
+# of store_config_cache, of the configure driver and of trace_run
+CONFIG_CACHE_IGNORED_VARIABLES="^(BASH.*|FUNCNAME|PIPESTATUS|RANDOM|SRANDOM|SECONDS|LINENO|EPOCH.*|PPID|_|OLDPWD|PWD|SHLVL|COLUMNS|LINES|HISTCMD|OPTIND|OPTARG|CONFIG_CACHE_.*|CONFIG_RENDER_PLAN|LAUNCH_TRACE_.*|trace[A-Z].*|changed|name|tmpEntry|module|prop_file|prop_file_arg)$"
+
+function is_config_cache_enabled() {
+  if [ -z "${CONFIG_CACHE_DIR}" ]; then
+    return 1
+  fi
+  # extensions and SSO adapters change files outside of the configuration directory
+  if [ -f "${JBOSS_HOME}/extensions/preconfigure.sh" -o -f "${JBOSS_HOME}/extensions/postconfigure.sh" -o -n "${SSO_URL}" ]; then
+    log_info "Configuration cache is not used with extensions or SSO adapters."
+    return 1
+  fi
+  return 0
+}
+
+# Prints the hash of the environment, the configuration templates and the scripts
+function config_cache_key() {
+  local files=( ${CONFIGURE_SCRIPTS[@]} )
+  local prop_file_arg
+  for prop_file_arg in $(echo $ENV_FILES | sed "s/,/ /g"); do
+    files+=( $(find $prop_file_arg -maxdepth 0 -type f 2>/dev/null) )
+  done
+
+  {
+    env | grep -v -E "^(_|PWD|OLDPWD|SHLVL)=" | sort
+    hostname -i 2>/dev/null
+    find "${JBOSS_HOME}/bin/launch" "${JBOSS_HOME}/standalone/configuration" -type f -print0 | sort -z | xargs -0 sha256sum
+    sha256sum "${files[@]}" 2>/dev/null
+  } | sha256sum | cut -d ' ' -f 1
+}
+
+# Restores the cached configuration, returns 1 when there is none for the current key
+function restore_config_cache() {
+  is_config_cache_enabled || return 1
+
+  CONFIG_CACHE_KEY=$(config_cache_key)
+  local entry="${CONFIG_CACHE_DIR}/${CONFIG_CACHE_KEY}"
+  if [ ! -f "${entry}/configuration.tar" -o ! -f "${entry}/variables.sh" ]; then
+    log_info "Configuration is not cached, configuring the server."
+    return 1
+  fi
+
+  tar -xf "${entry}/configuration.tar" -C "${JBOSS_HOME}/standalone" || return 1
+  source "${entry}/variables.sh"
+  log_info "Configuration restored from the cache ${entry}"
+  return 0
+}
+
+# Remembers the shell variables before the modules are executed
+function start_config_cache() {
+  unset CONFIG_CACHE_SNAPSHOT
+  is_config_cache_enabled || return
+
+  declare -g -A CONFIG_CACHE_SNAPSHOT
+  local name
+  for name in $(compgen -v | grep -v -E "${CONFIG_CACHE_IGNORED_VARIABLES}"); do
+    CONFIG_CACHE_SNAPSHOT[$name]="${!name}"
+  done
+}
+
+# Stores the configuration directory and the variables changed by the modules
+function store_config_cache() {
+  [ -n "${CONFIG_CACHE_KEY}" ] && is_config_cache_enabled || return
+
+  local changed=()
+  local name
+  for name in $(compgen -v | grep -v -E "${CONFIG_CACHE_IGNORED_VARIABLES}"); do
+    if [ -z "${CONFIG_CACHE_SNAPSHOT[$name]+x}" -o "${CONFIG_CACHE_SNAPSHOT[$name]}" != "${!name}" ]; then
+      changed+=( $name )
+    fi
+  done
+
+  local tmpEntry
+  tmpEntry=$(umask 077 && mkdir -p "${CONFIG_CACHE_DIR}" && mktemp -d "${CONFIG_CACHE_DIR}/.entry.XXXXXX") || return
+  if tar -cf "${tmpEntry}/configuration.tar" -C "${JBOSS_HOME}/standalone" configuration \
+      && { [ ${#changed[@]} -eq 0 ] || declare -p "${changed[@]}" | sed -e 's/^declare -\([^ -][^ ]*\) /declare -g\1 /' -e 's/^declare -- /declare -g /'; } > "${tmpEntry}/variables.sh"; then
+    # only the latest configuration is kept
+    find "${CONFIG_CACHE_DIR}" -mindepth 1 -maxdepth 1 -type d ! -name "$(basename ${tmpEntry})" -exec rm -rf {} +
+    mv "${tmpEntry}" "${CONFIG_CACHE_DIR}/${CONFIG_CACHE_KEY}"
+  else
+    log_warning "Unable to store the configuration to the cache ${CONFIG_CACHE_DIR}"
+    rm -rf "${tmpEntry}"
+  fi
+  unset CONFIG_CACHE_SNAPSHOT
+}
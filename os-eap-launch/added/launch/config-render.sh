@@ -0,0 +1,38 @@
+#!/bin/sh
+# Helpers rendering the configuration files in one pass per file. The configure
+# scripts queue their substitutions by sed_config, render_config_files then applies
+# them by configrender.py which gives the same result as running them one by one.
+
+source $JBOSS_HOME/bin/launch/logging.sh
+
+# Applies the sed substitution to the file, queued when rendering is started
+# $1 - sed substitution, e.g. "s|<!-- ##MARKER## -->|${replacement}|"
+# $2 - file
+function sed_config() {
+  if [ -n "${CONFIG_RENDER_PLAN}" ]; then
+    printf '%s\0%s\0' "$2" "$1" >> "${CONFIG_RENDER_PLAN}"
+  else
+    sed -i "$1" "$2"
+  fi
+}
+
+# Starts queueing the substitutions done by sed_config
+function start_config_render() {
+  CONFIG_RENDER_PLAN=$(mktemp /tmp/config-render-plan.XXXXXX)
+}
+
+# Applies the queued substitutions, one by one by sed if the renderer fails
+function render_config_files() {
+  local plan="${CONFIG_RENDER_PLAN}"
+  unset CONFIG_RENDER_PLAN
+  [ -z "${plan}" ] && return
+
+  if [ -s "${plan}" ] && ! python $JBOSS_HOME/bin/launch/configrender.py "${plan}" ${CONFIG_RENDER_REPORT:+--report "${CONFIG_RENDER_REPORT}"}; then
+    log_warning "Unable to render the configuration in one pass, applying the substitutions one by one."
+    local file expression
+    while IFS= read -r -d '' file && IFS= read -r -d '' expression; do
+      sed -i "${expression}" "${file}"
+    done < "${plan}"
+  fi
+  rm -f "${plan}"
+}
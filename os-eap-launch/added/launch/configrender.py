@@ -0,0 +1,375 @@
+#!/bin/python
+"""
+Copyright 2018 Red Hat, Inc.
+
+Red Hat licenses this file to you under the Apache License, version
+2.0 (the "License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+implied.  See the License for the specific language governing
+permissions and limitations under the License.
+"""
+
+import argparse
+import io
+import logging
+import os
+import re
+import shutil
+
+from collections import OrderedDict
+
+
+class AddressRange():
+    """
+    The regular expression address (/start/) or range (/start/,/end/) of a sed
+    command. A range is active from a line matching start to the next line
+    matching end, the end is not checked on the line starting the range.
+    """
+
+    def __init__(self, start, end = None):
+        self.start = start
+        self.end = end
+        self.active = False
+
+    def matches(self, line):
+        if self.end is None:
+            return self.start.search(line) is not None
+        if self.active:
+            self.active = self.end.search(line) is None
+            return True
+        self.active = self.start.search(line) is not None
+        return self.active
+
+
+class SedSubstitution():
+    """
+    The sed substitution command (s|pattern|replacement|flags) as used by the
+    launch scripts, i.e. basic regular expression pattern, replacement with
+    '&', '\\n' and back-references, and the 'g', 'I' and number flags. The
+    substitution may be restricted by regular expression addresses and ranges,
+    nested in blocks, e.g. /start/,/end/{/inner/s|pattern|replacement|}.
+    """
+
+    # characters special in python regular expressions but not in basic regular expressions
+    LITERALS = '+?(){}|'
+
+    # escapes of GNU sed without the same meaning in python regular expressions
+    ANCHORS = {'<': r'\b(?=\w)', '>': r'\b(?<=\w)', '`': r'\A', "'": r'\Z'}
+
+    # POSIX character classes of the bracket expressions, in the C locale
+    CLASSES = {
+        'alnum': '0-9A-Za-z',
+        'alpha': 'A-Za-z',
+        'blank': ' \\t',
+        'cntrl': '\\x00-\\x1f\\x7f',
+        'digit': '0-9',
+        'graph': '!-~',
+        'lower': 'a-z',
+        'print': ' -~',
+        'punct': '!-/:-@\\[-`{-~',
+        'space': ' \\t\\n\\r\\f\\v',
+        'upper': 'A-Z',
+        'xdigit': '0-9A-Fa-f',
+    }
+
+    def __init__(self, expression):
+        self.expression = expression
+        (self.addresses, expression) = SedSubstitution.parseAddresses(expression)
+        if len(expression) < 2 or expression[0] != 's':
+            raise ValueError('Unsupported sed command: %s' % (expression))
+        delimiter = expression[1]
+        (pattern, replacement, flags) = SedSubstitution.split(expression[2:], delimiter)
+        self.count = 0 if 'g' in flags else 1
+        self.occurrence = int(re.sub(r'\D', '', flags) or 1)
+        if re.search(r'[^gIi0-9]', flags):
+            raise ValueError('Unsupported sed flags "%s": %s' % (flags, expression))
+        self.regex = re.compile(SedSubstitution.toPythonRegex(pattern, delimiter), re.IGNORECASE if re.search('[Ii]', flags) else 0)
+        self.replacement = SedSubstitution.parseReplacement(replacement, delimiter)
+        self.matched = 0
+
+    @staticmethod
+    def parseAddresses(expression):
+        """
+        Returns the addresses of the command, outermost first, and the command.
+        """
+        addresses = []
+        while expression.startswith('/'):
+            (start, expression) = SedSubstitution.splitAddress(expression)
+            end = None
+            if expression.startswith(','):
+                if not expression.startswith(',/'):
+                    raise ValueError('Unsupported sed address: %s' % (expression))
+                (end, expression) = SedSubstitution.splitAddress(expression[1:])
+            addresses.append(AddressRange(start, end))
+            if expression.startswith('{'):
+                if not expression.endswith('}'):
+                    raise ValueError('Unterminated sed block: %s' % (expression))
+                expression = expression[1:-1]
+        return (addresses, expression)
+
+    @staticmethod
+    def splitAddress(text):
+        """
+        Returns the regular expression of the address starting the text and the
+        rest of the text.
+        """
+        index = 1
+        while index < len(text) and text[index] != '/':
+            index += 2 if text[index] == '\\' else 1
+        if index >= len(text) or index == 1:
+            raise ValueError('Unsupported sed address: %s' % (text))
+        return (re.compile(SedSubstitution.toPythonRegex(text[1:index], '/')), text[index + 1:])
+
+    @staticmethod
+    def split(text, delimiter):
+        parts = []
+        current = ''
+        index = 0
+        while index < len(text):
+            char = text[index]
+            if char == '\\' and index + 1 < len(text):
+                current += text[index:index + 2]
+                index += 2
+                continue
+            if char == delimiter and len(parts) < 2:
+                parts.append(current)
+                current = ''
+            else:
+                current += char
+            index += 1
+        if len(parts) != 2:
+            raise ValueError('Unterminated sed substitution: s%s%s' % (delimiter, text))
+        return (parts[0], parts[1], current)
+
+    @staticmethod
+    def toPythonRegex(pattern, delimiter):
+        regex = ''
+        index = 0
+        while index < len(pattern):
+            char = pattern[index]
+            if char == '\\' and index + 1 < len(pattern):
+                escaped = pattern[index + 1]
+                index += 2
+                if escaped == delimiter:
+                    regex += re.escape(escaped)
+                elif escaped in SedSubstitution.LITERALS:
+                    regex += escaped
+                elif escaped == 'n':
+                    regex += '\n'
+                elif escaped == 't':
+                    regex += '\t'
+                elif escaped in SedSubstitution.ANCHORS:
+                    regex += SedSubstitution.ANCHORS[escaped]
+                elif escaped.isdigit() or escaped.isalpha():
+                    regex += '\\' + escaped
+                else:
+                    regex += re.escape(escaped)
+                continue
+            if char == '[':
+                (bracket, index) = SedSubstitution.toPythonBracket(pattern, index)
+                regex += bracket
+                continue
+            if (char in SedSubstitution.LITERALS or (char == '*' and (not regex or regex.endswith('(')))
+                    or (char == '^' and index > 0) or (char == '$' and index < len(pattern) - 1)):
+                regex += '\\' + char
+            else:
+                regex += char
+            index += 1
+        return regex
+
+    @staticmethod
+    def toPythonBracket(pattern, start):
+        """
+        Returns the python character set of the bracket expression starting at
+        the index and the index following it. Backslash and '[' are literal in
+        a bracket expression, the character classes are expanded.
+        """
+        regex = '['
+        index = start + 1
+        if index < len(pattern) and pattern[index] == '^':
+            regex += '^'
+            index += 1
+        if index < len(pattern) and pattern[index] == ']':
+            regex += '\\]'
+            index += 1
+        while index < len(pattern) and pattern[index] != ']':
+            if pattern.startswith('[:', index):
+                end = pattern.find(':]', index + 2)
+                name = pattern[index + 2:end]
+                if end < 0 or name not in SedSubstitution.CLASSES:
+                    raise ValueError('Unsupported character class in sed pattern: %s' % (pattern))
+                regex += SedSubstitution.CLASSES[name]
+                index = end + 2
+                continue
+            if pattern.startswith('[=', index) or pattern.startswith('[.', index):
+                raise ValueError('Unsupported bracket expression in sed pattern: %s' % (pattern))
+            char = pattern[index]
+            regex += '\\' + char if char in '\\[' else char
+            index += 1
+        if index >= len(pattern):
+            raise ValueError('Unterminated bracket expression in sed pattern: %s' % (pattern))
+        return (regex + ']', index + 1)
+
+    @staticmethod
+    def parseReplacement(replacement, delimiter):
+        """
+        Returns the replacement as a list of literal strings and group numbers.
+        """
+        parts = []
+        literal = ''
+        index = 0
+        while index < len(replacement):
+            char = replacement[index]
+            if char == '\\' and index + 1 < len(replacement):
+                escaped = replacement[index + 1]
+                index += 2
+                if escaped.isdigit():
+                    parts.extend([literal, int(escaped)])
+                    literal = ''
+                else:
+                    literal += {'n': '\n', 't': '\t'}.get(escaped, escaped)
+                continue
+            if char == '&':
+                parts.extend([literal, 0])
+                literal = ''
+            else:
+                literal += char
+            index += 1
+        parts.append(literal)
+        return parts
+
+    def expand(self, match):
+        return ''.join(part if not isinstance(part, int) else (match.group(part) or '') for part in self.replacement)
+
+    def apply(self, line):
+        # every address is checked only on the lines selected by the enclosing ones
+        if not all(address.matches(line) for address in self.addresses):
+            return line
+        if self.count == 1 and self.occurrence > 1:
+            matches = list(self.regex.finditer(line))
+            if len(matches) < self.occurrence:
+                return line
+            match = matches[self.occurrence - 1]
+            self.matched += 1
+            return line[:match.start()] + self.expand(match) + line[match.end():]
+
+        (result, count) = self.regex.subn(self.expand, line, self.count)
+        if count:
+            self.matched += 1
+        return result
+
+
+class ConfigRenderer():
+    """
+    Applies the sed substitutions planned for a file in one pass. The result is
+    the same as if the substitutions were applied one after another by 'sed -i':
+    each substitution is applied to the lines produced by the previous ones.
+    """
+
+    def __init__(self, path, expressions):
+        self.path = path
+        self.substitutions = [SedSubstitution(expression) for expression in expressions]
+        self.tmpPath = os.path.join(os.path.dirname(path), '.' + os.path.basename(path) + '.render')
+        self.changes = []
+
+    def renderLine(self, line, first = 0):
+        for index in range(first, len(self.substitutions)):
+            line = self.substitutions[index].apply(line)
+            if '\n' in line:
+                return '\n'.join(self.renderLine(part, index + 1) for part in line.split('\n'))
+        return line
+
+    def render(self):
+        """
+        Renders the file to a temporary file, the original is replaced by commit.
+        """
+        with io.open(self.path, 'r', encoding = 'utf-8', newline = '') as source:
+            with io.open(self.tmpPath, 'w', encoding = 'utf-8', newline = '') as target:
+                for (lineNumber, line) in enumerate(source, 1):
+                    content = line[:-1] if line.endswith('\n') else line
+                    rendered = self.renderLine(content)
+                    if rendered != content:
+                        self.changes.append((lineNumber, content, rendered))
+                    target.write(rendered + line[len(content):])
+        shutil.copymode(self.path, self.tmpPath)
+        for substitution in self.substitutions:
+            if not substitution.matched:
+                logger.debug('Substitution did not match in %s: %s', self.path, substitution.expression)
+
+    def commit(self):
+        os.rename(self.tmpPath, self.path)
+
+    def abort(self):
+        if os.path.exists(self.tmpPath):
+            os.unlink(self.tmpPath)
+
+    def report(self):
+        lines = ['%s: %d substitutions, %d lines changed' % (self.path, len(self.substitutions), len(self.changes))]
+        for (lineNumber, original, rendered) in self.changes:
+            lines.append('@@ line %d' % (lineNumber))
+            lines.append('-' + original)
+            lines.extend('+' + renderedLine for renderedLine in rendered.split('\n'))
+        return lines
+
+
+def readPlan(planFile):
+    """
+    Reads the plan of NUL separated file and sed expression pairs, returning
+    the expressions grouped by the file in the order they were planned.
+    """
+    with io.open(planFile, 'r', encoding = 'utf-8', newline = '') as plan:
+        items = plan.read().split('\0')
+    if items and items[-1] == '':
+        items.pop()
+    if len(items) % 2:
+        raise ValueError('Incomplete plan %s' % (planFile))
+    files = OrderedDict()
+    for index in range(0, len(items), 2):
+        files.setdefault(items[index], []).append(items[index + 1])
+    return files
+
+def renderPlan(planFile):
+    renderers = [ConfigRenderer(path, expressions) for path, expressions in readPlan(planFile).items()]
+    try:
+        for renderer in renderers:
+            renderer.render()
+    except Exception:
+        for renderer in renderers:
+            renderer.abort()
+        raise
+    for renderer in renderers:
+        renderer.commit()
+    return renderers
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Applies the planned sed substitutions of the configuration files in one pass per file")
+    parser.add_argument("plan", help = "File with NUL separated pairs of the file to change and the sed substitution")
+    parser.add_argument("--report", required = False, type = str, default = None, help = "File to write the report of the changed lines to")
+    parser.add_argument("-l", "--loglevel", default="CRITICAL", help="Log level",
+        choices=["debug", "DEBUG", "info", "INFO", "warning", "WARNING", "error", "ERROR", "critical", "CRITICAL"])
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level = args.loglevel.upper())
+    logger = logging.getLogger(__name__)
+
+    logger.debug("Starting config render with args: %s", args)
+
+    try:
+        renderers = renderPlan(args.plan)
+    except (ValueError, re.error) as e:
+        logger.critical('Unable to render the plan %s: %s', args.plan, e)
+        exit(1)
+
+    if args.report:
+        with io.open(args.report, 'a', encoding = 'utf-8') as report:
+            for renderer in renderers:
+                report.write('\n'.join(renderer.report()) + '\n')
+
+    exit(0)
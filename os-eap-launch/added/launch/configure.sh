@@ -46,8 +46,18 @@
 # modules may not support env files, or may require configuration of "singleton"
 # type entries, which should only be processed once.
 #
+# When CONFIG_CACHE_DIR is set, the result of the configuration is cached there
+# (see config-cache.sh) and the modules are not executed again by a restarted
+# container, except those listed in CONFIG_CACHE_RERUN_SCRIPTS.
+#
+# When LAUNCH_TRACE is true, the time spent by each phase and module function
+# is recorded and summarized (see launch-trace.sh).
+#
 
 source $JBOSS_HOME/bin/launch/logging.sh
+source $JBOSS_HOME/bin/launch/config-render.sh
+source $JBOSS_HOME/bin/launch/config-cache.sh
+source $JBOSS_HOME/bin/launch/launch-trace.sh
 
 # clear functions from any previous module
 function prepareModule() {
@@ -67,7 +77,7 @@ function prepareModule() {
 function executeModule() {
   source $1;
   if [ -n "$(type -t $2)" ]; then
-    eval $2
+    trace_run "${1##*/}:$2" eval $2
   fi
 }
 
@@ -108,7 +118,31 @@ function processEnvFiles() {
   fi
 }
 
-executeModules preConfigure
-executeModules configure
-processEnvFiles
-executeModules postConfigure
+# Executes the modules which are not skipped when the configuration is cached
+function executeRerunModules() {
+  for module in ${CONFIGURE_SCRIPTS[@]}; do
+    if [[ " ${CONFIG_CACHE_RERUN_SCRIPTS[@]} " == *" $(basename $module) "* ]]; then
+      prepareModule
+      executeModule $module configure
+    fi
+  done
+}
+
+if trace_run restore_config_cache restore_config_cache; then
+  trace_run executeRerunModules executeRerunModules
+else
+  start_config_cache
+  # the substitutions done by the modules through sed_config are applied at once
+  start_config_render
+
+  trace_run preConfigure executeModules preConfigure
+  trace_run configure executeModules configure
+  trace_run processEnvFiles processEnvFiles
+
+  # rendered before postConfigure, the extensions (postconfigure.sh) edit the final
+  # configuration and the substitutions done from now on are applied immediately
+  trace_run render_config_files render_config_files
+  trace_run postConfigure executeModules postConfigure
+
+  trace_run store_config_cache store_config_cache
+fi
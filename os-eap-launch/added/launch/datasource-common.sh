@@ -58,7 +58,7 @@ function inject_datasources_common() {
 
   tx_datasource="$(inject_tx_datasource)"
   if [ -n "$tx_datasource" ]; then
-    sed -i "s|<!-- ##DATASOURCES## -->|${tx_datasource}<!-- ##DATASOURCES## -->|" $CONFIG_FILE
+    sed_config "s|<!-- ##DATASOURCES## -->|${tx_datasource}<!-- ##DATASOURCES## -->|" $CONFIG_FILE
   fi
 
   inject_external_datasources
@@ -79,7 +79,7 @@ function inject_internal_datasources() {
   if [ "${#db_backends[@]}" -eq "0" ]; then
     datasource=$(generate_datasource)
     if [ -n "$datasource" ]; then
-      sed -i "s|<!-- ##DATASOURCES## -->|${datasource}<!-- ##DATASOURCES## -->|" $CONFIG_FILE
+      sed_config "s|<!-- ##DATASOURCES## -->|${datasource}<!-- ##DATASOURCES## -->|" $CONFIG_FILE
     fi
 
     if [ -z "$defaultDatasourceJndi" ]; then
@@ -121,9 +121,9 @@ function inject_internal_datasources() {
   fi
 
   # new format replacement : datasource="##DEFAULT_DATASOURCE##"
-  sed -i "s|datasource=\"##DEFAULT_DATASOURCE##\"|${defaultDatasource}|" $CONFIG_FILE
+  sed_config "s|datasource=\"##DEFAULT_DATASOURCE##\"|${defaultDatasource}|" $CONFIG_FILE
   # old format (for compat)
-  sed -i "s|<!-- ##DEFAULT_DATASOURCE## -->|${defaultDatasource}|" $CONFIG_FILE
+  sed_config "s|<!-- ##DEFAULT_DATASOURCE## -->|${defaultDatasource}|" $CONFIG_FILE
 }
 
 function inject_external_datasources() {
@@ -345,7 +345,7 @@ function inject_timer_service() {
                     <!-- ##DATASTORES## -->\
                 </data-stores>\
             </timer-service>"
-  sed -i "s|<!-- ##TIMER_SERVICE## -->|${timerservice}|" $CONFIG_FILE
+  sed_config "s|<!-- ##TIMER_SERVICE## -->|${timerservice}|" $CONFIG_FILE
 }
 
 # Arguments:
@@ -361,7 +361,7 @@ function inject_datastore() {
 
   local datastore="<database-data-store name=\"${servicename}_ds\" datasource-jndi-name=\"${jndi_name}\" database=\"${databasename}\" partition=\"${servicename}_part\" ${refresh_interval}/>\
         <!-- ##DATASTORES## -->"
-  sed -i "s|<!-- ##DATASTORES## -->|${datastore}|" $CONFIG_FILE
+  sed_config "s|<!-- ##DATASTORES## -->|${datastore}|" $CONFIG_FILE
 }
 
 function map_properties() {
@@ -470,6 +470,10 @@ function inject_datasource() {
 
   # max pool size environment variable name format: [NAME]_[DATABASE_TYPE]_MAX_POOL_SIZE
   max_pool_size=$(find_env "${prefix}_MAX_POOL_SIZE")
+  # default sized by autotune.sh, never below the min pool size
+  if [ -z "$max_pool_size" ] && [ -n "$AUTOTUNE_MAX_POOL_SIZE" ]; then
+    max_pool_size=$(( ${min_pool_size:-0} > AUTOTUNE_MAX_POOL_SIZE ? ${min_pool_size:-0} : AUTOTUNE_MAX_POOL_SIZE ))
+  fi
 
   # jta environment variable name format: [NAME]_[DATABASE_TYPE]_JTA
   jta=$(find_env "${prefix}_JTA" true)
@@ -525,7 +529,7 @@ function inject_datasource() {
     datasource=$(generate_datasource "${service,,}-${prefix}" "$jndi" "$username" "$password" "$host" "$port" "$database" "$checker" "$sorter" "$driver" "$service_name" "$jta" "$validate" "$url")
 
     if [ -n "$datasource" ]; then
-      sed -i "s|<!-- ##DATASOURCES## -->|${datasource}\n<!-- ##DATASOURCES## -->|" $CONFIG_FILE
+      sed_config "s|<!-- ##DATASOURCES## -->|${datasource}\n<!-- ##DATASOURCES## -->|" $CONFIG_FILE
     fi
   fi
 }
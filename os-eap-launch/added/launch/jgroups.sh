@@ -84,5 +84,5 @@ function configure_jgroups_encryption() {
       ;;
   esac
 
-  sed -i "s|<!-- ##JGROUPS_ENCRYPT## -->|$jgroups_encrypt|g" "$CONFIG_FILE"
+  sed_config "s|<!-- ##JGROUPS_ENCRYPT## -->|$jgroups_encrypt|g" "$CONFIG_FILE"
 }
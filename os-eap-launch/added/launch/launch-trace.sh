@@ -0,0 +1,73 @@
+#!/bin/sh
+# Opt-in tracing of the launch scripts. When LAUNCH_TRACE is "true", the steps run
+# by trace_run record their wall time and the number of processes (tasks) created
+# while they run. The records are appended to LAUNCH_TRACE_FILE, which is exported
+# so the scripts sourced by standalone.sh (standalone.conf) add to the same trace.
+# trace_report writes a JSON timeline and logs the slowest steps.
+
+source $JBOSS_HOME/bin/launch/logging.sh
+
+function is_trace_enabled() {
+  [ "${LAUNCH_TRACE^^}" = "TRUE" ]
+}
+
+if is_trace_enabled && [ -z "${LAUNCH_TRACE_FILE}" ]; then
+  export LAUNCH_TRACE_FILE="/tmp/launch-trace-$$.jsonl"
+  : > "${LAUNCH_TRACE_FILE}"
+fi
+LAUNCH_TRACE_DEPTH=${LAUNCH_TRACE_DEPTH:-0}
+
+# Sets the variable to the current time in microseconds
+# $1 - variable name
+function trace_now() {
+  if [ -n "${EPOCHREALTIME}" ]; then
+    printf -v "$1" "%s" "${EPOCHREALTIME/./}"
+  else
+    printf -v "$1" "%s" "$(( $(date +%s%N) / 1000 ))"
+  fi
+}
+
+# Sets the variable to the last process id allocated in the pid namespace, i.e.
+# the increments are the number of processes and threads created
+# $1 - variable name
+function trace_last_pid() {
+  local load1 load5 load15 tasks
+  read load1 load5 load15 tasks "$1" < /proc/loadavg
+}
+
+# Runs the command in the current shell, tracing it as a step of the launch
+# $1 - step name
+# $@ - command, e.g. a function or "source script"
+function trace_run() {
+  local traceName="$1"
+  shift
+  if ! is_trace_enabled; then
+    "$@"
+    return
+  fi
+
+  local traceStart traceEnd traceStartPid traceEndPid
+  trace_last_pid traceStartPid
+  trace_now traceStart
+  LAUNCH_TRACE_DEPTH=$((LAUNCH_TRACE_DEPTH + 1))
+  "$@"
+  local traceStatus=$?
+  LAUNCH_TRACE_DEPTH=$((LAUNCH_TRACE_DEPTH - 1))
+  trace_now traceEnd
+  trace_last_pid traceEndPid
+
+  printf '{"name": "%s", "pid": %d, "depth": %d, "start": %d, "end": %d, "processes": %d, "status": %d}\n' \
+    "${traceName//\"/\\\"}" "$$" "${LAUNCH_TRACE_DEPTH}" "${traceStart}" "${traceEnd}" "$((traceEndPid - traceStartPid))" "${traceStatus}" >> "${LAUNCH_TRACE_FILE}"
+  return $traceStatus
+}
+
+# Writes the JSON timeline next to the trace file and logs the summary
+function trace_report() {
+  is_trace_enabled && [ -f "${LAUNCH_TRACE_FILE}" ] || return
+
+  local timeline="${LAUNCH_TRACE_FILE%.jsonl}.json"
+  local line
+  python $JBOSS_HOME/bin/launch/launchtrace.py "${LAUNCH_TRACE_FILE}" --timeline "${timeline}" --top "${LAUNCH_TRACE_TOP:-10}" | while IFS= read -r line; do
+    log_info "${line}"
+  done
+}
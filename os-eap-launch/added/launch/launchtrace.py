@@ -0,0 +1,114 @@
+#!/bin/python
+"""
+Copyright 2018 Red Hat, Inc.
+
+Red Hat licenses this file to you under the Apache License, version
+2.0 (the "License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+implied.  See the License for the specific language governing
+permissions and limitations under the License.
+"""
+
+import argparse
+import json
+import logging
+
+
+class TraceStep():
+    """
+    One step of the launch traced by trace_run (see launch-trace.sh). Times are
+    in microseconds, the self time excludes the nested steps.
+    """
+
+    def __init__(self, record):
+        self.name = record['name']
+        self.pid = record['pid']
+        self.depth = record['depth']
+        self.start = record['start']
+        self.end = record['end']
+        self.processes = record['processes']
+        self.status = record.get('status', 0)
+        self.selfTime = self.duration()
+        self.selfProcesses = self.processes
+
+    def duration(self):
+        return self.end - self.start
+
+    def contains(self, step):
+        return (step.pid == self.pid and step.depth == self.depth + 1
+            and self.start <= step.start and step.end <= self.end)
+
+
+def readTrace(traceFile):
+    steps = []
+    with open(traceFile, 'r') as trace:
+        for line in trace:
+            if line.strip():
+                try:
+                    steps.append(TraceStep(json.loads(line)))
+                except (ValueError, KeyError) as e:
+                    logger.warning('Skipping trace record "%s": %s', line.strip(), e)
+    steps.sort(key = lambda step: (step.start, step.depth))
+
+    for step in steps:
+        for child in steps:
+            if step.contains(child):
+                step.selfTime -= child.duration()
+                step.selfProcesses -= child.processes
+    return steps
+
+def writeTimeline(steps, timelineFile):
+    """
+    Writes the steps in the trace event format (chrome://tracing, Perfetto).
+    """
+    events = [{
+        'name': step.name,
+        'ph': 'X',
+        'ts': step.start,
+        'dur': step.duration(),
+        'pid': step.pid,
+        'tid': step.pid,
+        'args': {'processes': step.processes, 'selfTimeMs': step.selfTime / 1000.0, 'status': step.status}
+    } for step in steps]
+    with open(timelineFile, 'w') as timeline:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, timeline, indent = 1)
+
+def summary(steps, top):
+    if not steps:
+        return ['Launch trace is empty']
+    total = max(step.end for step in steps) - min(step.start for step in steps)
+    lines = ['Launch trace: %d steps in %.0f ms, %d processes, slowest steps by self time:' % (len(steps), total / 1000.0,
+        sum(step.processes for step in steps if step.depth == 0))]
+    for step in sorted(steps, key = lambda step: step.selfTime, reverse = True)[:top]:
+        lines.append('  %8.1f ms self %8.1f ms total %5d processes  %s' % (step.selfTime / 1000.0, step.duration() / 1000.0,
+            step.selfProcesses, step.name))
+    return lines
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Summarizes the trace of the launch scripts recorded by launch-trace.sh")
+    parser.add_argument("trace", help = "The trace file with one JSON record per line")
+    parser.add_argument("--timeline", required = False, type = str, default = None, help = "File to write the JSON timeline to")
+    parser.add_argument("--top", required = False, type = int, default = 10, help = "Number of the slowest steps to print")
+    parser.add_argument("-l", "--loglevel", default="CRITICAL", help="Log level",
+        choices=["debug", "DEBUG", "info", "INFO", "warning", "WARNING", "error", "ERROR", "critical", "CRITICAL"])
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level = args.loglevel.upper())
+    logger = logging.getLogger(__name__)
+
+    steps = readTrace(args.trace)
+    if args.timeline:
+        writeTimeline(steps, args.timeline)
+    for line in summary(steps, args.top):
+        print(line)
+    if args.timeline:
+        print('Launch timeline written to %s' % (args.timeline))
+
+    exit(0)
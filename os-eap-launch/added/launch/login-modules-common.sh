@@ -20,6 +20,6 @@ function configure_login_modules() {
         else
             login_modules="<login-module code=\"$login_module_code\" flag=\"$login_module_flag\"/>"
         fi
-        sed -i "s|<!-- ##OTHER_LOGIN_MODULES## -->|${login_modules}<!-- ##OTHER_LOGIN_MODULES## -->|" "$CONFIG_FILE"
+        sed_config "s|<!-- ##OTHER_LOGIN_MODULES## -->|${login_modules}<!-- ##OTHER_LOGIN_MODULES## -->|" "$CONFIG_FILE"
     fi
 }
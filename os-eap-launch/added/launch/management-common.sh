@@ -12,5 +12,5 @@ function add_management_interface_realm() {
     else
         mgmt_iface_replace_str=" security-realm=\"ManagementRealm\">"
     fi
-    sed -i "s|><!-- ##MGMT_IFACE_REALM## -->|${mgmt_iface_replace_str}|" "$CONFIG_FILE"
+    sed_config "s|><!-- ##MGMT_IFACE_REALM## -->|${mgmt_iface_replace_str}|" "$CONFIG_FILE"
 }
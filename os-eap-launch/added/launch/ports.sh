@@ -16,6 +16,6 @@ function configure_port_offset() {
   jgroups_encrypt=""
 
   if [ -n "${PORT_OFFSET}" ]; then
-    sed -i "s|port-offset=\"0\"|port-offset=\"${PORT_OFFSET}\"|g" "$CONFIG_FILE"
+    sed_config "s|port-offset=\"0\"|port-offset=\"${PORT_OFFSET}\"|g" "$CONFIG_FILE"
   fi
 }
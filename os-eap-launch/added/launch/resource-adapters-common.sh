@@ -190,7 +190,7 @@ function inject_resource_adapters_common() {
 
   if [ -n "$resource_adapters" ]; then
     resource_adapters=$(echo "${resource_adapters}" | sed -e "s/localhost/${hostname}/g")
-    sed -i "s|<!-- ##RESOURCE_ADAPTERS## -->|${resource_adapters}<!-- ##RESOURCE_ADAPTERS## -->|" $CONFIG_FILE
+    sed_config "s|<!-- ##RESOURCE_ADAPTERS## -->|${resource_adapters}<!-- ##RESOURCE_ADAPTERS## -->|" $CONFIG_FILE
   fi
 }
 
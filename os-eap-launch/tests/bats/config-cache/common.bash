@@ -0,0 +1,26 @@
+export JBOSS_HOME=$BATS_TMPDIR/jboss_home
+export CONFIG_FILE=$JBOSS_HOME/standalone/configuration/standalone-openshift.xml
+export CONFIG_CACHE_DIR=$BATS_TMPDIR/config-cache
+
+mkdir -p $JBOSS_HOME/bin/launch
+cp $BATS_TEST_DIRNAME/../../../../jboss/container/util/logging/bash/artifacts/opt/jboss/container/util/logging/logging.sh $JBOSS_HOME/bin/launch
+cp $BATS_TEST_DIRNAME/../../../added/launch/config-render.sh $JBOSS_HOME/bin/launch
+cp $BATS_TEST_DIRNAME/../../../added/launch/configrender.py $JBOSS_HOME/bin/launch
+cp $BATS_TEST_DIRNAME/../../../added/launch/configure.sh $JBOSS_HOME/bin/launch
+cp $BATS_TEST_DIRNAME/../../../added/launch/config-cache.sh $JBOSS_HOME/bin/launch
+cp $BATS_TEST_DIRNAME/../../../added/launch/launch-trace.sh $JBOSS_HOME/bin/launch
+cp $BATS_TEST_DIRNAME/../../../../os-eap64-launch/added/launch/standalone.sh $JBOSS_HOME/bin/launch
+
+mkdir -p $JBOSS_HOME/standalone/configuration
+
+setup() {
+  rm -rf $CONFIG_CACHE_DIR
+  reset_container
+}
+
+# Resets the files of the image, as a restarted container starts with a fresh writable layer
+reset_container() {
+  cp $BATS_TEST_DIRNAME/../../../../os-eap71-openshift/added/standalone-openshift.xml $CONFIG_FILE
+  printf 'DEBUG_MODE=false\nDEBUG_PORT="8787"\n' > $JBOSS_HOME/bin/standalone.sh
+  printf 'JAVA_OPTS="-Xms64m -XX:MaxPermSize=256m"\n' > $JBOSS_HOME/bin/standalone.conf
+}
@@ -0,0 +1,29 @@
+#!/usr/bin/env bats
+
+load common
+
+@test "configure.sh: Should run the rerun modules when the configuration is restored from the cache" {
+  cat > $JBOSS_HOME/bin/launch/config-cache-module.sh <<'MODULE'
+function configure() {
+  echo configured >> $BATS_TMPDIR/config-cache-module.log
+  sed_config "s|##AUTO_DEPLOY_EXPLODED##|true|" "$CONFIG_FILE"
+}
+MODULE
+  rm -f $BATS_TMPDIR/config-cache-module.log
+  CONFIGURE_SCRIPTS=( $JBOSS_HOME/bin/launch/config-cache-module.sh $JBOSS_HOME/bin/launch/standalone.sh )
+
+  run source $JBOSS_HOME/bin/launch/configure.sh
+  [ "$status" -eq 0 ]
+  reset_container
+  run source $JBOSS_HOME/bin/launch/configure.sh
+  [ "$status" -eq 0 ]
+  rm -f $JBOSS_HOME/bin/launch/config-cache-module.sh
+
+  [[ "$output" == *"Configuration restored from the cache"* ]]
+  [ "$(cat $BATS_TMPDIR/config-cache-module.log)" = "configured" ]
+  grep -q 'auto-deploy-exploded="true"' "$CONFIG_FILE"
+  grep -q 'DEBUG_MODE="${DEBUG:-false}"' $JBOSS_HOME/bin/standalone.sh
+  grep -q 'DEBUG_PORT="${DEBUG_PORT:-8787}"' $JBOSS_HOME/bin/standalone.sh
+  run grep -q 'MaxPermSize' $JBOSS_HOME/bin/standalone.conf
+  [ "$status" -ne 0 ]
+}
@@ -0,0 +1,26 @@
+export JBOSS_HOME=$BATS_TMPDIR/jboss_home
+export CONFIG_FILE=$JBOSS_HOME/standalone/configuration/standalone-openshift.xml
+export EXPECTED_FILE=$BATS_TMPDIR/standalone-openshift-expected.xml
+
+mkdir -p $JBOSS_HOME/bin/launch
+cp $BATS_TEST_DIRNAME/../../../../jboss/container/util/logging/bash/artifacts/opt/jboss/container/util/logging/logging.sh $JBOSS_HOME/bin/launch
+cp $BATS_TEST_DIRNAME/../../../added/launch/config-render.sh $JBOSS_HOME/bin/launch
+cp $BATS_TEST_DIRNAME/../../../added/launch/configrender.py $JBOSS_HOME/bin/launch
+cp $BATS_TEST_DIRNAME/../../../added/launch/configure.sh $JBOSS_HOME/bin/launch
+cp $BATS_TEST_DIRNAME/../../../added/launch/config-cache.sh $JBOSS_HOME/bin/launch
+cp $BATS_TEST_DIRNAME/../../../added/launch/launch-trace.sh $JBOSS_HOME/bin/launch
+cp $BATS_TEST_DIRNAME/../../../../os-eap-extensions/added/configure_extensions.sh $JBOSS_HOME/bin/launch
+
+mkdir -p $JBOSS_HOME/standalone/configuration
+source $JBOSS_HOME/bin/launch/config-render.sh
+
+setup() {
+  cp $BATS_TEST_DIRNAME/../../../../os-eap71-openshift/added/standalone-openshift.xml $CONFIG_FILE
+  cp $CONFIG_FILE $EXPECTED_FILE
+}
+
+# Applies the substitution to the expected file by sed and queues it for the config file
+substitute() {
+  sed -i "$1" "$EXPECTED_FILE"
+  sed_config "$1" "$CONFIG_FILE"
+}
@@ -0,0 +1,115 @@
+#!/usr/bin/env bats
+
+load common
+
+@test "render_config_files: Should render the same result as applying the substitutions one by one" {
+  start_config_render
+  substitute "s|<!-- ##DATASOURCES## -->|<datasource jndi-name=\"java:/ds1\"/>\n<!-- ##DATASOURCES## -->|"
+  substitute "s|<!-- ##DATASOURCES## -->|<datasource jndi-name=\"java:/ds2\"/><!-- ##DATASOURCES## -->|"
+  substitute "s|datasource=\"##DEFAULT_DATASOURCE##\"|datasource=\"java:/ds1\"|"
+  substitute "s|##AUTO_DEPLOY_EXPLODED##|false|"
+  substitute "s|port-offset=\"0\"|port-offset=\"100\"|g"
+  substitute "s|<!-- ##JGROUPS_AUTH## -->|<auth \&amp; more/>|g"
+  render_config_files
+
+  run diff "$EXPECTED_FILE" "$CONFIG_FILE"
+  [ "$status" -eq 0 ]
+  [ -z "$CONFIG_RENDER_PLAN" ]
+}
+
+@test "render_config_files: Should expand the POSIX character classes like sed" {
+  start_config_render
+  substitute "s|[[:space:]]*<!-- ##DATASOURCES## -->|<!-- DATASOURCES -->|"
+  substitute "s|[^[:alnum:][:space:]]*##JGROUPS_ENCRYPT##[[:punct:]]*|JGROUPS_ENCRYPT|"
+  render_config_files
+
+  run diff "$EXPECTED_FILE" "$CONFIG_FILE"
+  [ "$status" -eq 0 ]
+  grep -q '^<!-- DATASOURCES -->' "$CONFIG_FILE"
+}
+
+@test "render_config_files: Should end the bracket expression after the character class like sed" {
+  echo 'a]x b]x' | tee -a "$EXPECTED_FILE" >> "$CONFIG_FILE"
+
+  start_config_render
+  substitute "s|[[:alpha:]]]x|Z|g"
+  render_config_files
+
+  run diff "$EXPECTED_FILE" "$CONFIG_FILE"
+  [ "$status" -eq 0 ]
+  grep -q '^Z Z$' "$CONFIG_FILE"
+}
+
+@test "render_config_files: Should match the word boundaries like sed" {
+  start_config_render
+  substitute "s|\<port\>|PORT|g"
+  substitute "s|offset\>|OFFSET|g"
+  render_config_files
+
+  run diff "$EXPECTED_FILE" "$CONFIG_FILE"
+  [ "$status" -eq 0 ]
+  grep -q 'PORT-OFFSET="0"' "$CONFIG_FILE"
+}
+
+@test "render_config_files: Should apply the unsupported bracket expressions by sed" {
+  start_config_render
+  substitute "s|[[=a=]]uto-deploy-exploded=\"##AUTO_DEPLOY_EXPLODED##\"|auto-deploy-exploded=\"true\"|"
+  substitute "s|[[.p.]]ort-offset=\"0\"|port-offset=\"100\"|g"
+  render_config_files
+
+  run diff "$EXPECTED_FILE" "$CONFIG_FILE"
+  [ "$status" -eq 0 ]
+  grep -q 'auto-deploy-exploded="true"' "$CONFIG_FILE"
+}
+
+@test "render_config_files: Should substitute within the address ranges like sed" {
+  start_config_render
+  substitute "/<subsystem xmlns=\"urn:jboss:domain:ejb3:/,/<\/subsystem>/{/<thread-pool name=\"default\"/,/<\/thread-pool>/{s|<max-threads count=\"[^\"]*\"|<max-threads count=\"4\"|}}"
+  substitute "/<socket-binding-group /,/<\/socket-binding-group>/s|port=\"\([0-9]*\)\"|port=\"1\1\"|"
+  substitute "/<core-threads /s|count=\"50\"|count=\"20\"|"
+  render_config_files
+
+  run diff "$EXPECTED_FILE" "$CONFIG_FILE"
+  [ "$status" -eq 0 ]
+  [ "$(grep -c '<max-threads count="4"/>' "$CONFIG_FILE")" = "1" ]
+}
+
+@test "render_config_files: Should write the report of the changed lines" {
+  CONFIG_RENDER_REPORT=$BATS_TMPDIR/config-render-report
+  rm -f "$CONFIG_RENDER_REPORT"
+
+  start_config_render
+  substitute "s|##AUTO_DEPLOY_EXPLODED##|true|"
+  render_config_files
+
+  grep -q "^+.*auto-deploy-exploded=\"true\"" "$CONFIG_RENDER_REPORT"
+}
+
+@test "sed_config: Should apply the substitution immediately when rendering is not started" {
+  sed_config "s|##AUTO_DEPLOY_EXPLODED##|true|" "$CONFIG_FILE"
+
+  grep -q 'auto-deploy-exploded="true"' "$CONFIG_FILE"
+}
+
+@test "configure.sh: Should render the substitutions before the extensions edit the configuration" {
+  mkdir -p $JBOSS_HOME/extensions
+  cat > $BATS_TMPDIR/config-render-module.sh <<'EOF'
+function configure() {
+  sed_config "s|<!-- ##DATASOURCES## -->|<datasource jndi-name=\"java:/ds1\"/><!-- ##DATASOURCES## -->|" "$CONFIG_FILE"
+}
+EOF
+  # like jboss-cli, rewrites the configuration without the markers
+  cat > $JBOSS_HOME/extensions/postconfigure.sh <<'EOF'
+#!/bin/sh
+sed -i -e 's|<!-- ##[A-Z_]*## -->||g' -e 's|java:/ds1|java:/ds1-extension|' "$CONFIG_FILE"
+EOF
+  chmod +x $JBOSS_HOME/extensions/postconfigure.sh
+
+  CONFIGURE_SCRIPTS=( $BATS_TMPDIR/config-render-module.sh $JBOSS_HOME/bin/launch/configure_extensions.sh )
+  run source $JBOSS_HOME/bin/launch/configure.sh
+  rm -rf $JBOSS_HOME/extensions $BATS_TMPDIR/config-render-module.sh
+
+  grep -q '<datasource jndi-name="java:/ds1-extension"/>' "$CONFIG_FILE"
+  run grep -q '##DATASOURCES##' "$CONFIG_FILE"
+  [ "$status" -ne 0 ]
+}
@@ -0,0 +1,178 @@
+#!/bin/python
+"""
+Copyright 2018 Red Hat, Inc.
+
+Red Hat licenses this file to you under the Apache License, version
+2.0 (the "License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+implied.  See the License for the specific language governing
+permissions and limitations under the License.
+"""
+
+import argparse
+import logging
+import os
+import zipfile
+
+from enum import Enum
+
+
+class CommandType(Enum):
+    """
+    Represents what could be done with the index.
+    BUILD: index classes of all jars under a directory
+    LOOKUP: print the jar containing a class
+    """
+
+    BUILD = 'build'
+    LOOKUP = 'lookup'
+
+    def __str__(self):
+        return self.value
+
+
+class JarIndex():
+    """
+    Index of classes to jars containing them. The index is a text file of class lines
+        C <class name> <jar id>
+    followed by jar lines
+        J <jar id> <modification time> <size> <jar path relative to the root directory>
+    The jar ids are zero padded so that all the lines are sorted, a lookup seeks
+    the class line and then the jar line with a binary search instead of reading
+    the whole index. Only the central directory of the jars is read when building
+    the index. A jar which modification time or size differ from the index makes
+    its classes stale.
+    """
+
+    def __init__(self, rootDir, indexFile):
+        self.rootDir = rootDir
+        self.indexFile = indexFile
+
+    def build(self):
+        jars = []
+        for dirPath, dirNames, fileNames in os.walk(self.rootDir):
+            dirNames.sort()
+            jars.extend(os.path.join(dirPath, fileName) for fileName in sorted(fileNames) if fileName.endswith('.jar'))
+
+        lines = []
+        classCount = 0
+        for jarId, jarPath in enumerate(jars):
+            try:
+                with zipfile.ZipFile(jarPath) as jar:
+                    names = jar.namelist()
+            except (zipfile.BadZipfile, IOError) as e:
+                logger.warning('Skipping jar "%s": %s', jarPath, e)
+                continue
+            stat = os.stat(jarPath)
+            lines.append('J %08d %d %d %s\n' % (jarId, int(stat.st_mtime), stat.st_size, os.path.relpath(jarPath, self.rootDir)))
+            for name in names:
+                if name.endswith('.class') and not name.startswith('META-INF/'):
+                    lines.append('C %s %08d\n' % (name[:-len('.class')].replace('/', '.'), jarId))
+                    classCount += 1
+        lines.sort()
+
+        tmpFile = self.indexFile + '.tmp'
+        with open(tmpFile, 'w') as index:
+            index.writelines(lines)
+        os.rename(tmpFile, self.indexFile)
+        logger.info('Indexed %s classes of %s jars to "%s"', classCount, len(jars), self.indexFile)
+
+    @staticmethod
+    def seek(index, size, prefix):
+        """
+        Returns the first line of the sorted index starting with the prefix, None if
+        there is no such line.
+        """
+        low = 0
+        high = size
+        while low < high:
+            middle = (low + high) // 2
+            index.seek(middle)
+            if middle > 0:
+                # skip the line the middle falls in, the next line starts after the middle
+                index.readline()
+            line = index.readline()
+            if not line or line >= prefix:
+                high = middle
+            else:
+                low = middle + 1
+        index.seek(low)
+        if low > 0:
+            index.readline()
+        line = index.readline()
+        return line if line.startswith(prefix) else None
+
+    def lookup(self, className):
+        """
+        Returns the absolute path of the jar containing the class, None if the class
+        is not in the index or the indexed jar has changed.
+        """
+        indexSize = os.path.getsize(self.indexFile)
+        with open(self.indexFile, 'r') as index:
+            classLine = self.seek(index, indexSize, 'C %s ' % (className))
+            if classLine is None:
+                logger.info('Class %s is not in the index "%s"', className, self.indexFile)
+                return None
+            jarId = classLine.split()[2]
+            jarLine = self.seek(index, indexSize, 'J %s ' % (jarId))
+        if jarLine is None:
+            logger.info('Jar %s of class %s is not in the index "%s"', jarId, className, self.indexFile)
+            return None
+
+        (kind, indexedJarId, mtime, size, path) = jarLine.rstrip('\n').split(' ', 4)
+        jarPath = os.path.join(self.rootDir, path)
+        try:
+            stat = os.stat(jarPath)
+        except OSError:
+            logger.info('Indexed jar "%s" does not exist', jarPath)
+            return None
+        if int(stat.st_mtime) != int(mtime) or stat.st_size != int(size):
+            logger.info('Indexed jar "%s" has changed', jarPath)
+            return None
+        return jarPath
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Indexes classes of the jars to avoid scanning all jars when looking for a class")
+    parser.add_argument("command", type = CommandType, choices=list(CommandType), help = "What to do with the index")
+    parser.add_argument("index", help = "The index file")
+    parser.add_argument("--root", required = False, type = str, default = os.getenv("JBOSS_HOME"), help = "Directory with the indexed jars, JBOSS_HOME by default")
+    parser.add_argument("--class", dest = "className", required = False, type = str, default = None, help = "Class name to look up (relevant with 'lookup')")
+    parser.add_argument("-l", "--loglevel", default="CRITICAL", help="Log level",
+        choices=["debug", "DEBUG", "info", "INFO", "warning", "WARNING", "error", "ERROR", "critical", "CRITICAL"])
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level = args.loglevel.upper())
+    logger = logging.getLogger(__name__)
+
+    logger.debug("Starting jar index command with args: %s", args)
+
+    if args.root is None:
+        logger.critical('--root or JBOSS_HOME has to be defined')
+        exit(1)
+
+    jarIndex = JarIndex(args.root, args.index)
+    if args.command == CommandType.BUILD:
+        jarIndex.build()
+    elif args.command == CommandType.LOOKUP:
+        if args.className is None:
+            logger.critical('command "%s" requires --class', args.command)
+            exit(1)
+        if not os.path.isfile(args.index):
+            logger.info('No index "%s"', args.index)
+            exit(1)
+        jarPath = jarIndex.lookup(args.className)
+        if jarPath is None:
+            exit(1)
+        print(jarPath)
+    else:
+        logger.critical('No handler for command %s', args.command)
+        exit(1)
+
+    exit(0)
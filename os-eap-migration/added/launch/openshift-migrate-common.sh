@@ -5,6 +5,81 @@ source ${JBOSS_HOME}/bin/launch/openshift-common.sh
 source ${JBOSS_HOME}/bin/probe_common.sh
 source /opt/partition/partitionPV.sh
 
+# Prints the jar containing the class, looked up in the index of the jars built with
+# the image, all the jars are scanned only if the index is missing or stale
+function findRecoveryJar() {
+  local className="$1"
+  local index="${JBOSS_HOME}/jar-class.index"
+
+  if ! python ${JBOSS_HOME}/bin/launch/jarindex.py lookup "${index}" --class "${className}" --root "${JBOSS_HOME}" 2>/dev/null; then
+    echo "$(date): Jar containing ${className} is not in the index ${index}, scanning ${JBOSS_HOME}" >&2
+    find "${JBOSS_HOME}" -name \*.jar | xargs grep -l "${className}" | head -n 1
+  fi
+}
+
+# Sets recoveryHost and recoveryPort of the recovery listener socket binding,
+# the three lookups are done in one management request when possible, jboss-cli
+# is used when the request fails
+function readRecoveryBinding() {
+  local binding
+  if binding=$(python ${JBOSS_HOME}/bin/launch/recoverywatch.py binding); then
+    read recoveryHost recoveryPort <<< "${binding}"
+    return
+  fi
+
+  local socketBinding=$(run_cli_cmd '/subsystem=transactions/:read-attribute(name="socket-binding")' | grep -w result | sed -e 's+^.*=> "++' -e 's+".*$++')
+  recoveryPort=$(run_cli_cmd '/socket-binding-group=standard-sockets/socket-binding='"${socketBinding}"'/:read-attribute(name="bound-port")' | grep -w result | sed -e 's+^.*=> ++')
+  recoveryHost=$(run_cli_cmd '/socket-binding-group=standard-sockets/socket-binding='"${socketBinding}"'/:read-attribute(name="bound-address")' | grep -w result | sed -e 's+^.*=> "++' -e 's+".*$++')
+}
+
+# Waits until the log-store contains no transaction, returns 0 when it happens before
+# the end time and the terminating file is not created. The log-store is probed by
+# recoverywatch.py on one management connection, jboss-cli is used only when the http
+# management interface is not usable.
+function waitForRecoveryCompletion() {
+  local endTime="$1"
+  local terminatingFile="$2"
+
+  python ${JBOSS_HOME}/bin/launch/recoverywatch.py wait --timeout $((endTime - $(date +'%s'))) \
+    --pause "${RECOVERY_PAUSE}" --terminating-file "${terminatingFile}"
+  local status=$?
+  [ $status -ne 2 ] && return $status
+
+  while [ $(date +'%s') -lt $endTime -a ! -f "${terminatingFile}" ] ; do
+    run_cli_cmd '/subsystem=transactions/log-store=log-store/:probe' > /dev/null 2>&1
+    local transactions="$(run_cli_cmd 'ls /subsystem=transactions/log-store=log-store/transactions')"
+    if [ -z "${transactions}" ] ; then
+      echo "$(date): No transactions to recover"
+      return 0
+    fi
+
+    echo "$(date): Waiting for the following transactions: ${transactions}"
+    sleep ${RECOVERY_PAUSE}
+  done
+  return 1
+}
+
+# Checks the log of the server instance for periodic recovery errors, used instead of
+# the pod log when migrations run concurrently so one instance does not fail the others.
+# parameters
+# - server log file
+# - size of the log file before the server was started, only the lines written since are checked
+function probeServerLogForRecoveryErrors() {
+  local logFile="$1"
+  local offset="${2:-0}"
+
+  # rotated since the server was started
+  [ -f "${logFile}" ] && [ $(stat -c %s "${logFile}") -lt ${offset} ] && offset=0
+
+  local line
+  line=$(tail -c +$((offset + 1)) "${logFile}" 2>/dev/null | grep -m 1 "ERROR.*Periodic Recovery")
+  if [ -n "${line}" ]; then
+    echo "Server log '${logFile}' contains periodic recovery errors: '${line}'"
+    return 1
+  fi
+  return 0
+}
+
 function runMigration() {
   local instanceDir=$1
 
@@ -12,14 +87,61 @@ function runMigration() {
   local count=$2
   [ "x$count" != "x" ] && export NODE_NAME="${NODE_NAME:-node}-${count}"
 
-  cp -f ${STANDALONE_XML_COPY} ${STANDALONE_XML}
+  local txOptions="-Dcom.arjuna.ats.arjuna.common.RecoveryEnvironmentBean.recoveryBackoffPeriod=1 -Dcom.arjuna.ats.arjuna.common.RecoveryEnvironmentBean.periodicRecoveryPeriod=1 -Dcom.arjuna.ats.jta.common.JTAEnvironmentBean.orphanSafetyInterval=1"
+  local terminatingFile="${JBOSS_HOME}/terminatingMigration${MIGRATION_SLOT:+-${MIGRATION_SLOT}}"
+  local serverLog serverLogOffset=0
+
+  if [ -n "${MIGRATION_SLOT}" ]; then
+    # running concurrently with other migrations (see migratePV), the configuration is rendered
+    # one migration at a time and then copied to be used only by this server instance
+    local migrationDir="$(dirname ${instanceDir})/migration"
+    local serverConfigDir="${migrationDir}/configuration"
+    mkdir -p "${migrationDir}"
+
+    exec 200> "${JBOSS_HOME}/standalone/migration-configure.lock"
+    flock 200
+
+    cp -f ${STANDALONE_XML_COPY} ${STANDALONE_XML}
+    source $JBOSS_HOME/bin/launch/configure.sh
+
+    rm -rf "${serverConfigDir}"
+    cp -r "$(dirname ${STANDALONE_XML})" "${serverConfigDir}"
+    rm -rf "${serverConfigDir}/standalone_xml_history" "${serverConfigDir}/$(basename ${STANDALONE_XML_COPY})"
+
+    # the deployment scanner writes its markers (.deployed, .failed, ...) next to the deployments,
+    # every server instance scans its own copy so a failed deployment fails only its own readiness
+    local deploymentsDir="${migrationDir}/deployments"
+    rm -rf "${deploymentsDir}"
+    mkdir -p "${deploymentsDir}"
+    if ! cp -rl "${JBOSS_HOME}/standalone/deployments/." "${deploymentsDir}" 2>/dev/null; then
+      # not hardlinked across file systems
+      rm -rf "${deploymentsDir}"
+      cp -r "${JBOSS_HOME}/standalone/deployments/." "${deploymentsDir}"
+    fi
+    find "${deploymentsDir}" -maxdepth 1 \( -name "*.isdeploying" -o -name "*.deployed" -o -name "*.failed" -o -name "*.pending" \
+      -o -name "*.isundeploying" -o -name "*.undeployed" \) -delete
+    local serverConfig="${serverConfigDir}/$(basename ${STANDALONE_XML})"
+    sed -i "s|<deployment-scanner\([^>]*\) path=\"deployments\" relative-to=\"jboss.server.base.dir\"|<deployment-scanner\\1 path=\"${deploymentsDir}\"|" "${serverConfig}"
+    if grep -q "<deployment-scanner[^>]* path=\"${deploymentsDir}\"" "${serverConfig}"; then
+      export MIGRATION_DEPLOYMENTS_DIR="${deploymentsDir}"
+    else
+      echo "WARNING: The deployment scanner of ${serverConfig} could not be set to ${deploymentsDir}, the deployments are shared by the concurrent migrations"
+    fi
 
-  source $JBOSS_HOME/bin/launch/configure.sh
+    flock -u 200
+    exec 200>&-
 
-  echo "Running $JBOSS_IMAGE_NAME image, version $JBOSS_IMAGE_VERSION"
+    txOptions="${txOptions} -Djboss.server.config.dir=${serverConfigDir} -Djboss.server.log.dir=${migrationDir}/log -Djboss.server.temp.dir=${migrationDir}/tmp"
+    # the log directory survives the reattempts, the errors of the previous servers are ignored
+    serverLog="${migrationDir}/log/server.log"
+    [ -f "${serverLog}" ] && serverLogOffset=$(stat -c %s "${serverLog}")
+  else
+    cp -f ${STANDALONE_XML_COPY} ${STANDALONE_XML}
 
-  local txOptions="-Dcom.arjuna.ats.arjuna.common.RecoveryEnvironmentBean.recoveryBackoffPeriod=1 -Dcom.arjuna.ats.arjuna.common.RecoveryEnvironmentBean.periodicRecoveryPeriod=1 -Dcom.arjuna.ats.jta.common.JTAEnvironmentBean.orphanSafetyInterval=1"
-  local terminatingFile="${JBOSS_HOME}/terminatingMigration"
+    source $JBOSS_HOME/bin/launch/configure.sh
+  fi
+
+  echo "Running $JBOSS_IMAGE_NAME image, version $JBOSS_IMAGE_VERSION"
 
   (runMigrationServer "$instanceDir" "${txOptions}") &
 
@@ -39,13 +161,12 @@ function runMigration() {
     local startTime=$(date +'%s')
     local endTime=$((startTime + ${RECOVERY_TIMEOUT} + 1))
 
-    local socketBinding=$(run_cli_cmd '/subsystem=transactions/:read-attribute(name="socket-binding")' | grep -w result | sed -e 's+^.*=> "++' -e 's+".*$++')
-    local recoveryPort=$(run_cli_cmd '/socket-binding-group=standard-sockets/socket-binding='"${socketBinding}"'/:read-attribute(name="bound-port")' | grep -w result | sed -e 's+^.*=> ++')
-    local recoveryHost=$(run_cli_cmd '/socket-binding-group=standard-sockets/socket-binding='"${socketBinding}"'/:read-attribute(name="bound-address")' | grep -w result | sed -e 's+^.*=> "++' -e 's+".*$++')
+    local recoveryHost recoveryPort
+    readRecoveryBinding
 
     if [ "${recoveryPort}" != "undefined" ] ; then
       local recoveryClass="com.arjuna.ats.arjuna.tools.RecoveryMonitor"
-      recoveryJar=$(find "${JBOSS_HOME}" -name \*.jar | xargs grep -l "${recoveryClass}")
+      recoveryJar=$(findRecoveryJar "${recoveryClass}")
       if [ -n "${recoveryJar}" ] ; then
         echo "$(date): Executing synchronous recovery scan for a first time"
         java -cp "${recoveryJar}" "${recoveryClass}" -host "${recoveryHost}" -port "${recoveryPort}" -timeout 1800000
@@ -56,26 +177,21 @@ function runMigration() {
     fi
   fi
 
-  # -- checking if the pod log is clean from errors (only if function of the particular name exists, provided by the os-partition module)
-  if [ $probeStatus -eq 0 ] && [ "$(type -t probePodLogForRecoveryErrors)" = 'function' ]; then
+  # -- checking if the log is clean from errors, the pod log is shared by the concurrent migrations
+  # thus their own server log is checked (otherwise only if function of the particular name exists,
+  # provided by the os-partition module)
+  if [ $probeStatus -eq 0 ] && [ -n "${serverLog}" ]; then
+    probeServerLogForRecoveryErrors "${serverLog}" "${serverLogOffset}"
+    probeStatus=$?
+    [ $probeStatus -ne 0 ] && echo "The migration server log contains periodic recovery errors, check it for details."
+  elif [ $probeStatus -eq 0 ] && [ "$(type -t probePodLogForRecoveryErrors)" = 'function' ]; then
     probePodLogForRecoveryErrors
     probeStatus=$?
     [ $probeStatus -ne 0 ] && echo "The migration container log contains periodic recovery errors, check it for details."
   fi
 
   if [ $probeStatus -eq 0 ] ; then
-    while [ $(date +'%s') -lt $endTime -a ! -f "${terminatingFile}" ] ; do
-      run_cli_cmd '/subsystem=transactions/log-store=log-store/:probe' > /dev/null 2>&1
-      local transactions="$(run_cli_cmd 'ls /subsystem=transactions/log-store=log-store/transactions')"
-      if [ -z "${transactions}" ] ; then
-        echo "$(date): No transactions to recover"
-        success=true
-        break
-      fi
-
-      echo "$(date): Waiting for the following transactions: ${transactions}"
-      sleep ${RECOVERY_PAUSE}
-    done
+    waitForRecoveryCompletion "${endTime}" "${terminatingFile}" && success=true
 
     if [ "${success}" = "true" ] ; then
       message="Finished, recovery terminated successfully"
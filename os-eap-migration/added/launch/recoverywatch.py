@@ -0,0 +1,218 @@
+#!/bin/python
+"""
+Copyright 2018 Red Hat, Inc.
+
+Red Hat licenses this file to you under the Apache License, version
+2.0 (the "License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+implied.  See the License for the specific language governing
+permissions and limitations under the License.
+"""
+
+import argparse
+import logging
+import os
+import requests
+import sys
+import time
+
+from collections import OrderedDict
+from enum import Enum
+
+sys.path.insert(0, os.path.join(os.getenv("JBOSS_HOME", ""), "bin", "probes"))
+from probe.dmr import DmrProbe
+
+# exit code signaling the management interface can't be used through http (e.g.
+# missing credentials), the caller may fall back to jboss-cli
+EXIT_TRANSPORT_UNUSABLE = 2
+
+
+class CommandType(Enum):
+    """
+    Represents what could be watched.
+    BINDING: print the host and the port of the recovery listener socket binding
+    WAIT: wait until there are no transactions in the log-store
+    """
+
+    BINDING = 'binding'
+    WAIT = 'wait'
+
+    def __str__(self):
+        return self.value
+
+
+class TransportError(Exception):
+    pass
+
+
+class OperationError(Exception):
+    pass
+
+
+class RecoveryWatch():
+    """
+    Watches the transaction recovery of a server through its http management
+    interface, reusing one keep-alive connection for all the requests.
+    """
+
+    LOG_STORE_ADDRESS = [{"subsystem": "transactions"}, {"log-store": "log-store"}]
+    MIN_PAUSE = 1
+
+    def __init__(self, timeout):
+        self.probe = DmrProbe()
+        self.probe.session = requests.Session()
+        self.timeout = timeout
+
+    def close(self):
+        self.probe.session.close()
+
+    def execute(self, request):
+        response = self.probe.postRequest(request, self.timeout)
+        if response.status_code in (401, 403):
+            raise TransportError("Authentication to the management interface failed, code: %s" % (response.status_code))
+        try:
+            result = response.json(object_pairs_hook = OrderedDict)
+        except ValueError:
+            raise TransportError("Unexpected response of the management interface, code: %s" % (response.status_code))
+        if result.get("outcome") != "success":
+            raise OperationError("Management operation %s failed: %s" % (request["operation"], result.get("failure-description")))
+        return result["result"]
+
+    def readRecoveryBinding(self):
+        """
+        Returns tuple of bound address and bound port of the socket binding used
+        by the recovery listener, the values are None when undefined.
+        """
+        steps = list(self.execute({
+            "operation": "composite",
+            "address": [],
+            "steps": [
+                {"operation": "read-attribute", "address": [{"subsystem": "transactions"}], "name": "socket-binding"},
+                {"operation": "read-resource", "address": [{"socket-binding-group": "standard-sockets"}, {"socket-binding": "*"}], "include-runtime": True}
+            ]
+        }).values())
+        socketBinding = steps[0]["result"]
+        for binding in steps[1]["result"]:
+            if binding["address"][-1]["socket-binding"] == socketBinding:
+                return (binding["result"].get("bound-address"), binding["result"].get("bound-port"))
+        logger.warning("Socket binding %s not found", socketBinding)
+        return (None, None)
+
+    def readTransactions(self):
+        """
+        Probes the log-store and returns ids of the transactions in it.
+        """
+        steps = list(self.execute({
+            "operation": "composite",
+            "address": [],
+            "steps": [
+                {"operation": "probe", "address": RecoveryWatch.LOG_STORE_ADDRESS},
+                {"operation": "read-children-names", "address": RecoveryWatch.LOG_STORE_ADDRESS, "child-type": "transactions"}
+            ]
+        }).values())
+        return steps[1]["result"] or []
+
+    @staticmethod
+    def nextPause(pause, remaining, rate, maxPause):
+        """
+        Polls sooner when the records are being recovered, close to the expected
+        completion, and backs off up to maxPause while nothing is recovered.
+        """
+        if rate:
+            return min(maxPause, max(RecoveryWatch.MIN_PAUSE, remaining / rate / 2))
+        return min(maxPause, pause * 2)
+
+    def waitForRecovery(self, timeout, maxPause, terminatingFile):
+        """
+        Returns True when there is no transaction in the log-store before the timeout.
+        """
+        startTime = time.time()
+        deadline = startTime + timeout
+        pause = RecoveryWatch.MIN_PAUSE
+        (previousCount, previousTime) = (None, None)
+        initialCount = None
+        while time.time() < deadline and not (terminatingFile and os.path.exists(terminatingFile)):
+            try:
+                transactions = self.readTransactions()
+            except (OperationError, requests.exceptions.RequestException) as e:
+                # the server may be restarting or busy, retried until the timeout
+                logger.warning("%s", e)
+                pause = RecoveryWatch.nextPause(pause, None, None, maxPause)
+                time.sleep(max(0, min(pause, deadline - time.time())))
+                continue
+            now = time.time()
+            if not transactions:
+                print("%s: No transactions to recover" % (time.ctime(now)))
+                return True
+
+            count = len(transactions)
+            if initialCount is None:
+                initialCount = count
+            rate = None if previousCount is None else max(0, previousCount - count) / (now - previousTime)
+            totalRate = float(max(0, initialCount - count)) / max(now - startTime, 1)
+            print("%s: Waiting for %d transactions, %d recovered, %.2f records/s: %s" % (time.ctime(now), count,
+                initialCount - count, totalRate, " ".join(transactions)))
+
+            pause = RecoveryWatch.nextPause(pause, count, rate, maxPause)
+            logger.debug("Next log-store probe in %ss", pause)
+            (previousCount, previousTime) = (count, now)
+            time.sleep(max(0, min(pause, deadline - time.time())))
+        return False
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Watches the transaction recovery of a server through its http management interface")
+    parser.add_argument("command", type = CommandType, choices=list(CommandType), help = "What to watch")
+    parser.add_argument("--timeout", required = False, type = float, default = 360,
+        help = "Number of seconds to wait for the recovery (relevant with 'wait')")
+    parser.add_argument("--pause", required = False, type = float, default = 10,
+        help = "Maximal number of seconds between checks of the log-store (relevant with 'wait')")
+    parser.add_argument("--terminating-file", required = False, type = str, default = None,
+        help = "File which existence stops the waiting (relevant with 'wait')")
+    parser.add_argument("--request-timeout", required = False, type = float, default = 10,
+        help = "Number of seconds to wait for a response of the server")
+    parser.add_argument("-l", "--loglevel", default="CRITICAL", help="Log level",
+        choices=["debug", "DEBUG", "info", "INFO", "warning", "WARNING", "error", "ERROR", "critical", "CRITICAL"])
+
+    args = parser.parse_args()
+
+    # don't spam warnings (e.g. when not verifying ssl connections)
+    logging.captureWarnings(True)
+    logging.basicConfig(level = args.loglevel.upper())
+    logger = logging.getLogger(__name__)
+
+    logger.debug("Starting recovery watch with args: %s", args)
+
+    watch = RecoveryWatch(args.request_timeout)
+    if not watch.probe.user:
+        logger.error("No credentials for the management interface")
+        exit(EXIT_TRANSPORT_UNUSABLE)
+
+    try:
+        if args.command == CommandType.BINDING:
+            (host, port) = watch.readRecoveryBinding()
+            print("%s %s" % (host or "undefined", "undefined" if port is None else port))
+            success = True
+        elif args.command == CommandType.WAIT:
+            success = watch.waitForRecovery(args.timeout, args.pause, args.terminating_file)
+        else:
+            logger.critical('No handler for command %s', args.command)
+            exit(1)
+    except TransportError as e:
+        logger.error("%s", e)
+        exit(EXIT_TRANSPORT_UNUSABLE)
+    except OperationError as e:
+        sys.stderr.write("%s: %s\n" % (time.ctime(), e))
+        exit(1)
+    except requests.exceptions.RequestException as e:
+        sys.stderr.write("%s: Failed to connect to the server: %s\n" % (time.ctime(), e))
+        exit(1)
+    finally:
+        watch.close()
+
+    exit(0 if success else 1)
@@ -7,3 +7,9 @@ ADDED_DIR=${SCRIPT_DIR}/added
 # Add custom launch script and dependent scripts/libraries/snippets
 mkdir -p ${JBOSS_HOME}/bin/launch
 cp -r ${ADDED_DIR}/launch/* ${JBOSS_HOME}/bin/launch
+
+# Index the classes of the distribution jars, migration looks up the jar of the
+# recovery monitor in the index instead of scanning all the jars, the index is
+# kept out of bin/launch which is hashed by the configuration cache on each start
+python ${JBOSS_HOME}/bin/launch/jarindex.py build "${JBOSS_HOME}/jar-class.index" --root "${JBOSS_HOME}" -l info \
+  || echo "WARNING: unable to index the jars, the jars will be scanned during migration"
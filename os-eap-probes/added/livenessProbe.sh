@@ -10,6 +10,7 @@ fi
 OUTPUT=/tmp/liveness-output
 ERROR=/tmp/liveness-error
 LOG=/tmp/liveness-log
+HISTORY=/tmp/liveness-history
 
 # liveness failure before management interface is up will cause the probe to fail
 COUNT=30
@@ -37,11 +38,28 @@ fi
 # at the same time
 sleep 5
 
+# probe several server instances in one process, e.g. the migration servers
+for target in $PROBE_TARGETS; do
+    TARGET_OPTIONS="$TARGET_OPTIONS --target $target"
+done
+
+# results of the probe runs, reported by probes/probehistory.py
+HISTORY_OPTIONS="--history $HISTORY"
+
 if [ "$DEBUG_SCRIPT" = "true" ]; then
     DEBUG_OPTIONS="--debug --logfile $LOG --loglevel DEBUG"
 fi
 
-if python $JBOSS_HOME/bin/probes/runner.py -c READY -c NOT_READY --maxruns $COUNT --sleep $SLEEP $DEBUG_OPTIONS $PROBE_IMPL; then
+if [ "${PROBE_DISABLE_HOT_THREADS,,}" != "true" ]; then
+    HOT_THREADS_OPTIONS="--hotthreads /tmp/liveness-hot-threads.json"
+fi
+
+# the probe, including the initial sleep, finishes and captures the hot threads
+# within the deadline, e.g. the timeoutSeconds of the liveness probe
+DEADLINE=${PROBE_LIVENESS_DEADLINE:-$((COUNT * SLEEP + 5))}
+DEADLINE_OPTIONS="--deadline $((DEADLINE > 6 ? DEADLINE - 5 : 1))"
+
+if python $JBOSS_HOME/bin/probes/runner.py -c READY -c NOT_READY --maxruns $COUNT --sleep $SLEEP $DEBUG_OPTIONS $HISTORY_OPTIONS $TARGET_OPTIONS $HOT_THREADS_OPTIONS $DEADLINE_OPTIONS $PROBE_IMPL; then
     exit 0
 fi
 
@@ -8,9 +8,25 @@ CLI_KILLTIME=30s
 
 EAP_7_WARNING="Warning! The CLI is running in a non-modular environment and cannot load commands from management extensions."
 
+# exit code of dmrcli.py when the http management interface can't be used (e.g. no
+# management user is configured), jboss-cli is launched instead
+DMR_CLI_FALLBACK=2
+
 run_cli_cmd() {
     cmd="$1"
 
+    # Avoid starting a JVM for every command, the http management interface
+    # listens on 9990 (+ PORT_OFFSET) on both EAP 6 and EAP 7. It requires a
+    # management user (the local authentication of jboss-cli is not available
+    # over http), without one python is not started only to fall back.
+    if [ -f "$JBOSS_HOME/bin/probes/dmrcli.py" ] && [ -n "${ADMIN_PASSWORD}" ] && [ -n "${ADMIN_USERNAME:-${DEFAULT_ADMIN_USERNAME}}" ]; then
+      python $JBOSS_HOME/bin/probes/dmrcli.py --timeout "${CLI_TIMEOUT%s}" "$cmd"
+      local status=$?
+      if [ $status -ne $DMR_CLI_FALLBACK ]; then
+        return $status
+      fi
+    fi
+
     #Default for EAP7
     cli_port=9990
     
@@ -32,12 +48,17 @@ is_eap7() {
     run_cli_cmd "version" | grep -q "^JBoss AS product: JBoss EAP 7"
 }
 
+# concurrent migrations (see openshift-migrate-common.sh) scan their own copy of the deployments
+deployments_dir() {
+    echo "${MIGRATION_DEPLOYMENTS_DIR:-/deployments}"
+}
+
 # Additional check necessary for EAP7, see CLOUD-615
 deployments_failed() {
-    ls -- /deployments/*failed >/dev/null 2>&1 || (is_eap7 && run_cli_cmd "deployment-info" | grep -q FAILED)
+    ls -- $(deployments_dir)/*failed >/dev/null 2>&1 || (is_eap7 && run_cli_cmd "deployment-info" | grep -q FAILED)
 }
 
 list_failed_deployments() {
-    ls -- /deployments/*failed >/dev/null 2>&1 && \
-        echo /deployments/*.failed | sed "s+^/deployments/\(.*\)\.failed$+\1+"
+    ls -- $(deployments_dir)/*failed >/dev/null 2>&1 && \
+        echo $(deployments_dir)/*.failed | sed "s+^$(deployments_dir)/\(.*\)\.failed$+\1+"
 }
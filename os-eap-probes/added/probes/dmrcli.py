@@ -0,0 +1,261 @@
+"""
+Copyright 2018 Red Hat, Inc.
+
+Red Hat licenses this file to you under the Apache License, version
+2.0 (the "License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+implied.  See the License for the specific language governing
+permissions and limitations under the License.
+"""
+
+import argparse
+import logging
+import os
+import re
+import requests
+
+from collections import OrderedDict
+
+from probe.dmr import DmrProbe
+
+try:
+    basestring
+except NameError:
+    basestring = str
+
+# exit code signaling the management interface can't be used through http (e.g.
+# missing credentials), the caller may fall back to jboss-cli
+EXIT_TRANSPORT_UNUSABLE = 2
+
+class CliCommandError(Exception):
+    pass
+
+class DmrCli(object):
+    """
+    Executes a subset of jboss-cli commands through the http management
+    interface used by the DmrProbe, printing the output in the format of
+    jboss-cli.  Supported are operation requests (e.g.
+    /subsystem=transactions/:read-attribute(name="socket-binding")), ls,
+    version and deployment-info commands.
+    """
+
+    OPERATION_PATTERN = re.compile(r'^(?P<address>[^:(]*):(?P<operation>[\w-]+)(\((?P<params>.*)\))?$')
+
+    def __init__(self, timeout = None, versionCache = None):
+        self.probe = DmrProbe()
+        self.logger = logging.getLogger(__name__)
+        self.timeout = timeout
+        self.versionCache = versionCache
+
+    def execute(self, command):
+        """
+        Executes the command, returning a tuple of the success and the output.
+        """
+
+        command = command.strip()
+        if command == "version":
+            return self.version()
+        if command == "deployment-info":
+            return self.deploymentInfo()
+        if command == "ls" or command.startswith("ls "):
+            return self.ls(command[2:].strip())
+        return self.operation(command)
+
+    def send(self, request):
+        response = self.probe.postRequest(request, self.timeout)
+        if response.status_code in (401, 403):
+            raise CliCommandError("Authentication to the management interface failed, code: %s" % (response.status_code))
+        try:
+            return response.json(object_pairs_hook = OrderedDict)
+        except ValueError:
+            raise CliCommandError("Unexpected response of the management interface, code: %s" % (response.status_code))
+
+    def operation(self, command):
+        match = DmrCli.OPERATION_PATTERN.match(command)
+        if not match:
+            raise ValueError("Unsupported command: " + command)
+        request = OrderedDict([("operation", match.group("operation")), ("address", parseAddress(match.group("address"))[0])])
+        request.update(parseParameters(match.group("params") or ""))
+        result = self.send(request)
+        return (result.get("outcome") == "success", formatDmr(result))
+
+    def ls(self, path):
+        (address, childType) = parseAddress(path)
+        if childType:
+            result = self.send({"operation": "read-children-names", "address": address, "child-type": childType})
+            if result.get("outcome") != "success":
+                return (False, formatDmr(result))
+            return (True, "\n".join(result["result"]))
+
+        result = self.send({"operation": "read-resource", "address": address, "include-runtime": True})
+        if result.get("outcome") != "success":
+            return (False, formatDmr(result))
+        types = self.send({"operation": "read-children-types", "address": address})
+        lines = list(types.get("result") or [])
+        for name, value in result["result"].items():
+            if name not in lines:
+                lines.append("%s=%s" % (name, formatCliValue(value)))
+        return (True, "\n".join(lines))
+
+    def version(self):
+        if self.versionCache and os.path.isfile(self.versionCache):
+            with open(self.versionCache) as cache:
+                return (True, cache.read())
+
+        result = self.send({
+            "operation": "composite",
+            "address": [],
+            "steps": [
+                {"operation": "read-attribute", "name": "release-version"},
+                {"operation": "read-attribute", "name": "product-name"},
+                {"operation": "read-attribute", "name": "product-version"}
+            ]
+        })
+        if result.get("outcome") != "success":
+            return (False, formatDmr(result))
+        (release, productName, productVersion) = [step["result"] for step in result["result"].values()]
+        output = "\n".join([
+            "JBoss Admin Command-line Interface",
+            "JBOSS_HOME: %s" % (os.getenv("JBOSS_HOME", "")),
+            "Release: %s" % (release),
+            "JBoss AS product: %s %s" % (productName, productVersion),
+            "JAVA_HOME: %s" % (os.getenv("JAVA_HOME", "")),
+            "os.name: %s" % (os.uname()[0]),
+            "os.version: %s" % (os.uname()[2])
+        ])
+
+        if self.versionCache:
+            # product of the server does not change during the life of the container
+            try:
+                with open(self.versionCache, "w") as cache:
+                    cache.write(output)
+            except IOError:
+                self.logger.warning("Unable to write version cache %s", self.versionCache)
+        return (True, output)
+
+    def deploymentInfo(self):
+        result = self.send({"operation": "read-resource", "address": [{"deployment": "*"}], "include-runtime": True})
+        if result.get("outcome") != "success":
+            return (False, formatDmr(result))
+        rows = [["NAME", "RUNTIME-NAME", "PERSISTENT", "ENABLED", "STATUS"]]
+        for deployment in result["result"]:
+            resource = deployment["result"]
+            rows.append([formatCliValue(resource.get(name)) for name in ["name", "runtime-name", "persistent", "enabled", "status"]])
+        widths = [max(len(row[column]) for row in rows) for column in range(len(rows[0]))]
+        return (True, "\n".join(" ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip() for row in rows))
+
+def parseAddress(path):
+    """
+    Parses CLI address (e.g. /subsystem=transactions/log-store=log-store/transactions)
+    returning DMR address and the trailing child type (None if not present).
+    """
+
+    address = []
+    childType = None
+    segments = [segment for segment in path.strip().split("/") if segment]
+    for index, segment in enumerate(segments):
+        if "=" in segment:
+            (key, value) = segment.split("=", 1)
+            address.append({key: value})
+        elif index == len(segments) - 1:
+            childType = segment
+        else:
+            raise ValueError("Unsupported address: " + path)
+    return (address, childType)
+
+def parseParameters(params):
+    """
+    Parses CLI operation parameters, e.g. name="socket-binding",include-defaults=true
+    """
+
+    parameters = OrderedDict()
+    for match in re.finditer(r'\s*([\w-]+)\s*=\s*("(?:[^"\\]|\\.)*"|[^,]*)\s*,?', params):
+        (name, value) = (match.group(1), match.group(2).strip())
+        if value.startswith('"'):
+            value = value[1:-1].replace('\\"', '"')
+        elif value in ("true", "false"):
+            value = value == "true"
+        elif re.match(r'^-?\d+$', value):
+            value = int(value)
+        parameters[name] = value
+    return parameters
+
+def formatCliValue(value):
+    if value is None:
+        return "undefined"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, basestring):
+        return value
+    return formatDmr(value)
+
+def formatDmr(value, indent = 0):
+    """
+    Formats the value in the DMR text format printed by jboss-cli.
+    """
+
+    padding = "    " * (indent + 1)
+    if isinstance(value, dict):
+        if not value:
+            return "{}"
+        items = ['%s"%s" => %s' % (padding, key, formatDmr(item, indent + 1)) for key, item in value.items()]
+        return "{\n" + ",\n".join(items) + "\n" + "    " * indent + "}"
+    if isinstance(value, list):
+        if not value:
+            return "[]"
+        items = [padding + formatDmr(item, indent + 1) for item in value]
+        return "[\n" + ",\n".join(items) + "\n" + "    " * indent + "]"
+    if value is None:
+        return "undefined"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, basestring):
+        return '"%s"' % (value.replace('"', '\\"'))
+    return str(value)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Executes jboss-cli commands through the http management interface printing jboss-cli compatible output")
+    parser.add_argument("-t", "--timeout", default = 10, type = float, help = "Number of seconds to wait for the server response.")
+    parser.add_argument("--version-cache", default = os.getenv("DMR_CLI_VERSION_CACHE", "/tmp/dmr-cli-version"), help = "File caching the output of the version command.")
+    parser.add_argument("--logfile", help = "Log file.")
+    parser.add_argument("--loglevel", default = "CRITICAL", choices = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"], help = "Log level.")
+    parser.add_argument("command", help = "The jboss-cli command to execute.")
+
+    args = parser.parse_args()
+
+    # don't spam warnings (e.g. when not verifying ssl connections)
+    logging.captureWarnings(True)
+
+    if args.logfile:
+        logging.basicConfig(filename = args.logfile, format = '%(asctime)s %(levelname)s [%(name)s] %(message)s', level = args.loglevel.upper())
+    else:
+        logging.basicConfig(level = args.loglevel.upper())
+
+    logger = logging.getLogger(__name__)
+
+    cli = DmrCli(args.timeout, args.version_cache)
+    if not cli.probe.user:
+        logger.error("No credentials for the management interface")
+        exit(EXIT_TRANSPORT_UNUSABLE)
+
+    try:
+        (success, output) = cli.execute(args.command)
+    except CliCommandError as e:
+        logger.error("%s", e)
+        exit(EXIT_TRANSPORT_UNUSABLE)
+    except ValueError as e:
+        logger.error("%s", e)
+        exit(EXIT_TRANSPORT_UNUSABLE)
+    except requests.exceptions.RequestException as e:
+        print("Failed to connect to the controller: %s" % (e))
+        exit(1)
+
+    if output:
+        print(output)
+    exit(0 if success else 1)
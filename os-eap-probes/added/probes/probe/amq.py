@@ -0,0 +1,203 @@
+"""
+Copyright 2018 Red Hat, Inc.
+
+Red Hat licenses this file to you under the Apache License, version
+2.0 (the "License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+implied.  See the License for the specific language governing
+permissions and limitations under the License.
+"""
+
+import json
+import logging
+import os
+import sys
+import xml.etree.ElementTree
+
+from urlparse import urlsplit
+
+from probe.api import qualifiedClassName, Probe, Status, Test
+from probe.jolokia import JolokiaProbe
+
+def readListeningPorts(tcpFiles = ["/proc/net/tcp", "/proc/net/tcp6"]):
+    """
+    Returns the set of the ports of the sockets in the LISTEN state.
+    """
+
+    ports = set()
+    for tcpFile in tcpFiles:
+        try:
+            with open(tcpFile, "r") as tcp:
+                # skip the header
+                next(tcp, None)
+                for line in tcp:
+                    contents = line.split(None, 4)
+                    if len(contents) > 3 and contents[3] == "0A":
+                        ports.add(int(contents[1].rsplit(":", 1)[1], 16))
+        except IOError:
+            pass
+    return ports
+
+class TransportConnectors(object):
+    """
+    The transport connectors configured in activemq.xml.  The ports are parsed
+    once and cached in a file, the cache is invalidated when the modification
+    time of the configuration changes.
+    """
+
+    NAMESPACES = {"core": "http://activemq.apache.org/schema/core"}
+
+    def __init__(self, configFile, cacheFile):
+        self.configFile = configFile
+        self.cacheFile = cacheFile
+        self.connectors = None
+        self.mtime = None
+        self.logger = logging.getLogger(qualifiedClassName(self))
+
+    def getPorts(self):
+        """
+        Returns list of (name, port) of the transport connectors, the port is
+        None when not defined by the uri.
+        """
+
+        mtime = os.path.getmtime(self.configFile)
+        if self.mtime == mtime:
+            return self.connectors
+        try:
+            with open(self.cacheFile, "r") as cache:
+                cached = json.load(cache)
+            if cached["configFile"] == self.configFile and cached["mtime"] == mtime:
+                (self.connectors, self.mtime) = ([tuple(connector) for connector in cached["connectors"]], mtime)
+                return self.connectors
+        except (IOError, ValueError, KeyError):
+            pass
+
+        self.logger.info("Parsing transport connectors from %s", self.configFile)
+        xmldoc = xml.etree.ElementTree.parse(self.configFile)
+        connectors = []
+        for transportConnector in xmldoc.findall("core:broker/core:transportConnectors/core:transportConnector", TransportConnectors.NAMESPACES):
+            connectors.append((transportConnector.get("name"), urlsplit(transportConnector.get("uri")).port))
+
+        try:
+            tmpFile = "%s.%d" % (self.cacheFile, os.getpid())
+            with open(tmpFile, "w") as cache:
+                json.dump({"configFile": self.configFile, "mtime": mtime, "connectors": connectors}, cache)
+            os.rename(tmpFile, self.cacheFile)
+        except (IOError, OSError):
+            self.logger.warning("Unable to cache the transport connectors in %s", self.cacheFile)
+        (self.connectors, self.mtime) = (connectors, mtime)
+        return connectors
+
+class TransportsListeningTest(Test):
+    """
+    Checks that something is listening on the ports of all transport connectors.
+    """
+
+    def __init__(self, connectors):
+        super(TransportsListeningTest, self).__init__(None)
+        self.connectors = connectors
+
+    def evaluate(self, listeningPorts):
+        """
+        Evaluates the test:
+            READY for all transports listening
+            NOT_READY for any transport not yet listening
+        """
+
+        status = Status.READY
+        messages = {}
+        for (name, port) in self.connectors.getPorts():
+            if port is None:
+                messages[name] = "Does not define a port, cannot check transport"
+            elif port in listeningPorts:
+                messages[name] = "Transport is listening on port %s" % (port)
+            else:
+                messages[name] = "Nothing listening on port %s, transport not yet running" % (port)
+                status = Status.NOT_READY
+        return (status, messages)
+
+class BrokerStateTest(Test):
+    """
+    Checks the state of the broker through Jolokia.
+    """
+
+    def __init__(self):
+        super(BrokerStateTest, self).__init__(
+            {
+                "type": "read",
+                "mbean": "org.apache.activemq:type=Broker,brokerName=*",
+                "attribute": ["BrokerName", "Slave"]
+            }
+        )
+
+    def evaluate(self, results):
+        """
+        Evaluates the test:
+            READY for an active (master) broker
+            NOT_READY for no broker or a slave broker
+            FAILURE if the query failed
+        """
+
+        if results.get("status") != 200:
+            return (Status.FAILURE, "Jolokia query failed: %s" % (results.get("error")))
+        brokers = results["value"].values()
+        if not brokers:
+            return (Status.NOT_READY, "No broker registered")
+        for broker in brokers:
+            if broker.get("Slave"):
+                return (Status.NOT_READY, "Broker %s is a slave" % (broker.get("BrokerName")))
+        return (Status.READY, "Brokers %s are active" % (", ".join(broker.get("BrokerName") for broker in brokers)))
+
+class AmqProbe(Probe):
+    """
+    Probe checking the transport connectors of the A-MQ broker are listening,
+    and the broker is active if AMQ_PROBE_BROKER_STATE is true (requires
+    Jolokia).
+    """
+
+    def __init__(self, target = None):
+        # the transports are checked with the ports listening in this container
+        if target is not None:
+            raise ValueError("%s only probes the local broker, it does not support the target %s" % (qualifiedClassName(self), target))
+        super(AmqProbe, self).__init__([])
+        self.logger = logging.getLogger(qualifiedClassName(self))
+        self.connectors = TransportConnectors(
+            os.path.join(os.getenv("AMQ_HOME", "/opt/amq"), "conf", "activemq.xml"),
+            os.getenv("AMQ_PROBE_CACHE_FILE", "/tmp/amq-transport-connectors.json")
+        )
+        self.addTest(TransportsListeningTest(self.connectors))
+        self.jolokiaProbe = None
+        if os.getenv("AMQ_PROBE_BROKER_STATE", "false").lower() == "true":
+            self.jolokiaProbe = JolokiaProbe([BrokerStateTest()])
+
+    def execute(self):
+        self.logger.info("Executing the following tests: [%s]", ", ".join(qualifiedClassName(test) for test in self.tests))
+        status = set()
+        output = {}
+        listeningPorts = readListeningPorts()
+        for test in self.tests:
+            try:
+                (state, messages) = test.evaluate(listeningPorts)
+                self.logger.info("Test %s returned status %s", qualifiedClassName(test), str(state))
+                status.add(state)
+                output[qualifiedClassName(test)] = messages
+            except:
+                self.logger.exception("Unexpected failure running test %s", qualifiedClassName(test))
+                status.add(Status.FAILURE)
+                output[qualifiedClassName(test)] = "Exception executing test: %s" % (sys.exc_info()[1])
+
+        # the broker is queried only when the transports are listening
+        if self.jolokiaProbe and status <= set([Status.READY]):
+            (jolokiaStatus, jolokiaOutput) = self.jolokiaProbe.execute()
+            status |= jolokiaStatus
+            if isinstance(jolokiaOutput, dict):
+                output.update(jolokiaOutput)
+            else:
+                output[qualifiedClassName(self.jolokiaProbe)] = jolokiaOutput
+        return (status, output)
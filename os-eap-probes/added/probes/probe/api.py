@@ -16,6 +16,7 @@ permissions and limitations under the License.
 
 import json
 import logging
+import os
 import sys
 
 from enum import Enum
@@ -28,6 +29,45 @@ def qualifiedClassName(obj):
 
     return obj.__module__ + "." + type(obj).__name__
 
+class Target(object):
+    """
+    The server instance probed: the host, the port offset applied to the
+    management and Jolokia ports and the credentials.  The port offset defaults
+    to $PORT_OFFSET, unset credentials default to the ones configured for the
+    probe (e.g. $ADMIN_USERNAME for the DmrProbe).
+    """
+
+    def __init__(self, host = "localhost", portOffset = None, user = None, password = None):
+        self.host = host
+        self.portOffset = int(os.getenv('PORT_OFFSET', 0)) if portOffset is None else int(portOffset)
+        self.user = user
+        self.password = password
+
+    def __str__(self):
+        return "%s:%s" % (self.host, self.portOffset)
+
+def parseTarget(spec):
+    """
+    Parses a target specified as [user[:password]@]host[:portOffset], e.g.
+    admin:secret@localhost:100.
+    """
+
+    (credentials, atSign, address) = spec.rpartition("@")
+    (user, colon, password) = credentials.partition(":")
+    (host, portColon, portOffset) = address.partition(":")
+    return Target(host or "localhost", portOffset or None, user or None, password if colon else None)
+
+def targetFileName(fileName, target):
+    """
+    Returns the name of the file specific to the target, e.g. for the state
+    kept across the probe runs, the file name itself if no target is specified.
+    """
+
+    if target is None:
+        return fileName
+    (base, extension) = os.path.splitext(fileName)
+    return "%s-%s-%s%s" % (base, target.host, target.portOffset, extension)
+
 class Status(Enum):
     """
     Represents the outcome of a test.
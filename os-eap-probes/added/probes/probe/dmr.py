@@ -22,7 +22,7 @@ import sys
 
 from collections import OrderedDict
 
-from probe.api import qualifiedClassName, BatchingProbe, Status, Test
+from probe.api import qualifiedClassName, BatchingProbe, Status, Target, Test
 
 class DmrProbe(BatchingProbe):
     """
@@ -31,27 +31,32 @@ class DmrProbe(BatchingProbe):
     management interface and should be able to handle DMR results.
     """
 
-    def __init__(self, tests = []):
+    def __init__(self, tests = [], target = None):
         super(DmrProbe, self).__init__(tests)
         self.logger = logging.getLogger(qualifiedClassName(self))
+        self.target = target or Target()
+        # requests.Session may be set to reuse the connection (and the digest
+        # authentication nonce) for more requests
+        self.session = None
         self.__readConfig()
         
     def __readConfig(self):
         """
         Configuration consists of:
-            host: localhost
-            port: 9990 + $PORT_OFFSET
-            user: $ADMIN_USERNAME
-            password: $ADMIN_PASSWORD
+            host: target host, localhost by default
+            port: 9990 + target port offset ($PORT_OFFSET by default)
+            user: target user or $ADMIN_USERNAME
+            password: target password or $ADMIN_PASSWORD
         """
         
-        self.host = "localhost"
-        self.port = 9990 + int(os.getenv('PORT_OFFSET', 0))
-        self.user = os.getenv('ADMIN_USERNAME')
-        self.password = os.getenv('ADMIN_PASSWORD')
+        self.host = self.target.host
+        self.port = 9990 + self.target.portOffset
+        self.user = os.getenv('ADMIN_USERNAME') if self.target.user is None else self.target.user
+        self.password = os.getenv('ADMIN_PASSWORD') if self.target.password is None else self.target.password
         if self.password != "":
           if self.user is None or self.user == "":
             self.user = os.getenv('DEFAULT_ADMIN_USERNAME')
+        self.auth = requests.auth.HTTPDigestAuth(self.user, self.password) if self.user else None
         self.logger.debug("Configuration set as follows: host=%s, port=%s, user=%s, password=***", self.host, self.port, self.user)
 
     def getTestInput(self, results, testIndex):
@@ -69,11 +74,28 @@ class DmrProbe(BatchingProbe):
                 }
 
     def sendRequest(self, request):
-        url = "http://%s:%s/management" % (self.host, self.port)
+        response = self.postRequest(request)
+
+        if response.status_code != 200:
+            self.logger.error("Probe request failed.  Status code: %s", response.status_code)
+            raise Exception("Probe request failed, code: " + str(response.status_code) + str(self.getUrl()) + str(request) + str(response.json(object_pairs_hook = OrderedDict)))
+
+        return response.json(object_pairs_hook = OrderedDict)
+
+    def getUrl(self):
+        return "http://%s:%s/management" % (self.host, self.port)
+
+    def postRequest(self, request, timeout = None):
+        """
+        Posts the request to the management interface and returns the response,
+        regardless of its status code.
+        """
+
+        url = self.getUrl()
         self.logger.info("Sending probe request to %s", url)
         if self.logger.isEnabledFor(logging.DEBUG):
             self.logger.debug("Probe request = %s", json.dumps(request, indent=4, separators=(',', ': ')))
-        response = requests.post(
+        response = (self.session or requests).post(
             url,
             json = request,
             headers = {
@@ -83,13 +105,9 @@ class DmrProbe(BatchingProbe):
                 "http": None,
                 "https": None
             },
-            auth = requests.auth.HTTPDigestAuth(self.user, self.password) if self.user else None,
-            verify = False
+            auth = self.auth,
+            verify = False,
+            timeout = timeout
         )
         self.logger.debug("Probe response: %s", response)
-
-        if response.status_code != 200:
-            self.logger.error("Probe request failed.  Status code: %s", response.status_code)
-            raise Exception("Probe request failed, code: " + str(response.status_code) + str(url) + str(request) + str(response.json(object_pairs_hook = OrderedDict)))
-
-        return response.json(object_pairs_hook = OrderedDict)
+        return response
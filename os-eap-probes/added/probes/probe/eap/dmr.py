@@ -25,13 +25,14 @@ class EapProbe(DmrProbe):
     defines tests for server status, boot errors and deployment status.
     """
 
-    def __init__(self):
+    def __init__(self, target = None):
         super(EapProbe, self).__init__(
             [
                 ServerStatusTest(),
                 BootErrorsTest(),
                 DeploymentTest()
-            ]
+            ],
+            target
         )
 
 class ServerStatusTest(Test):
@@ -26,13 +26,14 @@ class EapProbe(JolokiaProbe):
     deployment status.
     """
 
-    def __init__(self):
+    def __init__(self, target = None):
         super(EapProbe, self).__init__(
             [
                 ServerStatusTest(),
                 BootErrorsTest(),
                 DeploymentTest()
-            ]
+            ],
+            target
         )
 
 class ServerStatusTest(Test):
@@ -0,0 +1,182 @@
+"""
+Copyright 2018 Red Hat, Inc.
+
+Red Hat licenses this file to you under the Apache License, version
+2.0 (the "License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+implied.  See the License for the specific language governing
+permissions and limitations under the License.
+"""
+
+import fcntl
+import logging
+import mmap
+import os
+import struct
+
+from probe.api import qualifiedClassName, Status
+
+# magic, version, record size, capacity, number of records appended
+HEADER = struct.Struct("<4sHHII")
+# timestamp, status bitmask of the run, latency in milliseconds
+RECORD = struct.Struct("<dB3xf")
+MAGIC = b"PRBH"
+VERSION = 1
+
+def statusMask(statuses):
+    """
+    Returns the bitmask of the statuses, the Status values being powers of two.
+    """
+
+    mask = 0
+    for status in statuses:
+        mask |= status.value
+    return mask
+
+def maskStatuses(mask):
+    """
+    Returns the statuses of the bitmask, the worst first.
+    """
+
+    return [status for status in sorted(Status, key = lambda status: status.value) if mask & status.value]
+
+class ProbeHistory(object):
+    """
+    The results of the probe runs, kept in a fixed size ring buffer mapped
+    from a file as the probes run in a new process each time.  Each record
+    holds the time, the bitmask of the statuses and the latency of a run, the
+    oldest records are overwritten once the capacity is reached.  The file is
+    locked while reading or appending, so it may be shared by processes.
+    """
+
+    def __init__(self, historyFile, capacity = 1024):
+        self.historyFile = historyFile
+        self.capacity = capacity
+        self.logger = logging.getLogger(qualifiedClassName(self))
+
+    def __map(self, writable):
+        """
+        Opens and locks the file, initializing it if writable and it is not a
+        valid history.  Returns the file descriptor and the mmap, or None if
+        the history is missing or invalid and not writable.
+        """
+
+        fd = os.open(self.historyFile, os.O_RDWR | os.O_CREAT if writable else os.O_RDONLY, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if writable else fcntl.LOCK_SH)
+            size = os.fstat(fd).st_size
+            header = HEADER.unpack(os.read(fd, HEADER.size)) if size >= HEADER.size else None
+            if header is None or header[0] != MAGIC or header[1] != VERSION or header[2] != RECORD.size or size < HEADER.size + header[3] * RECORD.size:
+                if not writable:
+                    os.close(fd)
+                    return None
+                self.logger.info("Initializing the probe history %s with %d records", self.historyFile, self.capacity)
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, HEADER.size + self.capacity * RECORD.size)
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.write(fd, HEADER.pack(MAGIC, VERSION, RECORD.size, self.capacity, 0))
+                size = HEADER.size + self.capacity * RECORD.size
+            return (fd, mmap.mmap(fd, size, access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ))
+        except:
+            os.close(fd)
+            raise
+
+    def append(self, timestamp, statuses, latency):
+        """
+        Records a run of the probes: the time, the statuses and the latency in
+        seconds.
+        """
+
+        (fd, buffer) = self.__map(True)
+        try:
+            (magic, version, recordSize, capacity, count) = HEADER.unpack_from(buffer, 0)
+            RECORD.pack_into(buffer, HEADER.size + (count % capacity) * RECORD.size, timestamp, statusMask(statuses), latency * 1000)
+            HEADER.pack_into(buffer, 0, magic, version, recordSize, capacity, count + 1)
+        finally:
+            buffer.close()
+            os.close(fd)
+
+    def records(self):
+        """
+        Returns the (timestamp, status bitmask, latency in milliseconds) of the
+        recorded runs, the oldest first.
+        """
+
+        if not os.path.exists(self.historyFile):
+            return []
+        mapped = self.__map(False)
+        if mapped is None:
+            self.logger.warning("Ignoring the invalid probe history %s", self.historyFile)
+            return []
+        (fd, buffer) = mapped
+        try:
+            (magic, version, recordSize, capacity, count) = HEADER.unpack_from(buffer, 0)
+            first = max(0, count - capacity)
+            return [RECORD.unpack_from(buffer, HEADER.size + (index % capacity) * RECORD.size) for index in range(first, count)]
+        finally:
+            buffer.close()
+            os.close(fd)
+
+def successStreak(records, okStatus):
+    """
+    Returns the number of consecutive successful runs ending the records, and
+    whether a failed run precedes them.
+    """
+
+    okMask = statusMask(okStatus)
+    streak = 0
+    for (timestamp, mask, latency) in reversed(records):
+        if mask & ~okMask or not mask:
+            return (streak, True)
+        streak += 1
+    return (streak, False)
+
+def percentile(values, percent):
+    """
+    Returns the percentile of the sorted values, using the nearest rank.
+    """
+
+    if not values:
+        return None
+    return values[max(0, min(len(values), int(-(-len(values) * percent // 100))) - 1)]
+
+def analyze(records, okStatus):
+    """
+    Returns the statistics of the runs: the flaps (changes between success
+    and failure) and their rate per hour, the seconds spent in each status
+    (the worst status of a run, until the next run) and the latency
+    percentiles.
+    """
+
+    okMask = statusMask(okStatus)
+    flaps = 0
+    previous = None
+    timeInStatus = dict((str(status), 0.0) for status in Status)
+    for (index, (timestamp, mask, latency)) in enumerate(records):
+        ok = mask != 0 and not mask & ~okMask
+        if previous is not None and ok != previous:
+            flaps += 1
+        previous = ok
+        if index + 1 < len(records) and mask:
+            timeInStatus[str(maskStatuses(mask)[0])] += records[index + 1][0] - timestamp
+
+    span = records[-1][0] - records[0][0] if records else 0
+    latencies = sorted(round(latency, 1) for (timestamp, mask, latency) in records)
+    return {
+        "runs": len(records),
+        "since": records[0][0] if records else None,
+        "until": records[-1][0] if records else None,
+        "flaps": flaps,
+        "flapsPerHour": round(flaps * 3600.0 / span, 2) if span > 0 else None,
+        "secondsInStatus": dict((status, round(seconds, 1)) for (status, seconds) in timeInStatus.items()),
+        "latencyMillis": dict(
+            [("p%d" % (percent), percentile(latencies, percent)) for percent in (50, 90, 99)] +
+            [("max", latencies[-1] if latencies else None)]
+        )
+    }
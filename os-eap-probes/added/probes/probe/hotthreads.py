@@ -0,0 +1,140 @@
+"""
+Copyright 2018 Red Hat, Inc.
+
+Red Hat licenses this file to you under the Apache License, version
+2.0 (the "License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+implied.  See the License for the specific language governing
+permissions and limitations under the License.
+"""
+
+import json
+import os
+import socket
+import time
+
+from probe.jolokia import JolokiaProbe
+
+THREADING_MBEAN = "java.lang:type=Threading"
+
+def formatFrame(frame):
+    """
+    Formats a StackTraceElement like Throwable.printStackTrace().
+    """
+
+    if frame.get("nativeMethod"):
+        location = "Native Method"
+    elif frame.get("fileName") and frame.get("lineNumber", -1) >= 0:
+        location = "%s:%s" % (frame["fileName"], frame["lineNumber"])
+    else:
+        location = frame.get("fileName") or "Unknown Source"
+    return "%s.%s(%s)" % (frame.get("className"), frame.get("methodName"), location)
+
+def containerLimits(cacheFile = None):
+    """
+    Returns the limits cached by container-limits (CONTAINER_LIMITS_CACHE),
+    or {} when they are not cached or were cached by another container, see
+    the key written by container-limits.
+    """
+
+    cacheFile = cacheFile or os.getenv("CONTAINER_LIMITS_CACHE", "/tmp/container-limits.json")
+    try:
+        with open(cacheFile, "r") as cache:
+            limits = json.load(cache)
+        with open("/proc/sys/kernel/random/boot_id", "r") as bootId:
+            key = "%s/%s" % (bootId.read().strip(), os.getenv("HOSTNAME") or socket.gethostname())
+    except (IOError, OSError, ValueError):
+        return {}
+    return limits if isinstance(limits, dict) and limits.get("key") == key else {}
+
+class HotThreads(JolokiaProbe):
+    """
+    Captures the threads of the JVM using the most cpu, through the Threading
+    MBean: the cpu time of all the threads is sampled twice, interval seconds
+    apart, and the stacks of the top threads are read.  Used to diagnose why
+    the server does not respond when the probes fail, so each request waits
+    at most timeout seconds for the server, a few seconds more than the
+    interval by default.
+    """
+
+    def __init__(self, interval = 1.0, top = 10, maxDepth = 20, target = None, timeout = None):
+        super(HotThreads, self).__init__([], target)
+        self.interval = interval
+        self.top = top
+        self.maxDepth = maxDepth
+        self.timeout = interval + 5 if timeout is None else timeout
+
+    def values(self, requests):
+        """
+        Sends the requests as a batch, returns the values, None for the failed
+        requests.
+        """
+
+        return [result.get("value") if result.get("status") == 200 else None for result in self.sendRequest(requests, self.timeout)]
+
+    def sampleCpuTimes(self, threadIds):
+        requests = [{"type": "exec", "mbean": THREADING_MBEAN, "operation": "getThreadCpuTime(long)", "arguments": [threadId]} for threadId in threadIds]
+        return dict(zip(threadIds, self.values(requests)))
+
+    def capture(self):
+        """
+        Returns the report of the hot threads, the threads are ordered by the
+        cpu time used during the interval.
+        """
+
+        (threadIds,) = self.values([{"type": "read", "mbean": THREADING_MBEAN, "attribute": "AllThreadIds"}])
+        first = self.sampleCpuTimes(threadIds)
+        start = time.time()
+        time.sleep(self.interval)
+        second = self.sampleCpuTimes(threadIds)
+        elapsed = time.time() - start
+
+        # threads which ended or have no cpu time (-1) are ignored
+        deltas = [(second[threadId] - first[threadId], threadId) for threadId in threadIds if first.get(threadId, -1) >= 0 and second.get(threadId, -1) >= 0]
+        deltas.sort(reverse = True)
+        deltas = deltas[:self.top]
+
+        requests = [{"type": "exec", "mbean": THREADING_MBEAN, "operation": "getThreadInfo(long,int)", "arguments": [threadId, self.maxDepth]} for (delta, threadId) in deltas]
+        threads = []
+        for ((delta, threadId), info) in zip(deltas, self.values(requests)):
+            info = info or {}
+            threads.append({
+                "id": threadId,
+                "name": info.get("threadName"),
+                "state": info.get("threadState"),
+                "cpuMillis": delta // 1000000,
+                "cpuPercent": round(delta / (elapsed * 1e7), 1),
+                "lockName": info.get("lockName"),
+                "lockOwnerName": info.get("lockOwnerName"),
+                "stack": [formatFrame(frame) for frame in info.get("stackTrace") or []]
+            })
+        return {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "intervalMillis": int(elapsed * 1000),
+            # the cpu percentages are of one cpu, the container may use cpuQuota cpus
+            "cpuQuota": containerLimits().get("cpuQuota"),
+            "threadCount": len(threadIds),
+            "threads": threads
+        }
+
+def summary(report, top = 3):
+    """
+    Returns the compact summary of the hottest threads for the probe output.
+    """
+
+    return [
+        "%s (%s, %s%% cpu)%s" % (thread["name"], thread["state"], thread["cpuPercent"], " at %s" % (thread["stack"][0]) if thread["stack"] else "")
+        for thread in report["threads"][:top]
+    ]
+
+def writeReport(report, reportFile):
+    tmpFile = "%s.%d" % (reportFile, os.getpid())
+    with open(tmpFile, "w") as output:
+        json.dump(report, output, indent = 2, separators = (",", ": "))
+    os.rename(tmpFile, reportFile)
@@ -0,0 +1,183 @@
+"""
+Copyright 2018 Red Hat, Inc.
+
+Red Hat licenses this file to you under the Apache License, version
+2.0 (the "License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+implied.  See the License for the specific language governing
+permissions and limitations under the License.
+"""
+
+import json
+import logging
+import os
+import re
+import time
+
+from probe.api import qualifiedClassName, targetFileName, Status, Test
+from probe.jolokia import JolokiaProbe
+
+__viewGrabber = re.compile(r'\[([^\]|]+\|\d+)\] \((\d+)\)')
+def parseView(text):
+    """
+    Returns the (id, member count) of a JGroups view, e.g. "[node-1|3] (2)
+    [node-1, node-2]", or (None, None) if the view cannot be parsed.
+    """
+
+    match = __viewGrabber.search(text or "")
+    if match is None:
+        return (None, None)
+    return (match.group(1), int(match.group(2)))
+
+class ViewHistory(object):
+    """
+    The views of the channels seen by the previous probe runs, kept in a file
+    as the probes run in a new process each time.  Only the changes of the
+    views are recorded, at most maxSize per channel.  The file also latches
+    the tests which have seen stable views once.
+    """
+
+    def __init__(self, historyFile, maxSize = 10):
+        self.historyFile = historyFile
+        self.maxSize = maxSize
+        self.logger = logging.getLogger(qualifiedClassName(self))
+        try:
+            with open(self.historyFile, "r") as history:
+                content = json.load(history)
+            self.channels = content["channels"]
+            self.stable = content["stable"]
+        except (IOError, ValueError, KeyError, TypeError):
+            self.channels = {}
+            self.stable = {}
+
+    def update(self, channel, viewId, members, now):
+        """
+        Records the view of the channel if it changed, returns the history of
+        the channel, the latest view last.
+        """
+
+        history = self.channels.setdefault(channel, [])
+        if not history or history[-1]["view"] != viewId or history[-1]["members"] != members:
+            history.append({"view": viewId, "members": members, "since": now})
+            del history[:-self.maxSize]
+        return history
+
+    def write(self):
+        try:
+            tmpFile = "%s.%d" % (self.historyFile, os.getpid())
+            with open(tmpFile, "w") as history:
+                json.dump({"channels": self.channels, "stable": self.stable}, history)
+            os.rename(tmpFile, self.historyFile)
+        except (IOError, OSError):
+            self.logger.warning("Unable to write the view history to %s", self.historyFile)
+
+class ClusterViewTest(Test):
+    """
+    Checks that the views of the JGroups channels have not changed for a period
+    of time, i.e. the cluster is not changing membership.  Only a joining
+    server is gated: once the views were stable, the test stays READY when
+    peers join or leave, unless regate is set, otherwise all the members of
+    the cluster would become not ready at the same time.
+    """
+
+    def __init__(self, mbean, stableSeconds, history, regate = False):
+        super(ClusterViewTest, self).__init__(
+            {
+                "type": "read",
+                "attribute": "view",
+                "mbean": mbean
+            }
+        )
+        self.stableSeconds = stableSeconds
+        self.history = history
+        self.regate = regate
+
+    def evaluate(self, results):
+        """
+        Evaluates the test:
+            READY if the views have not changed for stableSeconds, or were
+                stable once (unless regate is set), or there are no channels
+            NOT_READY if any view changed within stableSeconds
+            FAILURE if the query failed or a view cannot be parsed
+        """
+
+        if results["status"] == 404:
+            return (Status.READY, "No channels")
+
+        if results["status"] != 200:
+            return (Status.FAILURE, "Jolokia query failed")
+
+        if not results["value"]:
+            return (Status.READY, "No channels")
+
+        now = time.time()
+        status = set()
+        messages = {}
+        for key, value in results["value"].items():
+            channel = key.rsplit("=", 1)[1].strip('"')
+            (viewId, members) = parseView(value["view"])
+            if viewId is None:
+                status.add(Status.FAILURE)
+                messages[channel] = "Unable to parse view: %s" % (value["view"])
+                continue
+            history = self.history.update(key, viewId, members, now)
+            stableFor = now - history[-1]["since"]
+            status.add(Status.READY if stableFor >= self.stableSeconds else Status.NOT_READY)
+            messages[channel] = {
+                "view": viewId,
+                "members": members,
+                "stableFor": int(stableFor),
+                "history": [
+                    "%s %s (%d)" % (time.strftime("%H:%M:%S", time.localtime(view["since"])), view["view"], view["members"]) for view in history
+                ]
+            }
+        latched = self.history.stable.get(self.query["mbean"]) and not self.regate
+        if min(status) == Status.READY and not latched:
+            self.history.stable[self.query["mbean"]] = now
+        self.history.write()
+        if latched and Status.NOT_READY in status and Status.FAILURE not in status:
+            return (Status.READY, messages)
+        return (min(status), messages)
+
+class EapClusterViewTest(ClusterViewTest):
+    """
+    Checks the views of the channels of the jgroups subsystem.
+    """
+
+    def __init__(self, stableSeconds, history, regate = False):
+        super(EapClusterViewTest, self).__init__("jboss.as:subsystem=jgroups,channel=*", stableSeconds, history, regate)
+
+class JdgClusterViewTest(ClusterViewTest):
+    """
+    Checks the views of the channels registered by Infinispan.
+    """
+
+    def __init__(self, stableSeconds, history, regate = False):
+        super(JdgClusterViewTest, self).__init__("jboss.infinispan:type=channel,cluster=*", stableSeconds, history, regate)
+
+class ClusterViewProbe(JolokiaProbe):
+    """
+    Probe checking the JGroups views of the EAP channels (jgroups subsystem) and
+    of the JDG channels (registered by Infinispan) have been stable for
+    PROBE_CLUSTER_VIEW_STABLE_SECONDS, once or every time the views change if
+    PROBE_CLUSTER_VIEW_REGATE is true.  The views of each target are kept in
+    a separate history file.
+    """
+
+    def __init__(self, target = None):
+        stableSeconds = int(os.getenv("PROBE_CLUSTER_VIEW_STABLE_SECONDS", "30"))
+        regate = os.getenv("PROBE_CLUSTER_VIEW_REGATE", "false").lower() == "true"
+        history = ViewHistory(targetFileName(os.getenv("PROBE_CLUSTER_VIEW_HISTORY_FILE", "/tmp/jgroups-view-history.json"), target))
+        super(ClusterViewProbe, self).__init__(
+            [
+                EapClusterViewTest(stableSeconds, history, regate),
+                JdgClusterViewTest(stableSeconds, history, regate)
+            ],
+            target
+        )
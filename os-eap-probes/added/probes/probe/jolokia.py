@@ -16,7 +16,6 @@ permissions and limitations under the License.
 
 import json
 import logging
-import os
 import requests
 import sys
 import ConfigParser
@@ -24,7 +23,7 @@ import StringIO
 
 from collections import OrderedDict
 
-from probe.api import qualifiedClassName, BatchingProbe, Status, Test
+from probe.api import qualifiedClassName, BatchingProbe, Status, Target, Test
 
 class JolokiaProbe(BatchingProbe):
     """
@@ -33,20 +32,21 @@ class JolokiaProbe(BatchingProbe):
     and should be able to handle Jolokia formatted results.
     """
 
-    def __init__(self, tests = []):
+    def __init__(self, tests = [], target = None):
         super(JolokiaProbe, self).__init__(tests)
         self.logger = logging.getLogger(qualifiedClassName(self))
+        self.target = target or Target()
         self.__readConfig()
         
     def __readConfig(self):
         """
         Configuration is read from /opt/jolokia/etc/jolokia.properties and
         consists of:
-            host: localhost
-            port: jolokia.port + $PORT_OFFSET
+            host: target host, localhost by default
+            port: jolokia.port + target port offset ($PORT_OFFSET by default)
             protocol: jolokia.protocol
-            user: jolokia.user
-            password: jolokia.password
+            user: target user or jolokia.user
+            password: target password or jolokia.password
         """
         
         jolokiaConfig = ConfigParser.ConfigParser(
@@ -63,11 +63,11 @@ class JolokiaProbe(BatchingProbe):
             # fake a section
             jolokiaConfig.readfp(StringIO.StringIO("[jolokia]\n" + jolokiaProperties.read()))
         
-        self.host = "localhost"
-        self.port = int(jolokiaConfig.get("jolokia", "port")) + int(os.getenv('PORT_OFFSET', 0))
+        self.host = self.target.host
+        self.port = int(jolokiaConfig.get("jolokia", "port")) + self.target.portOffset
         self.protocol = jolokiaConfig.get("jolokia", "protocol")
-        self.user = jolokiaConfig.get("jolokia", "user")
-        self.password = jolokiaConfig.get("jolokia", "password")
+        self.user = jolokiaConfig.get("jolokia", "user") if self.target.user is None else self.target.user
+        self.password = jolokiaConfig.get("jolokia", "password") if self.target.password is None else self.target.password
 
         self.logger.debug("Configuration set as follows: host=%s, port=%s, protocol=%s, user=%s, password=***", self.host, self.port, self.protocol, self.user)
 
@@ -80,7 +80,12 @@ class JolokiaProbe(BatchingProbe):
             request.append(test.getQuery())
         return request
 
-    def sendRequest(self, request):
+    def sendRequest(self, request, timeout = None):
+        """
+        Posts the batch of queries to Jolokia, waiting at most timeout seconds
+        for the server to respond (forever if None).
+        """
+
         url = "%s://%s:%s/jolokia/" % (self.protocol, self.host, self.port)
         self.logger.info("Sending probe request to %s", url)
         if self.logger.isEnabledFor(logging.DEBUG):
@@ -93,7 +98,8 @@ class JolokiaProbe(BatchingProbe):
                 "https": None
             },
             auth = requests.auth.HTTPBasicAuth(self.user, self.password) if self.user else None,
-            verify = False
+            verify = False,
+            timeout = timeout
         )
         self.logger.debug("Probe response: %s", response)
 
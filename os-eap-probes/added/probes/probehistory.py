@@ -0,0 +1,65 @@
+"""
+Copyright 2018 Red Hat, Inc.
+
+Red Hat licenses this file to you under the Apache License, version
+2.0 (the "License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+implied.  See the License for the specific language governing
+permissions and limitations under the License.
+"""
+
+import argparse
+import json
+import logging
+import time
+
+from probe.api import Status
+from probe.history import analyze, maskStatuses, ProbeHistory
+from runner import toStatus
+
+def formatTime(timestamp):
+    return "-" if timestamp is None else time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp))
+
+def printReport(historyFile, report):
+    print("%s: %d runs from %s to %s" % (historyFile, report["runs"], formatTime(report["since"]), formatTime(report["until"])))
+    print("  flaps: %d (%s per hour)" % (report["flaps"], "-" if report["flapsPerHour"] is None else report["flapsPerHour"]))
+    for status in sorted(Status, key = lambda status: status.value, reverse = True):
+        print("  %-14s %10.1f s" % (status, report["secondsInStatus"][str(status)]))
+    latency = report["latencyMillis"]
+    print("  latency ms:    %s" % ("  ".join("%s %s" % (key, "-" if latency[key] is None else "%.1f" % (latency[key])) for key in ("p50", "p90", "p99", "max"))))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Reports the flaps, the time in each status and the latency percentiles of the probe runs recorded by runner.py --history")
+    parser.add_argument("-c", "--check", type = toStatus, action = "append", help = "The statuses of a successful run, as passed to runner.py.  Defaults to READY.")
+    parser.add_argument("-s", "--since", type = int, help = "Only report the runs of the last number of seconds.")
+    parser.add_argument("-r", "--runs", action = "store_true", help = "Print the recorded runs.")
+    parser.add_argument("--json", action = "store_true", help = "Print the report as JSON.")
+    parser.add_argument("--loglevel", default = "WARNING", choices = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"], help = "Log level.")
+    parser.add_argument("history", nargs = "+", help = "The history files to report.")
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level = args.loglevel.upper())
+
+    okStatus = set(args.check or [Status.READY])
+    reports = {}
+    for historyFile in args.history:
+        records = ProbeHistory(historyFile).records()
+        if args.since is not None:
+            records = [record for record in records if record[0] >= time.time() - args.since]
+        reports[historyFile] = analyze(records, okStatus)
+        if args.json:
+            continue
+        printReport(historyFile, reports[historyFile])
+        if args.runs:
+            for (timestamp, mask, latency) in records:
+                print("  %s %-24s %8.1f ms" % (formatTime(timestamp), "|".join(str(status) for status in maskStatuses(mask)) or "-", latency))
+
+    if args.json:
+        print(json.dumps(reports, indent=4, separators=(',', ': '), sort_keys = True))
@@ -18,18 +18,27 @@ import argparse
 import importlib
 import json
 import logging
+import os
+import sys
+import threading
 import time
 
-from probe.api import qualifiedClassName, Status
+from probe.api import qualifiedClassName, parseTarget, targetFileName, Status, Target
+from probe.history import successStreak, ProbeHistory
+
+# seconds reserved for the Jolokia requests of the hot threads capture, in
+# addition to the sampling interval, when the runner has a deadline
+HOT_THREADS_MARGIN = 2
 
 class ProbeRunner(object):
     """
     Simply executes a series of Probes, returning the combined Status and
-    messages.
+    messages.  The result of each run is appended to the history, if any.
     """
     
-    def __init__(self, probes = []):
+    def __init__(self, probes = [], history = None):
         self.probes = probes
+        self.history = history
         self.logger = logging.getLogger(qualifiedClassName(self))
 
     def addProbe(self, probe):
@@ -37,6 +46,7 @@ class ProbeRunner(object):
 
     def executeProbes(self):
         self.logger.info("Running the following probes: [%s]", ", ".join(qualifiedClassName(probe) for probe in self.probes))
+        start = time.time()
         results = set()
         output = {}
         for probe in self.probes:
@@ -47,8 +57,146 @@ class ProbeRunner(object):
                 self.logger.debug("Probe %s returned messages %s", qualifiedClassName(probe), json.dumps(messages, indent=4, separators=(',', ': ')))
             results |= statuses
             output[qualifiedClassName(probe)] = messages
+        if self.history:
+            try:
+                self.history.append(start, results, time.time() - start)
+            except:
+                self.logger.exception("Unable to record the probe results in %s", self.history.historyFile)
         return (results, output)
 
+class TargetRun(threading.Thread):
+    """
+    Runs the probes of a target until they succeed, fail with HARD_FAILURE or
+    maxruns is reached, or no retry could finish before the deadline.  The
+    retry state is kept per target, so the targets can be probed concurrently,
+    each in its own thread.  With hysteresis, once the probes failed they must
+    succeed for hysteresis consecutive runs, as recorded in the history of the
+    runner, before the target succeeds.
+    """
+
+    def __init__(self, target, runner, okStatus, maxruns, sleep, hotThreadsFile = None, hysteresis = 0, deadline = None):
+        super(TargetRun, self).__init__(name = "probe-%s" % (target or Target()))
+        self.daemon = True
+        self.target = target
+        self.runner = runner
+        self.okStatus = okStatus
+        self.maxruns = maxruns
+        self.sleep = sleep
+        self.hotThreadsFile = hotThreadsFile
+        self.hysteresis = hysteresis
+        self.deadline = deadline
+        self.logger = logging.getLogger(qualifiedClassName(self))
+        self.runs = 0
+        self.succeeded = False
+        self.status = set()
+        self.output = {}
+
+    def run(self):
+        name = self.target or Target()
+        while True:
+            self.runs += 1
+            self.logger.info("Running probes of %s", name)
+            (self.status, self.output) = self.runner.executeProbes()
+            if self.okStatus >= self.status and not self.damped(name):
+                self.logger.info("Probes of %s succeeded", name)
+                self.succeeded = True
+                return
+            if Status.HARD_FAILURE in self.status:
+                self.logger.error("Probes of %s detected HARD_FAILURE.  Exiting retry loop.", name)
+                break
+            if self.deadline is not None and time.time() + self.sleep >= self.deadline:
+                self.logger.error("Probes of %s failed.  No retry before the deadline.", name)
+                break
+            if self.runs < self.maxruns:
+                self.logger.error("Probes of %s failed.  Retries remaining: %s.", name, self.maxruns - self.runs)
+                self.logger.info("Retrying probes of %s in %ss", name, self.sleep)
+                time.sleep(self.sleep)
+            else:
+                break
+
+        # we didn't succeed
+        self.logger.error("Probe failure.  Probes of %s did not succeed after %s attempts.", name, self.runs)
+
+    def damped(self, name):
+        """
+        True if the probes succeeded fewer than hysteresis consecutive runs
+        since they last failed.
+        """
+
+        if not self.hysteresis or not self.runner.history:
+            return False
+        try:
+            (streak, failed) = successStreak(self.runner.history.records(), self.okStatus)
+        except:
+            self.logger.exception("Unable to read the probe history of %s", name)
+            return False
+        if failed and streak < self.hysteresis:
+            self.logger.warning("Probes of %s succeeded %d consecutive runs since the last failure, %d required", name, streak, self.hysteresis)
+            self.output["hysteresis"] = "Succeeded %d of %d consecutive runs required since the last failure" % (streak, self.hysteresis)
+            return True
+        return False
+
+    def result(self, deadline = None):
+        """
+        Returns whether the probes of the target succeeded and its output, the
+        hot threads are captured if they did not.  A run still in progress,
+        e.g. blocked by a hung server, is abandoned as not finished within the
+        deadline.
+        """
+
+        name = self.target or Target()
+        output = dict(self.output)
+        succeeded = self.succeeded
+        if self.is_alive():
+            self.logger.error("Probe failure.  Probes of %s did not finish within the deadline.", name)
+            output["deadline"] = "Probes did not finish within the deadline, %s attempts started" % (self.runs)
+            succeeded = False
+        if not succeeded and self.hotThreadsFile:
+            self.logger.info("Capturing the hot threads of %s to %s", name, self.hotThreadsFile)
+            output["hotThreads"] = captureHotThreads(self.hotThreadsFile, self.target, deadline)
+        return (succeeded, output)
+
+def targetResults(targetRuns, deadline = None):
+    """
+    Returns the results of the target runs, see TargetRun.result.  The hot
+    threads of the targets are captured concurrently, the captures not
+    finished by the deadline are abandoned.
+    """
+
+    results = [(False, {}) for targetRun in targetRuns]
+    def collect(index):
+        results[index] = targetRuns[index].result(deadline)
+    collectors = [threading.Thread(target = collect, args = (index,)) for index in range(len(targetRuns))]
+    for collector in collectors:
+        collector.daemon = True
+        collector.start()
+    for (index, collector) in enumerate(collectors):
+        collector.join(None if deadline is None else max(deadline - time.time(), 0))
+        if collector.is_alive():
+            results[index] = (False, dict(targetRuns[index].output, hotThreads = "Hot threads were not captured within the deadline"))
+    return results
+
+def hotThreadsInterval():
+    return float(os.getenv("PROBE_HOT_THREADS_INTERVAL", "1"))
+
+def captureHotThreads(reportFile, target = None, deadline = None):
+    """
+    Captures the threads of the server using the most cpu to the report file,
+    returns the summary of the hottest threads for the probe output.  With a
+    deadline, each Jolokia request waits at most until the deadline.
+    """
+
+    try:
+        from probe.hotthreads import HotThreads, summary, writeReport
+        interval = hotThreadsInterval()
+        timeout = None if deadline is None else max(deadline - time.time() - interval, 1)
+        report = HotThreads(interval = interval, target = target, timeout = timeout).capture()
+        writeReport(report, reportFile)
+        return summary(report)
+    except:
+        logging.getLogger(__name__).exception("Unable to capture the hot threads")
+        return "Unable to capture the hot threads: %s" % (sys.exc_info()[1])
+
 def toStatus(value):
     """
     Helper method which converts a string to a Status.  Used by the
@@ -64,6 +212,12 @@ if __name__ == "__main__":
     parser.add_argument("-r", "--maxruns", default = 1, type = int, help = "Number of runs to try without success before exiting.")
     parser.add_argument("-s", "--sleep", default = 1, type = int, help = "Number of seconds to sleep between runs.")
     parser.add_argument("--logfile", help = "Log file.")
+    parser.add_argument("--hotthreads", help = "File to write the report of the hot threads to when the probes fail, requires Jolokia.")
+    parser.add_argument("--deadline", type = float, help = "Number of seconds the runner may take, including the capture of the hot threads.  The probes are not retried past it and a hung run is abandoned in time to capture the hot threads.")
+    parser.add_argument("-t", "--target", action = "append", default = [], help = "Server to probe, as [user[:password]@]host[:portOffset], may be repeated to probe several servers concurrently.  Defaults to localhost and $PORT_OFFSET.")
+    parser.add_argument("--history", help = "File recording the results of the probe runs, see probehistory.py.")
+    parser.add_argument("--historysize", default = 1024, type = int, help = "Number of runs kept in the history file.")
+    parser.add_argument("--hysteresis", default = 0, type = int, help = "Number of consecutive successful runs required after a failure before succeeding, requires --history.")
     parser.add_argument("--loglevel", default = "CRITICAL", choices = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"], help = "Log level.")
     parser.add_argument("probes", nargs = argparse.REMAINDER, help = "The probes to execute.")
     
@@ -81,41 +235,50 @@ if __name__ == "__main__":
 
     logger.debug("Starting probe runner with args: %s", args)
 
-    runner = ProbeRunner()
+    probeClasses = []
     for probe in args.probes:
         logger.info("Loading probe: %s", probe)
         probeModule = importlib.import_module(probe.rsplit(".", 1)[0])
-        probeClass = getattr(probeModule, probe.rsplit(".", 1)[1])
-        runner.addProbe(probeClass())
+        probeClasses.append(getattr(probeModule, probe.rsplit(".", 1)[1]))
     
-    maxruns = args.maxruns
     okStatus = set(args.check)
     
     logger.info("Probes will fail for the following states: [%s]", ", ".join(str(status) for status in set(Status) - okStatus))
 
-    probeStatus = set()
-    output = {}
-    while True:
-        maxruns -= 1
-        logger.info("Running probes")
-        (probeStatus, output) = runner.executeProbes()
-        if okStatus >= probeStatus:
-            logger.info("Probes succeeded")
-            if args.debug:
-                print(json.dumps(output, indent=4, separators=(',', ': ')))
-            exit(0)
-        if Status.HARD_FAILURE in probeStatus:
-            logger.error("Probes detected HARD_FAILURE.  Exiting retry loop.")
-            break
-        if maxruns > 0:
-            logger.error("Probes failed.  Retries remaining: %s.", maxruns)
-            logger.info("Retrying probes in %ss", args.sleep)
-            time.sleep(args.sleep)
-        else:
-            break
-
-    # we didn't succeed
-    logger.error("Probe failure.  Probes did not succeed after %s attempts.", args.maxruns - maxruns)
+    # the runs stop in time to capture the hot threads before the deadline
+    deadline = None if args.deadline is None else time.time() + args.deadline
+    runsDeadline = deadline
+    if deadline is not None and args.hotthreads:
+        runsDeadline = deadline - hotThreadsInterval() - HOT_THREADS_MARGIN
+
+    # without targets, the probes use their default configuration (localhost, $PORT_OFFSET)
+    targets = [parseTarget(target) for target in args.target] or [None]
+    targetRuns = []
+    for target in targets:
+        history = ProbeHistory(targetFileName(args.history, target), args.historysize) if args.history else None
+        try:
+            runner = ProbeRunner([probeClass() if target is None else probeClass(target = target) for probeClass in probeClasses], history)
+        except ValueError as e:
+            parser.error(str(e))
+        hotThreadsFile = targetFileName(args.hotthreads, target) if args.hotthreads else None
+        targetRuns.append(TargetRun(target, runner, okStatus, args.maxruns, args.sleep, hotThreadsFile, args.hysteresis, runsDeadline))
+
+    for targetRun in targetRuns:
+        targetRun.start()
+    for targetRun in targetRuns:
+        targetRun.join(None if runsDeadline is None else max(runsDeadline - time.time(), 0))
+
+    results = targetResults(targetRuns, deadline)
+    if args.target:
+        output = dict((str(targetRun.target), result[1]) for (targetRun, result) in zip(targetRuns, results))
+    else:
+        output = results[0][1]
+
+    if all(result[0] for result in results):
+        if args.debug:
+            print(json.dumps(output, indent=4, separators=(',', ': ')))
+        exit(0)
+
     # print so the output is available to users in the OpenShift event log
     print(json.dumps(output, indent=4, separators=(',', ': ')))
     exit(1)
@@ -4,6 +4,13 @@ set -e
 SCRIPT_DIR=$(dirname $0)
 ADDED_DIR=${SCRIPT_DIR}/added
 
+# A-MQ images only use the probe library, with their own readinessProbe.sh
+if [ -z "$JBOSS_HOME" -a -n "$AMQ_HOME" ]; then
+  cp -r "$ADDED_DIR"/probes $AMQ_HOME/bin/
+  chmod -R ug+x $AMQ_HOME/bin/probes
+  exit 0
+fi
+
 # Add liveness and readiness probes and helper library
 cp -r "$ADDED_DIR"/* $JBOSS_HOME/bin/
 
@@ -14,7 +14,7 @@ function configureEnv() {
 
   if [ -n "$JDBC_STORE_JNDI_NAME" ]; then
     local jdbcStore="<jdbc-store datasource-jndi-name=\"${JDBC_STORE_JNDI_NAME}\"/>"
-    sed -i "s|<!-- ##JDBC_STORE## -->|${jdbcStore}|" $CONFIG_FILE
+    sed_config "s|<!-- ##JDBC_STORE## -->|${jdbcStore}|" $CONFIG_FILE
   fi
 
 }
@@ -84,8 +84,8 @@ function configure_ha() {
   local ping_protocol_element="<protocol type=\"${ping_protocol}\"/>"
   validate_ping_protocol "${ping_protocol}" 
 
-  sed -i "s|<!-- ##JGROUPS_AUTH## -->|${JGROUPS_AUTH}|g" $CONFIG_FILE
+  sed_config "s|<!-- ##JGROUPS_AUTH## -->|${JGROUPS_AUTH}|g" $CONFIG_FILE
   log_info "Configuring JGroups discovery protocol to ${ping_protocol}"
-  sed -i "s|<!-- ##JGROUPS_PING_PROTOCOL## -->|${ping_protocol_element}|g" $CONFIG_FILE
+  sed_config "s|<!-- ##JGROUPS_PING_PROTOCOL## -->|${ping_protocol_element}|g" $CONFIG_FILE
 
 }
@@ -32,5 +32,5 @@ function configure_https() {
   elif [ -n "${HTTPS_NAME}" -o -n "${HTTPS_PASSWORD}" -o -n "${HTTPS_KEYSTORE_DIR}" -o -n "${HTTPS_KEYSTORE}" ] ; then
     log_warning "Partial HTTPS configuration, the https connector WILL NOT be configured."
   fi
-  sed -i "s|<!-- ##HTTPS## -->|${https}|" $CONFIG_FILE
+  sed_config "s|<!-- ##HTTPS## -->|${https}|" $CONFIG_FILE
 }
@@ -94,9 +94,9 @@ function configure_hornetq() {
     destinations=$(configure_hornetq_destinations)
     hornetq_subsystem=$(sed -e "s|##DESTINATIONS##|${destinations}|" <"${HORNETQ_SUBSYSTEM_FILE}" | sed ':a;N;$!ba;s|\n|\\n|g')
 
-    sed -i 's|<!-- ##MESSAGING_EXTENSION## -->|<extension module="org.jboss.as.messaging"/>|' "${CONFIG_FILE}"
-    sed -i "s|<!-- ##MESSAGING_SUBSYSTEM## -->|${hornetq_subsystem%$'\n'}|" "${CONFIG_FILE}"
-    sed -i 's|<!-- ##MESSAGING_PORTS## -->|<socket-binding name="messaging" port="5445"/><socket-binding name="messaging-throughput" port="5455"/>|' "${CONFIG_FILE}"
+    sed_config 's|<!-- ##MESSAGING_EXTENSION## -->|<extension module="org.jboss.as.messaging"/>|' "${CONFIG_FILE}"
+    sed_config "s|<!-- ##MESSAGING_SUBSYSTEM## -->|${hornetq_subsystem%$'\n'}|" "${CONFIG_FILE}"
+    sed_config 's|<!-- ##MESSAGING_PORTS## -->|<socket-binding name="messaging" port="5445"/><socket-binding name="messaging-throughput" port="5455"/>|' "${CONFIG_FILE}"
   fi
 }
 
@@ -299,5 +299,5 @@ function inject_brokers() {
     fi
   fi
 
-  sed -i "s|<!-- ##RESOURCE_ADAPTERS## -->|${ras%$'\n'}<!-- ##RESOURCE_ADAPTERS## -->|" $CONFIG_FILE
+  sed_config "s|<!-- ##RESOURCE_ADAPTERS## -->|${ras%$'\n'}<!-- ##RESOURCE_ADAPTERS## -->|" $CONFIG_FILE
 }
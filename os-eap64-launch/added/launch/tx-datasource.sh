@@ -77,7 +77,7 @@ function inject_jdbc_store() {
                 <communication table-prefix=\"${prefix}\"/>\\
                 <state table-prefix=\"${prefix}\"/>\\
             </jdbc-store>"
-  sed -i "s|<!-- ##JDBC_STORE## -->|${jdbcStore}|" $CONFIG_FILE
+  sed_config "s|<!-- ##JDBC_STORE## -->|${jdbcStore}|" $CONFIG_FILE
 }
 
 function inject_tx_datasource() {
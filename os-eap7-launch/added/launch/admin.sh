@@ -25,6 +25,6 @@ function configure_administration() {
     fi
 
     local mgmt_iface_replace_str="security-realm=\"ManagementRealm\""
-    sed -i "s|><!-- ##MGMT_IFACE_REALM## -->| ${mgmt_iface_replace_str}>|" "$CONFIG_FILE"
+    sed_config "s|><!-- ##MGMT_IFACE_REALM## -->| ${mgmt_iface_replace_str}>|" "$CONFIG_FILE"
   fi
 }
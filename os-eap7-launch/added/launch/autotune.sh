@@ -0,0 +1,88 @@
+#!/bin/sh
+# Sizes the thread pools and the connection pools of the server from the cpu
+# limit of the container (CORE_LIMIT, see container-limits), as the defaults of
+# the configuration are sized for bare metal. With N cores:
+#
+#   IO worker io-threads          2 * N         (XNIO default per cpu)
+#   IO worker task-max-threads    16 * N        (XNIO default per cpu)
+#   EJB default thread pool       4 * N         at most 10, the default
+#   JCA short/long running pools  10 * N        at most 50, the default, core
+#                                               and max threads, not the queue
+#   datasource and MQ RA pools    10 * N        at most 20, the default
+#
+# The slsb-strict-max-pool is derived from the IO worker. The sizes set by the
+# environment always win and are applied even when autotuning is disabled by
+# DISABLE_AUTOTUNE or the container has no cpu limit.
+
+source $JBOSS_HOME/bin/launch/logging.sh
+
+function preConfigure() {
+  autotune_pool_sizes
+}
+
+function configure() {
+  configure_autotuned_thread_pools
+}
+
+# Prints the size set by the environment or the autotuned one
+# $1 - name of the environment variable
+# $2 - factor of the core limit
+# $3 - maximal autotuned size, no maximum if empty
+function autotune_size() {
+  local size="${!1}"
+  if [ -z "$size" ] && [ "${DISABLE_AUTOTUNE^^}" != "TRUE" ] && [ -n "$CORE_LIMIT" ]; then
+    size=$(( $2 * CORE_LIMIT ))
+    if [ -n "$3" ] && [ $size -gt $3 ]; then
+      size=$3
+    fi
+  fi
+  echo "$size"
+}
+
+function autotune_pool_sizes() {
+  source /opt/run-java/container-limits
+
+  AUTOTUNE_IO_THREADS=$(autotune_size IO_WORKER_IO_THREADS 2)
+  AUTOTUNE_TASK_MAX_THREADS=$(autotune_size IO_WORKER_TASK_MAX_THREADS 16)
+  AUTOTUNE_EJB_MAX_THREADS=$(autotune_size EJB_MAX_THREADS 4 10)
+  AUTOTUNE_JCA_MAX_THREADS=$(autotune_size JCA_MAX_THREADS 10 50)
+  # used by the datasources and the resource adapters without a pool size
+  AUTOTUNE_MAX_POOL_SIZE=$(autotune_size DEFAULT_MAX_POOL_SIZE 10 20)
+
+  if [ -n "$CORE_LIMIT" ] && [ "${DISABLE_AUTOTUNE^^}" != "TRUE" ]; then
+    log_info "Autotuning the pool sizes for the limit of ${CORE_LIMIT} cores."
+  fi
+}
+
+function configure_autotuned_thread_pools() {
+  local worker_attributes="${AUTOTUNE_IO_THREADS:+ io-threads=\"${AUTOTUNE_IO_THREADS}\"}${AUTOTUNE_TASK_MAX_THREADS:+ task-max-threads=\"${AUTOTUNE_TASK_MAX_THREADS}\"}"
+  if [ -n "$worker_attributes" ]; then
+    sed_config "s|<worker name=\"default\"/>|<worker name=\"default\"${worker_attributes}/>|" $CONFIG_FILE
+    log_info "IO worker: io-threads=${AUTOTUNE_IO_THREADS:-default}, task-max-threads=${AUTOTUNE_TASK_MAX_THREADS:-default}"
+  fi
+
+  # the max-threads of the default thread pool of the ejb3 subsystem, whatever
+  # the indentation and the count
+  if [ -n "$AUTOTUNE_EJB_MAX_THREADS" ]; then
+    local ejb_pool='/<subsystem xmlns="urn:jboss:domain:ejb3:/,/<\/subsystem>/{/<thread-pool name="default"/,/<\/thread-pool>/'
+    if [ -n "$(sed -n "${ejb_pool}{/<max-threads /p}}" $CONFIG_FILE)" ]; then
+      sed_config "${ejb_pool}{s|<max-threads count=\"[^\"]*\"|<max-threads count=\"${AUTOTUNE_EJB_MAX_THREADS}\"|}}" $CONFIG_FILE
+      log_info "EJB thread pool: max-threads=${AUTOTUNE_EJB_MAX_THREADS}"
+    else
+      log_warning "EJB thread pool: no max-threads in the default thread pool of the ejb3 subsystem, max-threads=${AUTOTUNE_EJB_MAX_THREADS} not applied"
+    fi
+  fi
+
+  if [ -n "$AUTOTUNE_JCA_MAX_THREADS" ]; then
+    local element
+    # the queue length is not a number of threads, it is kept
+    for element in core-threads max-threads; do
+      sed_config "s|<${element} count=\"50\"/>|<${element} count=\"${AUTOTUNE_JCA_MAX_THREADS}\"/>|g" $CONFIG_FILE
+    done
+    log_info "JCA work manager: short and long running max-threads=${AUTOTUNE_JCA_MAX_THREADS}"
+  fi
+
+  if [ -n "$AUTOTUNE_MAX_POOL_SIZE" ]; then
+    log_info "Datasources and resource adapters: max-pool-size=${AUTOTUNE_MAX_POOL_SIZE} unless set for the service"
+  fi
+}
@@ -14,7 +14,7 @@ function configureEnv() {
 
   if [ -n "$JDBC_STORE_JNDI_NAME" ]; then
     local jdbcStore="<jdbc-store datasource-jndi-name=\"${JDBC_STORE_JNDI_NAME}\"/>"
-    sed -i "s|<!-- ##JDBC_STORE## -->|${jdbcStore}|" $CONFIG_FILE
+    sed_config "s|<!-- ##JDBC_STORE## -->|${jdbcStore}|" $CONFIG_FILE
   fi
 
 }
@@ -70,7 +70,7 @@ function refresh_interval() {
 function inject_default_job_repositories() {
   defaultjobrepo="     <default-job-repository name=\"in-memory\"/>"
 
-  sed -i "s|<!-- ##DEFAULT_JOB_REPOSITORY## -->|${defaultjobrepo%$'\n'}|g" $CONFIG_FILE
+  sed_config "s|<!-- ##DEFAULT_JOB_REPOSITORY## -->|${defaultjobrepo%$'\n'}|g" $CONFIG_FILE
 }
 
 # Arguments:
@@ -78,7 +78,7 @@ function inject_default_job_repositories() {
 function inject_default_job_repository() {
   defaultjobrepo="     <default-job-repository name=\"${1}\"/>"
 
-  sed -i "s|<!-- ##DEFAULT_JOB_REPOSITORY## -->|${defaultjobrepo%$'\n'}|" $CONFIG_FILE
+  sed_config "s|<!-- ##DEFAULT_JOB_REPOSITORY## -->|${defaultjobrepo%$'\n'}|" $CONFIG_FILE
 }
 
 function inject_job_repository() {
@@ -87,5 +87,5 @@ function inject_job_repository() {
     </job-repository>\
     <!-- ##JOB_REPOSITORY## -->"
 
-  sed -i "s|<!-- ##JOB_REPOSITORY## -->|${jobrepo%$'\n'}|" $CONFIG_FILE
+  sed_config "s|<!-- ##JOB_REPOSITORY## -->|${jobrepo%$'\n'}|" $CONFIG_FILE
 }
@@ -65,8 +65,8 @@ inject_filter() {
   local filterRef=$(generate_filter_ref "$refName")
   local responseHeader=$(generate_response_header "$refName" "$responseHeaderName" "$responseHeaderValue")
 
-  sed -i "s|<!-- ##FILTER_REFS## -->|${filterRef}\n<!-- ##FILTER_REFS## -->|" $CONFIG_FILE
-  sed -i "s|<!-- ##FILTER_RESPONSE_HEADERS## -->|${responseHeader}\n<!-- ##FILTER_RESPONSE_HEADERS## -->|" $CONFIG_FILE
+  sed_config "s|<!-- ##FILTER_REFS## -->|${filterRef}\n<!-- ##FILTER_REFS## -->|" $CONFIG_FILE
+  sed_config "s|<!-- ##FILTER_RESPONSE_HEADERS## -->|${responseHeader}\n<!-- ##FILTER_RESPONSE_HEADERS## -->|" $CONFIG_FILE
 }
 
 generate_filter_ref() {
@@ -43,6 +43,6 @@ function configure_https() {
     log_warning "Partial HTTPS configuration, the https connector WILL NOT be configured."
   fi
 
-  sed -i "s|<!-- ##SSL## -->|${ssl}|" $CONFIG_FILE
-  sed -i "s|<!-- ##HTTPS_CONNECTOR## -->|${https_connector}|" $CONFIG_FILE
+  sed_config "s|<!-- ##SSL## -->|${ssl}|" $CONFIG_FILE
+  sed_config "s|<!-- ##HTTPS_CONNECTOR## -->|${https_connector}|" $CONFIG_FILE
 }
@@ -106,8 +106,8 @@ function configure_mq() {
     destinations=$(configure_mq_destinations)
     activemq_subsystem=$(sed -e "s|<!-- ##DESTINATIONS## -->|${destinations}|" <"${ACTIVEMQ_SUBSYSTEM_FILE}" | sed ':a;N;$!ba;s|\n|\\n|g')
 
-    sed -i "s|<!-- ##MESSAGING_SUBSYSTEM_CONFIG## -->|${activemq_subsystem%$'\n'}|" "${CONFIG_FILE}"
-    sed -i 's|<!-- ##MESSAGING_PORTS## -->|<socket-binding name="messaging" port="5445"/><socket-binding name="messaging-throughput" port="5455"/>|' "${CONFIG_FILE}"
+    sed_config "s|<!-- ##MESSAGING_SUBSYSTEM_CONFIG## -->|${activemq_subsystem%$'\n'}|" "${CONFIG_FILE}"
+    sed_config 's|<!-- ##MESSAGING_PORTS## -->|<socket-binding name="messaging" port="5445"/><socket-binding name="messaging-throughput" port="5455"/>|' "${CONFIG_FILE}"
   fi
 }
 
@@ -180,7 +180,7 @@ function generate_resource_adapter() {
                               pool-name=\"$1-ConnectionFactory\">
                             <xa-pool>
                                 <min-pool-size>1</min-pool-size>
-                                <max-pool-size>20</max-pool-size>
+                                <max-pool-size>${AUTOTUNE_MAX_POOL_SIZE:-20}</max-pool-size>
                                 <prefill>false</prefill>
                                 <is-same-rm-override>false</is-same-rm-override>
                             </xa-pool>
@@ -346,10 +346,10 @@ function inject_brokers() {
     defaultJms="jms-connection-factory=\"$defaultJmsConnectionFactoryJndi\""
   fi
 
-  sed -i "s|<!-- ##RESOURCE_ADAPTERS## -->|${ras%$'\n'}<!-- ##RESOURCE_ADAPTERS## -->|" $CONFIG_FILE
+  sed_config "s|<!-- ##RESOURCE_ADAPTERS## -->|${ras%$'\n'}<!-- ##RESOURCE_ADAPTERS## -->|" $CONFIG_FILE
   # new format
-  sed -i "s|jms-connection-factory=\"##DEFAULT_JMS##\"|${defaultJms}|" $CONFIG_FILE
+  sed_config "s|jms-connection-factory=\"##DEFAULT_JMS##\"|${defaultJms}|" $CONFIG_FILE
   # legacy format, bare ##DEFAULT_JMS##
-  sed -i "s|##DEFAULT_JMS##|${defaultJms}|" $CONFIG_FILE
+  sed_config "s|##DEFAULT_JMS##|${defaultJms}|" $CONFIG_FILE
 }
 
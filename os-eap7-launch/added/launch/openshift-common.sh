@@ -11,6 +11,7 @@ LOGGING_FILE=$JBOSS_HOME/standalone/configuration/logging.properties
 
 CONFIGURE_SCRIPTS=(
   $JBOSS_HOME/bin/launch/backward-compatibility.sh
+  $JBOSS_HOME/bin/launch/autotune.sh
   $JBOSS_HOME/bin/launch/configure_extensions.sh
   $JBOSS_HOME/bin/launch/passwd.sh
   $JBOSS_HOME/bin/launch/messaging.sh
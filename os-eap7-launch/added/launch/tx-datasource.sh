@@ -77,7 +77,7 @@ function inject_jdbc_store() {
                 <communication table-prefix=\"${prefix}\"/>\\
                 <state table-prefix=\"${prefix}\"/>\\
             </jdbc-store>"
-  sed -i "s|<!-- ##JDBC_STORE## -->|${jdbcStore}|" $CONFIG_FILE
+  sed_config "s|<!-- ##JDBC_STORE## -->|${jdbcStore}|" $CONFIG_FILE
 }
 
 function inject_tx_datasource() {
@@ -142,6 +142,10 @@ function inject_tx_datasource() {
 
     # max pool size environment variable name format: [NAME]_[DATABASE_TYPE]_MAX_POOL_SIZE
     max_pool_size=$(find_env "${prefix}_MAX_POOL_SIZE")
+    # default sized by autotune.sh, never below the min pool size
+    if [ -z "$max_pool_size" ] && [ -n "$AUTOTUNE_MAX_POOL_SIZE" ]; then
+      max_pool_size=$(( ${min_pool_size:-0} > AUTOTUNE_MAX_POOL_SIZE ? ${min_pool_size:-0} : AUTOTUNE_MAX_POOL_SIZE ))
+    fi
 
     case "$db" in
       "MYSQL")
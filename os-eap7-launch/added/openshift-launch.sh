@@ -3,6 +3,7 @@
 
 source ${JBOSS_HOME}/bin/launch/openshift-common.sh
 source $JBOSS_HOME/bin/launch/logging.sh
+source $JBOSS_HOME/bin/launch/launch-trace.sh
 
 # TERM signal handler
 function clean_shutdown() {
@@ -14,7 +15,7 @@ function clean_shutdown() {
 function runServer() {
   local instanceDir=$1
 
-  source $JBOSS_HOME/bin/launch/configure.sh
+  trace_run configure.sh source $JBOSS_HOME/bin/launch/configure.sh
 
   log_info "Running $JBOSS_IMAGE_NAME image, version $JBOSS_IMAGE_VERSION"
 
@@ -47,7 +48,7 @@ if [ "${SPLIT_DATA^^}" = "TRUE" ]; then
 
   partitionPV "${DATA_DIR}" "${SPLIT_LOCK_TIMEOUT:-30}"
 else
-  source $JBOSS_HOME/bin/launch/configure.sh
+  trace_run configure.sh source $JBOSS_HOME/bin/launch/configure.sh
 
   log_info "Running $JBOSS_IMAGE_NAME image, version $JBOSS_IMAGE_VERSION"
 
@@ -0,0 +1,62 @@
+#!/usr/bin/env bats
+
+load common
+
+@test "configure_autotuned_thread_pools: EJB default thread pool" {
+    AUTOTUNE_EJB_MAX_THREADS=4
+
+    run configure_autotuned_thread_pools
+
+    [ "$status" -eq 0 ]
+    [[ "$output" == *"EJB thread pool: max-threads=4"* ]]
+    [ "$(thread_pool_max_threads ejb3 default)" = "4" ]
+    [ "$(thread_pool_max_threads batch-jberet batch)" = "10" ]
+}
+
+@test "configure_autotuned_thread_pools: EJB default thread pool - Reformatted" {
+    AUTOTUNE_EJB_MAX_THREADS=4
+    sed -i -e 's|^ *||' -e 's|<max-threads count="10"/>|<max-threads count="16"/>|' $CONFIG_FILE
+
+    run configure_autotuned_thread_pools
+
+    [ "$status" -eq 0 ]
+    [[ "$output" == *"EJB thread pool: max-threads=4"* ]]
+    [ "$(thread_pool_max_threads ejb3 default)" = "4" ]
+    [ "$(thread_pool_max_threads batch-jberet batch)" = "16" ]
+}
+
+@test "configure_autotuned_thread_pools: EJB default thread pool - Rendered" {
+    AUTOTUNE_EJB_MAX_THREADS=4
+    sed -i 's|<max-threads count="10"/>|<max-threads count="16"/>|' $CONFIG_FILE
+
+    start_config_render
+    configure_autotuned_thread_pools
+    [ "$(thread_pool_max_threads ejb3 default)" = "16" ]
+    render_config_files
+
+    [ "$(thread_pool_max_threads ejb3 default)" = "4" ]
+    [ "$(thread_pool_max_threads batch-jberet batch)" = "16" ]
+}
+
+@test "configure_autotuned_thread_pools: EJB default thread pool - Missing" {
+    AUTOTUNE_EJB_MAX_THREADS=4
+    sed -i 's|<thread-pool name="default">|<thread-pool name="custom">|' $CONFIG_FILE
+
+    run configure_autotuned_thread_pools
+
+    [ "$status" -eq 0 ]
+    [[ "$output" != *"EJB thread pool: max-threads=4"* ]]
+    [[ "$output" == *"$(expected_warn "EJB thread pool: no max-threads in the default thread pool of the ejb3 subsystem, max-threads=4 not applied")"* ]]
+    [ "$(thread_pool_max_threads ejb3 custom)" = "10" ]
+}
+
+@test "configure_autotuned_thread_pools: JCA work manager threads" {
+    AUTOTUNE_JCA_MAX_THREADS=12
+
+    run configure_autotuned_thread_pools
+
+    [ "$status" -eq 0 ]
+    [ "$(grep -c '<core-threads count="12"/>' $CONFIG_FILE)" = "2" ]
+    [ "$(grep -c '<max-threads count="12"/>' $CONFIG_FILE)" = "2" ]
+    [ "$(grep -c '<queue-length count="50"/>' $CONFIG_FILE)" = "2" ]
+}
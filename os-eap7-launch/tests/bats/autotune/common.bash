@@ -0,0 +1,23 @@
+load $BATS_TEST_DIRNAME/../../../../tests/bats/common/log_utils.bash
+
+export JBOSS_HOME=$BATS_TMPDIR/jboss_home
+export CONFIG_FILE=$JBOSS_HOME/standalone/configuration/standalone-openshift.xml
+
+mkdir -p $JBOSS_HOME/bin/launch
+cp $BATS_TEST_DIRNAME/../../../../jboss/container/util/logging/bash/artifacts/opt/jboss/container/util/logging/logging.sh $JBOSS_HOME/bin/launch
+cp $BATS_TEST_DIRNAME/../../../../os-eap-launch/added/launch/config-render.sh $JBOSS_HOME/bin/launch
+cp $BATS_TEST_DIRNAME/../../../../os-eap-launch/added/launch/configrender.py $JBOSS_HOME/bin/launch
+cp $BATS_TEST_DIRNAME/../../../added/launch/autotune.sh $JBOSS_HOME/bin/launch
+
+mkdir -p $JBOSS_HOME/standalone/configuration
+source $JBOSS_HOME/bin/launch/config-render.sh
+source $JBOSS_HOME/bin/launch/autotune.sh
+
+setup() {
+  cp $BATS_TEST_DIRNAME/../../../../os-eap71-openshift/added/standalone-openshift.xml $CONFIG_FILE
+}
+
+# Prints the max-threads count of the named thread pool of the subsystem
+thread_pool_max_threads() {
+  xmllint --xpath "string(//*[local-name()='subsystem' and starts-with(namespace-uri(), 'urn:jboss:domain:$1:')]//*[local-name()='thread-pool' and @name='$2']/*[local-name()='max-threads']/@count)" $CONFIG_FILE
+}
@@ -8,11 +8,13 @@ mkdir -p $JBOSS_HOME/bin/launch
 cp $BATS_TEST_DIRNAME/../../../../os-eap-node-name/added/launch/openshift-node-name.sh $JBOSS_HOME/bin/launch
 cp $BATS_TEST_DIRNAME/../../../../os-logging/added/launch/logging.sh $JBOSS_HOME/bin/launch
 cp $BATS_TEST_DIRNAME/../../../../os-eap-launch/added/launch/datasource-common.sh $JBOSS_HOME/bin/launch
+cp $BATS_TEST_DIRNAME/../../../../os-eap-launch/added/launch/config-render.sh $JBOSS_HOME/bin/launch
 cp $BATS_TEST_DIRNAME/../../../added/launch/launch-common.sh $JBOSS_HOME/bin/launch
 cp $BATS_TEST_DIRNAME/../../../added/launch/tx-datasource.sh $JBOSS_HOME/bin/launch
 cp $BATS_TEST_DIRNAME/../../../added/launch/datasource.sh $JBOSS_HOME/bin/launch
 
 mkdir -p $JBOSS_HOME/standalone/configuration
+source $JBOSS_HOME/bin/launch/config-render.sh
 source $JBOSS_HOME/bin/launch/datasource.sh
 
 setup() {
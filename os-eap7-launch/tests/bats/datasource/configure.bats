@@ -39,6 +39,96 @@ load common
     assert_datasources "datasources_sybase_pool_nonxa.xml"
 }
 
+@test "inject_datasources: DATASOURCES - NONXA - PoolSize - AUTOTUNE_MAX_POOL_SIZE" {
+    DATASOURCES="TEST"
+    TEST_JNDI="java:/jboss/datasources/testds"
+    TEST_DRIVER="sybase"
+    TEST_USERNAME="kermit"
+    TEST_PASSWORD="thefrog"
+    TEST_NONXA="true"
+    TEST_JTA="false"
+    TEST_URL="jdbc:sybase:Tds:localhost:5000/DATABASE?JCONNECT_VERSION=6"
+    TEST_MIN_POOL_SIZE="9"
+    AUTOTUNE_MAX_POOL_SIZE="20"
+
+    run inject_datasources
+
+    [ "$status" -eq 0 ]
+    assert_datasources "datasources_sybase_autotune_pool_nonxa.xml"
+}
+
+@test "inject_datasources: DATASOURCES - NONXA - PoolSize - AUTOTUNE_MAX_POOL_SIZE below MIN_POOL_SIZE" {
+    DATASOURCES="TEST"
+    TEST_JNDI="java:/jboss/datasources/testds"
+    TEST_DRIVER="sybase"
+    TEST_USERNAME="kermit"
+    TEST_PASSWORD="thefrog"
+    TEST_NONXA="true"
+    TEST_JTA="false"
+    TEST_URL="jdbc:sybase:Tds:localhost:5000/DATABASE?JCONNECT_VERSION=6"
+    TEST_MIN_POOL_SIZE="9"
+    AUTOTUNE_MAX_POOL_SIZE="5"
+
+    run inject_datasources
+
+    [ "$status" -eq 0 ]
+    assert_datasources "datasources_sybase_autotune_min_pool_nonxa.xml"
+}
+
+@test "inject_datasources: DATASOURCES - NONXA - PoolSize - MAX_POOL_SIZE over AUTOTUNE_MAX_POOL_SIZE" {
+    DATASOURCES="TEST"
+    TEST_JNDI="java:/jboss/datasources/testds"
+    TEST_DRIVER="sybase"
+    TEST_USERNAME="kermit"
+    TEST_PASSWORD="thefrog"
+    TEST_NONXA="true"
+    TEST_JTA="false"
+    TEST_URL="jdbc:sybase:Tds:localhost:5000/DATABASE?JCONNECT_VERSION=6"
+    TEST_MAX_POOL_SIZE="11"
+    TEST_MIN_POOL_SIZE="9"
+    AUTOTUNE_MAX_POOL_SIZE="20"
+
+    run inject_datasources
+
+    [ "$status" -eq 0 ]
+    assert_datasources "datasources_sybase_pool_nonxa.xml"
+}
+
+@test "inject_datasources: TX_DATABASE_PREFIX_MAPPING - PoolSize - AUTOTUNE_MAX_POOL_SIZE below MIN_POOL_SIZE" {
+    TX_DATABASE_PREFIX_MAPPING="test-postgresql=TEST"
+    TEST_POSTGRESQL_SERVICE_HOST="localhost"
+    TEST_POSTGRESQL_SERVICE_PORT="5432"
+    TEST_JNDI="java:/jboss/datasources/testds"
+    TEST_USERNAME="kermit"
+    TEST_PASSWORD="thefrog"
+    TEST_DATABASE="postgresdb"
+    TEST_MIN_POOL_SIZE="9"
+    AUTOTUNE_MAX_POOL_SIZE="5"
+
+    run inject_datasources
+
+    [ "$status" -eq 0 ]
+    assert_datasources "tx_postgresql_autotune_min_pool.xml"
+}
+
+@test "inject_datasources: TX_DATABASE_PREFIX_MAPPING - PoolSize - MAX_POOL_SIZE over AUTOTUNE_MAX_POOL_SIZE" {
+    TX_DATABASE_PREFIX_MAPPING="test-postgresql=TEST"
+    TEST_POSTGRESQL_SERVICE_HOST="localhost"
+    TEST_POSTGRESQL_SERVICE_PORT="5432"
+    TEST_JNDI="java:/jboss/datasources/testds"
+    TEST_USERNAME="kermit"
+    TEST_PASSWORD="thefrog"
+    TEST_DATABASE="postgresdb"
+    TEST_MAX_POOL_SIZE="11"
+    TEST_MIN_POOL_SIZE="9"
+    AUTOTUNE_MAX_POOL_SIZE="20"
+
+    run inject_datasources
+
+    [ "$status" -eq 0 ]
+    assert_datasources "tx_postgresql_pool.xml"
+}
+
 @test "inject_datasources: DATASOURCES - NONXA - URL " {
     DATASOURCES="TEST"
     TEST_JNDI="java:/jboss/datasources/testds"
@@ -155,7 +155,7 @@ function configure_server_identities() {
     serverids="\
         <server-identities>$ssl$secret\
         </server-identities>"
-    sed -i "s|<!-- ##SERVER_IDENTITIES## -->|$serverids|" "$CONFIG_FILE"
+    sed_config "s|<!-- ##SERVER_IDENTITIES## -->|$serverids|" "$CONFIG_FILE"
   fi
 }
 
@@ -206,7 +206,7 @@ function configure_infinispan_core() {
 
   local containers="<cache-container name=\"clustered\" default-cache=\"$DEFAULT_CACHE\" $cache_container_start $cache_container_statistics>$transport $containersecurity <!-- ##INFINISPAN_CACHE## --> </cache-container><cache-container name=\"security\"/>"
 
-  sed -i "s|<!-- ##INFINISPAN_CORE## -->|$containers|" "$CONFIG_FILE"
+  sed_config "s|<!-- ##INFINISPAN_CORE## -->|$containers|" "$CONFIG_FILE"
 
 }
 
@@ -362,7 +362,7 @@ function configure_cache() {
   cache="$cache $CACHE_START $CACHE_BATCHING $CACHE_STATISTICS $CACHE_OWNERS $CACHE_SEGMENTS $CACHE_L1_LIFESPAN>$eviction $expiration $jdbcstore $indexing $cachesecurity $partitionhandling $locking $transaction $state_transfer \
                 </$CACHE_TYPE-cache><!-- ##INFINISPAN_CACHE## -->"
 
-  sed -i "s|<!-- ##INFINISPAN_CACHE## -->|$cache|" "$CONFIG_FILE"
+  sed_config "s|<!-- ##INFINISPAN_CACHE## -->|$cache|" "$CONFIG_FILE"
 
 }
 
@@ -615,5 +615,5 @@ function configure_infinispan_endpoint() {
         <subsystem xmlns=\"urn:infinispan:server:endpoint:6.1\">$hotrod $memcached $rest\
         </subsystem>"
 
-  sed -i "s|<!-- ##INFINISPAN_ENDPOINT## -->|$subsystem|" "$CONFIG_FILE"
+  sed_config "s|<!-- ##INFINISPAN_ENDPOINT## -->|$subsystem|" "$CONFIG_FILE"
 }
@@ -34,5 +34,5 @@ function configure_jgroups_encryption() {
     fi
   fi
 
-  sed -i "s|<!-- ##JGROUPS_ENCRYPT## -->|$jgroups_encrypt|g" "$CONFIG_FILE"
+  sed_config "s|<!-- ##JGROUPS_ENCRYPT## -->|$jgroups_encrypt|g" "$CONFIG_FILE"
 }
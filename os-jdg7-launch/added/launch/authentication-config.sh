@@ -89,5 +89,5 @@ function add_realm_domain_mapping() {
   fi
   realm="$realm $ssl</security-realm>"  
 
-  sed -i "s|<!-- ##DATAGRID_REALM## -->|${realm}|" "${CONFIG_FILE}" 
+  sed_config "s|<!-- ##DATAGRID_REALM## -->|${realm}|" "${CONFIG_FILE}" 
 }
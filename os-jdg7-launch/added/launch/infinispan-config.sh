@@ -169,7 +169,7 @@ function configure_server_identities() {
     serverids="\
         <server-identities>$ssl$secret\
         </server-identities>"
-    sed -i "s|<!-- ##SERVER_IDENTITIES## -->|$serverids|" "$CONFIG_FILE"
+    sed_config "s|<!-- ##SERVER_IDENTITIES## -->|$serverids|" "$CONFIG_FILE"
   fi
 }
 
@@ -231,7 +231,7 @@ function configure_infinispan_core() {
   containers="$containers ${cache_container_configuration}"
   containers="$containers $containersecurity <!-- ##INFINISPAN_CACHE## --></cache-container>"
 
-  sed -i "s|<!-- ##INFINISPAN_CORE## -->|$containers|" "$CONFIG_FILE"
+  sed_config "s|<!-- ##INFINISPAN_CORE## -->|$containers|" "$CONFIG_FILE"
 
 }
 
@@ -390,7 +390,7 @@ function configure_cache() {
   cache="$cache $CACHE_START $CACHE_BATCHING $CACHE_STATISTICS  $CACHE_OWNERS $CACHE_SEGMENTS $CACHE_L1_LIFESPAN>$eviction $expiration $jdbcstore $indexing $cachesecurity $partitionhandling $locking $transaction $state_transfer $compatibility\
                 </$CACHE_TYPE-cache><!-- ##INFINISPAN_CACHE## -->"
 
-  sed -i "s|<!-- ##INFINISPAN_CACHE## -->|$cache|" "$CONFIG_FILE"
+  sed_config "s|<!-- ##INFINISPAN_CACHE## -->|$cache|" "$CONFIG_FILE"
 
 }
 
@@ -663,5 +663,5 @@ function configure_infinispan_endpoint() {
         <subsystem xmlns=\"urn:infinispan:server:endpoint:8.1\">$hotrod $memcached $rest\
         </subsystem>"
 
-  sed -i "s|<!-- ##INFINISPAN_ENDPOINT## -->|$subsystem|" "$CONFIG_FILE"
+  sed_config "s|<!-- ##INFINISPAN_ENDPOINT## -->|$subsystem|" "$CONFIG_FILE"
 }
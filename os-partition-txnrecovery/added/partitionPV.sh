@@ -52,23 +52,8 @@ function partitionPV() {
   init_pod_name
   local applicationPodDir="${podsDir}/${POD_NAME}"
 
-  local waitCounter=0
-  # 2) while any file matching, sleep
-  while true; do
-    local isRecoveryInProgress=false
-    # is there an existing RECOVERY descriptor that means a recovery is in progress
-    find "${podsDir}" -maxdepth 1 -type f -name "${POD_NAME}-RECOVERY-*" 2>/dev/null | grep -q .
-    [ $? -eq 0 ] && isRecoveryInProgress=true
-
-    # we are free to start the app container
-    if ! $isRecoveryInProgress; then
-      break
-    fi
-
-    if $isRecoveryInProgress; then
-      echo "Waiting to start pod ${POD_NAME} as recovery process '$(echo ${podsDir}/${POD_NAME}-RECOVERY-*)' is currently cleaning data directory."
-    fi
-
+  # 2) while any valid recovery marker (lease) exists, wait
+  until $(dirname ${BASH_SOURCE[0]})/recoverylease.py wait "${podsDir}" --pod "${POD_NAME}" --ttl ${RECOVERY_LEASE_TTL:-120} ${DEBUG_QUERY_API_PARAM}; do
     sleep 1
     echo "`date`: waiting for recovery process to clean the environment for the pod to start"
   done
@@ -104,6 +89,231 @@ function partitionPV() {
   exit $STATUS
 }
 
+# Computes how many orphaned directories could be migrated concurrently.
+# Every migration boots a separate server instance, the pool size is then
+# bounded by the cores and by the memory available to the container.
+# MIGRATION_POOL_SIZE defines the size explicitly.
+function migrationPoolSize() {
+  if [ -n "${MIGRATION_POOL_SIZE}" ]; then
+    echo "${MIGRATION_POOL_SIZE}"
+    return
+  fi
+
+  # set CORE_LIMIT and CONTAINER_MAX_MEMORY
+  [ -r /opt/run-java/container-limits ] && source /opt/run-java/container-limits
+
+  local poolSize=${CORE_LIMIT:-1}
+  if [ -n "${CONTAINER_MAX_MEMORY}" ]; then
+    local serverMemory=$((${MIGRATION_SERVER_MEMORY:-512} * 1048576))
+    local memoryPoolSize=$((CONTAINER_MAX_MEMORY / serverMemory))
+    [ ${memoryPoolSize} -lt ${poolSize} ] && poolSize=${memoryPoolSize}
+  fi
+  [ ${poolSize} -lt 1 ] && poolSize=1
+  echo ${poolSize}
+}
+
+# Returns 0 when the living pods list is cached on the persistent volume (LIVING_PODS_CACHE_TTL is set).
+function isLivingPodsCacheEnabled() {
+  [ -n "${LIVING_PODS_CACHE_TTL}" ] && [ "${LIVING_PODS_CACHE_TTL}" != "0" ] && [ -n "${MIGRATION_PODS_DIR}" ]
+}
+
+# Prints names of the living pods, delimited with space.
+# parameters
+# - "fresh" to query the api regardless of the living pods cache (optional)
+function queryLivingPods() {
+  local cacheParams=''
+  if isLivingPodsCacheEnabled; then
+    cacheParams="--cache ${MIGRATION_PODS_DIR}/.living-pods-cache.json --cachettl ${LIVING_PODS_CACHE_TTL}"
+    [ "$1" = "fresh" ] && cacheParams="${cacheParams} --fresh"
+  fi
+  $(dirname ${BASH_SOURCE[0]})/query.py -q pods_living -f list_space ${cacheParams} ${DEBUG_QUERY_API_PARAM}
+}
+
+# Checks the transaction object store of the server data directory without starting the server.
+# parameters
+# - server data directory
+# returns 0 when the object store contains no transaction records, i.e. there is nothing to recover
+function isObjectStoreEmpty() {
+  # records of the jdbc object store are not stored in the server data directory
+  [ -n "${TX_DATABASE_PREFIX_MAPPING}" ] && return 1
+
+  local recordCount=$($(dirname ${BASH_SOURCE[0]})/txstore.py -q count "$1" ${DEBUG_QUERY_API_PARAM})
+  [ "${recordCount}" = "0" ]
+}
+
+# Lists application pod directories in order they should be migrated, the directories with empty
+# object store first, followed by the ones with the most and the oldest transaction records.
+# parameters
+# - base directory
+function listApplicationPodDirs() {
+  local podsDir="$1"
+  local applicationPodName recordCount
+
+  local orderedNames
+  orderedNames=$($(dirname ${BASH_SOURCE[0]})/txstore.py -q order "${podsDir}" ${DEBUG_QUERY_API_PARAM})
+  if [ $? -ne 0 ]; then
+    echo "${podsDir}"/*
+    return
+  fi
+  while read applicationPodName recordCount; do
+    [ -n "${applicationPodName}" ] && echo "${podsDir}/${applicationPodName}"
+  done <<< "${orderedNames}"
+}
+
+# Migrates the application pod directory, meant to be run in background
+# as one of the workers of the migration pool.
+# When finished the application pod directory is removed if the recovery
+# succeeded and the recovery marker is released.
+# parameters
+# - application pod directory
+# - base directory
+# - migration slot number (starting with 0)
+# - migration pool size
+function migrateApplicationPodDir() {
+  local applicationPodDir="$1"
+  local podsDir="$2"
+  local slot="$3"
+  local poolSize="$4"
+  local applicationPodName="$(basename ${applicationPodDir})"
+  local recoveryPodName="${POD_NAME}"
+
+  # every concurrent server instance has to listen on distinct ports and share the memory
+  export PORT_OFFSET=$((${MIGRATION_BASE_PORT_OFFSET} + slot * ${MIGRATION_PORT_OFFSET_STEP:-100}))
+  if [ ${poolSize} -gt 1 ]; then
+    export MIGRATION_SLOT="${slot}"
+    export JAVA_MAX_MEM_RATIO=$((${JAVA_MAX_MEM_RATIO:-50} / poolSize))
+  fi
+
+  # the lease is renewed while this worker is alive, it is terminated when the lease was lost
+  renewLeaseWhileAlive "${applicationPodName}" ${BASHPID} terminate &
+  local heartbeatPid=$!
+
+  # 1.a.ii) run recovery until empty (including orphan checks and empty object store hierarchy deletion)
+  MIGRATION_POD_TIMESTAMP=$(getPodLogTimestamp)  # investigating on current pod timestamp
+  SERVER_DATA_DIR="${applicationPodDir}/serverData"
+  NODE_NAME=$(truncate_jboss_node_name "${applicationPodName}") runMigration "${SERVER_DATA_DIR}" &
+
+  PID=$!
+
+  trap "echo Received TERM ; kill -TERM $PID" TERM
+
+  wait $PID 2>/dev/null
+  STATUS=$?
+  trap - TERM
+  wait $PID 2>/dev/null
+
+  echo "Migration of directory '${applicationPodDir}' terminated with status $STATUS ($(kill -l $STATUS))"
+
+  if [ "$STATUS" -eq 255 ] ; then
+    echo "Server returned 255, changing to 254"
+    STATUS=254
+  fi
+
+  if [ $STATUS -eq 0 ]; then
+    # 1.a.iii) Delete /pods/<applicationPodName> when recovery was succesful
+    echo "`date`: Migration succesfully finished for application directory ${applicationPodDir} thus removing it by recovery pod ${recoveryPodName}"
+    rm -rf "${applicationPodDir}"
+  fi
+
+  # 1.b.) Deleting the recovery marker, an unsuccessful migration is reattempted in the next cycle
+  kill -TERM ${heartbeatPid} 2>/dev/null
+  wait ${heartbeatPid} 2>/dev/null
+  rm -f "${podsDir}/${applicationPodName}-RECOVERY-${recoveryPodName}"
+  exit $STATUS
+}
+
+# Reports the directories being migrated by the migration pool workers.
+function reportMigrationProgress() {
+  local slot
+  local now=$(date +'%s')
+  for slot in "${!MIGRATION_SLOT_PIDS[@]}"; do
+    echo "`date`: [slot ${slot}] migration of directory '${MIGRATION_SLOT_DIRS[$slot]}' in progress for $((now - MIGRATION_SLOT_STARTS[$slot])) seconds"
+  done
+}
+
+# Renews the recovery lease of the application pod directory every RECOVERY_LEASE_HEARTBEAT
+# seconds while the process holding it is alive, meant to be run in background so the lease
+# is renewed regardless of the steps the holder is blocked in. When the lease was lost, i.e.
+# expired and the application pod could have been started, the holder is terminated if
+# requested and the heartbeat exits with status 1.
+# parameters
+# - application pod name
+# - pid of the process holding the lease
+# - "terminate" to terminate the holder when the lease was lost (optional)
+function renewLeaseWhileAlive() {
+  local applicationPodName="$1"
+  local holderPid="$2"
+  local onLost="$3"
+  local lostNames
+
+  # a renewal in progress completes before the heartbeat is stopped, it never recreates a released marker
+  trap 'exit 0' TERM
+  while kill -0 ${holderPid} 2>/dev/null; do
+    # an unsuccessful renewal with no lost lease is retried with the next heartbeat
+    lostNames=$($(dirname ${BASH_SOURCE[0]})/recoverylease.py renew "${MIGRATION_PODS_DIR}" --owner "${POD_NAME}" --pod "${applicationPodName}" --ttl ${RECOVERY_LEASE_TTL:-120} ${DEBUG_QUERY_API_PARAM})
+    if [ -n "${lostNames}" ]; then
+      echo "`date`: recovery lease of directory '${MIGRATION_PODS_DIR}/${applicationPodName}' was lost"
+      [ "${onLost}" = "terminate" ] && kill -TERM ${holderPid}
+      exit 1
+    fi
+    sleep ${RECOVERY_LEASE_HEARTBEAT:-10} &
+    wait $!
+  done
+  exit 0
+}
+
+# Stops the heartbeat of the lease of the directory examined by the migration loop,
+# started when the lease was acquired.
+# returns 1 when the lease was lost meanwhile
+function stopPendingLeaseHeartbeat() {
+  [ -z "${MIGRATION_PENDING_HEARTBEAT}" ] && return 0
+  kill -TERM ${MIGRATION_PENDING_HEARTBEAT} 2>/dev/null
+  wait ${MIGRATION_PENDING_HEARTBEAT} 2>/dev/null
+  local status=$?
+  unset MIGRATION_PENDING_HEARTBEAT
+  [ ${status} -ne 1 ]
+}
+
+# Collects the migration pool workers which finished. With no parameter
+# it waits until a slot is free, and sets MIGRATION_FREE_SLOT to it.
+# parameters
+# - migration pool size
+# - "all" to wait for all the running workers to finish (optional)
+function waitForMigrationSlot() {
+  local poolSize="$1"
+  local waitForAll="$2"
+  local slot
+  local lastReport=$(date +'%s')
+
+  while true; do
+    for slot in "${!MIGRATION_SLOT_PIDS[@]}"; do
+      if ! kill -0 ${MIGRATION_SLOT_PIDS[$slot]} 2>/dev/null; then
+        wait ${MIGRATION_SLOT_PIDS[$slot]} 2>/dev/null
+        local status=$?
+        echo "`date`: [slot ${slot}] migration of directory '${MIGRATION_SLOT_DIRS[$slot]}' finished with status ${status} after $(($(date +'%s') - MIGRATION_SLOT_STARTS[$slot])) seconds"
+        unset "MIGRATION_SLOT_PIDS[$slot]" "MIGRATION_SLOT_DIRS[$slot]" "MIGRATION_SLOT_STARTS[$slot]"
+      fi
+    done
+
+    if [ "${waitForAll}" = "all" ]; then
+      [ ${#MIGRATION_SLOT_PIDS[@]} -eq 0 ] && return 0
+    else
+      for ((slot = 0; slot < poolSize; slot++)); do
+        if [ -z "${MIGRATION_SLOT_PIDS[$slot]}" ]; then
+          MIGRATION_FREE_SLOT=${slot}
+          return 0
+        fi
+      done
+    fi
+
+    if [ $(($(date +'%s') - lastReport)) -ge ${MIGRATION_PROGRESS_INTERVAL:-30} ]; then
+      reportMigrationProgress
+      lastReport=$(date +'%s')
+    fi
+    sleep 1
+  done
+}
+
 # parameters
 # - base directory
 # - migration pause between cycles
@@ -116,94 +326,98 @@ function migratePV() {
   init_pod_name
   local recoveryPodName="${POD_NAME}"
 
+  # pool of workers, indexed by slot, migrating the orphaned directories concurrently
+  local poolSize=$(migrationPoolSize)
+  MIGRATION_BASE_PORT_OFFSET=${PORT_OFFSET:-0}
+  MIGRATION_PODS_DIR="${podsDir}"
+  MIGRATION_SLOT_PIDS=()
+  MIGRATION_SLOT_DIRS=()
+  MIGRATION_SLOT_STARTS=()
+  echo "Orphaned directories are migrated by a pool of ${poolSize} server instance(s)"
+
+  # the workers and the heartbeat of the lease acquired while waiting for a free slot
+  trap 'echo Received TERM ; [ ${#MIGRATION_SLOT_PIDS[@]} -gt 0 -o -n "${MIGRATION_PENDING_HEARTBEAT}" ] && kill -TERM ${MIGRATION_SLOT_PIDS[@]} ${MIGRATION_PENDING_HEARTBEAT}' TERM
+
   while true ; do
 
     # 1) Periodically, for each /pods/<applicationPodName>
-    for applicationPodDir in "${podsDir}"/*; do
+    for applicationPodDir in $(listApplicationPodDirs "${podsDir}"); do
       # check if the found file is type of directory, if not directory move to the next item
       [ ! -d "$applicationPodDir" ] && continue
 
       # 1.a) create /pods/<applicationPodName>-RECOVERY-<recoveryPodName>
       local applicationPodName="$(basename ${applicationPodDir})"
-      touch "${podsDir}/${applicationPodName}-RECOVERY-${recoveryPodName}"
-      sync
-      STATUS=42 # expecting there could be  error on getting living pods
+      if ! $(dirname ${BASH_SOURCE[0]})/recoverylease.py acquire "${podsDir}" --pod "${applicationPodName}" --owner "${recoveryPodName}" --ttl ${RECOVERY_LEASE_TTL:-120} ${DEBUG_QUERY_API_PARAM}; then
+        echo "ERROR: Can't create recovery marker for directory: '${applicationPodDir}'"
+        continue
+      fi
+      # the lease is renewed in background until the directory is handed over to a worker or released
+      renewLeaseWhileAlive "${applicationPodName}" ${BASHPID} &
+      MIGRATION_PENDING_HEARTBEAT=$!
 
       # 1.a.i) if <applicationPodName> is not in the cluster
       echo "examining existence of living pod for directory: '${applicationPodDir}'"
       unset LIVING_PODS
-      LIVING_PODS=($($(dirname ${BASH_SOURCE[0]})/query.py -q pods_living -f list_space ${DEBUG_QUERY_API_PARAM}))
-      [ $? -ne 0 ] && echo "ERROR: Can't get list of living pods" && continue
+      LIVING_PODS=($(queryLivingPods))
+      [ $? -ne 0 ] && echo "ERROR: Can't get list of living pods" && { stopPendingLeaseHeartbeat; continue; }
+      local livingPodsFresh=true
+      isLivingPodsCacheEnabled && livingPodsFresh=false
+      # the directory is migrated and deleted only when the pod is not living in the fresh list
+      if ! arrContains ${applicationPodName} "${LIVING_PODS[@]}" && [ "${livingPodsFresh}" != "true" ]; then
+        LIVING_PODS=($(queryLivingPods fresh))
+        [ $? -ne 0 ] && echo "ERROR: Can't get list of living pods" && { stopPendingLeaseHeartbeat; continue; }
+        livingPodsFresh=true
+      fi
       # expecting the application pod of the same name was started/is living, it will manage recovery on its own
-      local IS_APPLICATION_POD_LIVING=true
-      if ! arrContains ${applicationPodName} "${LIVING_PODS[@]}"; then
-
-        IS_APPLICATION_POD_LIVING=false
-
-        (
-          # 1.a.ii) run recovery until empty (including orphan checks and empty object store hierarchy deletion)
-          MIGRATION_POD_TIMESTAMP=$(getPodLogTimestamp)  # investigating on current pod timestamp
-          SERVER_DATA_DIR="${applicationPodDir}/serverData"
-          NODE_NAME=$(truncate_jboss_node_name "${applicationPodName}") runMigration "${SERVER_DATA_DIR}" &
-
-          PID=$!
-
-          trap "echo Received TERM ; kill -TERM $PID" TERM
-
-          wait $PID 2>/dev/null
-          STATUS=$?
-          trap - TERM
-          wait $PID 2>/dev/null
-
-          echo "Migration terminated with status $STATUS ($(kill -l $STATUS))"
-
-          if [ "$STATUS" -eq 255 ] ; then
-            echo "Server returned 255, changing to 254"
-            STATUS=254
-          fi
-          exit $STATUS
-        ) &
-
-        PID=$!
-
-        trap "kill -TERM $PID" TERM
-
-        wait $PID 2>/dev/null
-        STATUS=$?
-        trap - TERM
-        wait $PID 2>/dev/null
-
-        if [ $STATUS -eq 0 ]; then
-          # 1.a.iii) Delete /pods/<applicationPodName> when recovery was succesful
-          echo "`date`: Migration succesfully finished for application directory ${applicationPodDir} thus removing it by recovery pod ${recoveryPodName}"
-          rm -rf "${applicationPodDir}"
+      if ! arrContains ${applicationPodName} "${LIVING_PODS[@]}" && isObjectStoreEmpty "${applicationPodDir}/serverData"; then
+        # 1.a.ii) nothing to recover, reclaiming without starting the server
+        if ! stopPendingLeaseHeartbeat; then
+          echo "`date`: Skipping directory ${applicationPodDir}, its recovery lease was lost"
+          continue
         fi
-      fi
+        echo "`date`: No transaction records in application directory ${applicationPodDir} thus removing it by recovery pod ${recoveryPodName}"
+        rm -rf "${applicationPodDir}"
+        rm -f "${podsDir}/${applicationPodName}-RECOVERY-${recoveryPodName}"
+      elif ! arrContains ${applicationPodName} "${LIVING_PODS[@]}"; then
+        waitForMigrationSlot ${poolSize}
+        local slot=${MIGRATION_FREE_SLOT}
+        # the worker renews the lease from now on
+        if ! stopPendingLeaseHeartbeat; then
+          echo "`date`: Skipping directory ${applicationPodDir}, its recovery lease was lost"
+          continue
+        fi
+
+        migrateApplicationPodDir "${applicationPodDir}" "${podsDir}" ${slot} ${poolSize} &
 
-      # 1.b.) Deleting the recovery marker
-      if [ $STATUS -eq 0 ] || [ $IS_APPLICATION_POD_LIVING ]; then
-        # STATUS is 0: we are free from in-doubt transactions
-        # IS_APPLICATION_POD_LIVING==true: there is a running pod of the same name, will do the recovery on his own, recovery pod won't manage it
+        MIGRATION_SLOT_PIDS[$slot]=$!
+        MIGRATION_SLOT_DIRS[$slot]="${applicationPodDir}"
+        MIGRATION_SLOT_STARTS[$slot]=$(date +'%s')
+        echo "`date`: [slot ${slot}] migration of directory '${applicationPodDir}' started with port offset $((MIGRATION_BASE_PORT_OFFSET + slot * ${MIGRATION_PORT_OFFSET_STEP:-100}))"
+      else
+        # 1.b.) Deleting the recovery marker
+        # there is a running pod of the same name, will do the recovery on his own, recovery pod won't manage it
+        stopPendingLeaseHeartbeat
         rm -f "${podsDir}/${applicationPodName}-RECOVERY-${recoveryPodName}"
       fi
 
       # 2) Periodically, for files /pods/<applicationPodName>-RECOVERY-<recoveryPodName>, for failed recovery pods
-      for recoveryPodFilePathToCheck in "${podsDir}/"*-RECOVERY-*; do
-        local recoveryPodFileToCheck="$(basename ${recoveryPodFilePathToCheck})"
-        local recoveryPodNameToCheck=${recoveryPodFileToCheck#*RECOVERY-}
-
-        unset LIVING_PODS
-        LIVING_PODS=($($(dirname ${BASH_SOURCE[0]})/query.py -q pods_living -f list_space ${DEBUG_QUERY_API_PARAM}))
-        [ $? -ne 0 ] && echo "ERROR: Can't get list of living pods" && continue
-
-        if ! arrContains ${recoveryPodNameToCheck} "${LIVING_PODS[@]}"; then
-          # recovery pod is dead, garbage collecting
-          rm -f "${recoveryPodFilePathToCheck}"
-        fi
-      done
+      # recovery pod is dead when its lease expired, garbage collecting, the legacy markers of the
+      # recovery pods not renewing leases yet are removed only when the recovery pod is not living,
+      # decided by the fresh list as a recovery pod could have been started after the cached one
+      local expireLivingParams=()
+      if [ "${livingPodsFresh}" = "true" ]; then
+        expireLivingParams=(--living "${LIVING_PODS[@]}")
+      elif [ -n "$(find "${podsDir}" -maxdepth 1 -name "*-RECOVERY-*" -empty 2>/dev/null)" ]; then
+        local freshLivingPods
+        freshLivingPods=($(queryLivingPods fresh)) && expireLivingParams=(--living "${freshLivingPods[@]}")
+      fi
+      $(dirname ${BASH_SOURCE[0]})/recoverylease.py expire "${podsDir}" --ttl ${RECOVERY_LEASE_TTL:-120} "${expireLivingParams[@]}" ${DEBUG_QUERY_API_PARAM}
 
     done
 
+    # every directory is visited once per cycle, the cycle finishes when all its migrations finish
+    waitForMigrationSlot ${poolSize} all
+
     echo "`date`: Finished Migration Check cycle, pausing for ${MIGRATION_PAUSE} seconds before resuming"
     MIGRATION_POD_TIMESTAMP=$(getPodLogTimestamp)
     sleep "${MIGRATION_PAUSE}"
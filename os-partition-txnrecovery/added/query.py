@@ -16,8 +16,13 @@ permissions and limitations under the License.
 """
 
 import argparse
+import errno
+import fcntl
 import json
 import logging
+import os
+import socket
+import time
 import urllib2
 
 from enum import Enum
@@ -59,10 +64,11 @@ class OpenShiftQuery():
     to get token and uri of the query. Having methods doing the query etc.
     """
 
-    API_URL = 'https://openshift.default.svc'
-    TOKEN_FILE_PATH = '/var/run/secrets/kubernetes.io/serviceaccount/token'
-    NAMESPACE_FILE_PATH = '/var/run/secrets/kubernetes.io/serviceaccount/namespace'
-    CERT_FILE_PATH = '/var/run/secrets/kubernetes.io/serviceaccount/ca.crt'
+    API_URL = os.getenv('OPENSHIFT_API_URL', 'https://openshift.default.svc')
+    SERVICE_ACCOUNT_DIR = os.getenv('OPENSHIFT_SERVICE_ACCOUNT_DIR', '/var/run/secrets/kubernetes.io/serviceaccount')
+    TOKEN_FILE_PATH = SERVICE_ACCOUNT_DIR + '/token'
+    NAMESPACE_FILE_PATH = SERVICE_ACCOUNT_DIR + '/namespace'
+    CERT_FILE_PATH = SERVICE_ACCOUNT_DIR + '/ca.crt'
     STATUS_LIVING_PODS = ['Pending', 'Running', 'Unknown']
 
     @staticmethod
@@ -84,27 +90,112 @@ class OpenShiftQuery():
             headers = {'Authorization': 'Bearer ' + OpenShiftQuery.getToken(), "Accept": 'application/json'})
         logger.debug('query for: "%s"', request.get_full_url())
         try:
-            return urllib2.urlopen(request, cafile = OpenShiftQuery.CERT_FILE_PATH).read()
+            return urllib2.urlopen(request, cafile = OpenShiftQuery.CERT_FILE_PATH if request.get_type() == 'https' else None).read()
         except:
             logger.critical('Cannot query OpenShift API for "%s"', request.get_full_url())
             raise
 
 
 
-def getPodsJsonData():
+class PodsCache():
+    """
+    Cache of the pods list shared through a file, e.g. on the persistent volume
+    used by several recovery pods. The file is written atomically (renaming of
+    a temporary file) with the time of the query and the resourceVersion of the
+    pods list. Only one process at a time (holding the flock of the lock file)
+    refreshes the expired cache, the others wait for it and read the file.
+    """
+
+    def __init__(self, cacheFile, ttl):
+        self.cacheFile = cacheFile
+        self.lockFile = cacheFile + '.lock'
+        self.ttl = ttl
+
+    def __read(self):
+        try:
+            with open(self.cacheFile, 'r') as cache:
+                return json.load(cache)
+        except IOError as e:
+            if e.errno == errno.ENOENT:
+                return None
+            raise
+        except ValueError:
+            logger.warning('Cannot parse pods cache file "%s", ignoring it', self.cacheFile)
+            return None
+
+    def __isValid(self, cached):
+        return cached is not None and time.time() - cached['timestamp'] <= self.ttl
+
+    def write(self, jsonPodsData):
+        cached = {
+            'timestamp': time.time(),
+            'resourceVersion': jsonPodsData.get('metadata', {}).get('resourceVersion'),
+            'items': [{'metadata': {'name': pod['metadata']['name']}, 'status': {'phase': pod['status']['phase']}}
+                for pod in jsonPodsData['items']]
+        }
+        # the cache is on the shared volume, pids of different pods may be the same
+        tmpFile = '{}.{}.{}.tmp'.format(self.cacheFile, socket.gethostname(), os.getpid())
+        with open(tmpFile, 'w') as cache:
+            json.dump(cached, cache)
+        os.rename(tmpFile, self.cacheFile)
+        logger.debug('pods cache "%s" refreshed at resourceVersion %s', self.cacheFile, cached['resourceVersion'])
+        return cached
+
+    def get(self, query):
+        """
+        Returns the cached pods json data, refreshing it by calling query when expired.
+        """
+        cached = self.__read()
+        if self.__isValid(cached):
+            logger.debug('using pods cache "%s" of resourceVersion %s', self.cacheFile, cached['resourceVersion'])
+            return cached
+        with open(self.lockFile, 'a') as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except IOError as e:
+                if e.errno not in (errno.EAGAIN, errno.EACCES):
+                    raise
+                # other process is refreshing the cache, waiting for it to finish
+                fcntl.flock(lock, fcntl.LOCK_SH)
+                cached = self.__read()
+                if self.__isValid(cached):
+                    return cached
+                fcntl.flock(lock, fcntl.LOCK_UN)
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            # elected to refresh, unless somebody did so meanwhile
+            cached = self.__read()
+            if self.__isValid(cached):
+                return cached
+            return self.write(query())
+
+
+def queryPodsJsonData():
     jsonText = OpenShiftQuery.queryApi('/api/v1/namespaces/{}/pods'.format(OpenShiftQuery.getNameSpace()))
     return json.loads(jsonText)
 
-def getPods():
-    jsonPodsData = getPodsJsonData()
+def getPodsJsonData(cache = None, fresh = False):
+    if cache is None:
+        return queryPodsJsonData()
+    if fresh:
+        # decisions like deletion of the data must not be based on the cached data
+        jsonPodsData = queryPodsJsonData()
+        try:
+            cache.write(jsonPodsData)
+        except (IOError, OSError):
+            logger.warning('Cannot write pods cache file "%s"', cache.cacheFile)
+        return jsonPodsData
+    return cache.get(queryPodsJsonData)
+
+def getPods(cache = None, fresh = False):
+    jsonPodsData = getPodsJsonData(cache, fresh)
     pods = []
     for pod in jsonPodsData["items"]:
         logger.debug('query pod %s of status %s', pod["metadata"]["name"], pod["status"]["phase"])
         pods.append(pod["metadata"]["name"])
     return pods
 
-def getLivingPods():
-    jsonPodsData = getPodsJsonData()
+def getLivingPods(cache = None, fresh = False):
+    jsonPodsData = getPodsJsonData(cache, fresh)
 
     pods = []
     for pod in jsonPodsData["items"]:
@@ -130,6 +221,12 @@ if __name__ == "__main__":
         help = "what is time to log will be started to be shown from (relevant with '--query log')")
     parser.add_argument("--tailline", required = False, type = str, default = None,
         help = "how many lines to be printed from end of the log (relevant with '--query log')")
+    parser.add_argument("--cache", required = False, type = str, default = None,
+        help = "file of the pods list cache shared among processes (relevant with '--query pods' and '--query pods_living')")
+    parser.add_argument("--cachettl", required = False, type = int, default = 10,
+        help = "number of seconds the pods list cache is valid for (relevant with '--cache')")
+    parser.add_argument("--fresh", required = False, action = "store_true",
+        help = "query the api and refresh the pods list cache regardless of its age (relevant with '--cache')")
     parser.add_argument("-l", "--loglevel", default="CRITICAL", help="Log level",
         choices=["debug", "DEBUG", "info", "INFO", "warning", "WARNING", "error", "ERROR", "critical", "CRITICAL"])
     parser.add_argument("args", nargs = argparse.REMAINDER, help = "Arguments of the query (each query type has different)")
@@ -143,10 +240,12 @@ if __name__ == "__main__":
 
     logger.debug("Starting query openshift api with args: %s", args)
 
+    cache = None if args.cache is None else PodsCache(args.cache, args.cachettl)
+
     if args.query == QueryType.PODS:
-        queryResult = getPods()
+        queryResult = getPods(cache, args.fresh)
     elif args.query == QueryType.PODS_LIVING:
-        queryResult = getLivingPods()
+        queryResult = getLivingPods(cache, args.fresh)
     elif args.query == QueryType.LOG:
         if args.pod is None:
             logger.critical('query of type "--query log" requires one argument to be an existing pod name')
@@ -0,0 +1,363 @@
+#!/bin/python
+"""
+Copyright 2018 Red Hat, Inc.
+
+Red Hat licenses this file to you under the Apache License, version
+2.0 (the "License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+implied.  See the License for the specific language governing
+permissions and limitations under the License.
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import errno
+import fcntl
+import json
+import logging
+import os
+import select
+import socket
+import time
+
+from enum import Enum
+
+
+class CommandType(Enum):
+    """
+    Represents what could be done with the recovery markers.
+    ACQUIRE: create (or take over when expired) the recovery marker of an application pod directory
+    RENEW: refresh heartbeat of all recovery markers owned by a recovery pod
+    RELEASE: remove the recovery marker of an application pod directory
+    EXPIRE: remove recovery markers whose heartbeat expired, i.e. the recovery pod is dead,
+        and legacy markers of recovery pods which are not living
+    WAIT: block until there is no valid recovery marker for an application pod
+    """
+
+    ACQUIRE = 'acquire'
+    RENEW = 'renew'
+    RELEASE = 'release'
+    EXPIRE = 'expire'
+    WAIT = 'wait'
+
+    def __str__(self):
+        return self.value
+
+
+class RecoveryLease():
+    """
+    Recovery marker /pods/<applicationPodName>-RECOVERY-<recoveryPodName> holding
+    a lease of the recovery pod on the application pod directory. The marker contains
+    the owner and the heartbeat time of the lease. Markers without content are created
+    by 'touch' of the recovery pods not using leases yet, which do not renew them. Such
+    legacy markers never expire, they are removed when their recovery pod is not living.
+    All changes of the markers are done under the flock of the pods directory lock
+    file and the content is written atomically by renaming of a temporary file.
+    """
+
+    MARKER_SEPARATOR = '-RECOVERY-'
+    LOCK_FILE_NAME = '.recovery-lease.lock'
+
+    def __init__(self, podsDir, applicationPodName, owner):
+        self.podsDir = podsDir
+        self.applicationPodName = applicationPodName
+        self.owner = owner
+        self.path = os.path.join(podsDir, applicationPodName + RecoveryLease.MARKER_SEPARATOR + owner)
+
+    @staticmethod
+    def fromMarker(podsDir, markerName):
+        (applicationPodName, owner) = markerName.split(RecoveryLease.MARKER_SEPARATOR, 1)
+        return RecoveryLease(podsDir, applicationPodName, owner)
+
+    @staticmethod
+    def listMarkers(podsDir, applicationPodName = None):
+        prefix = '' if applicationPodName is None else applicationPodName + RecoveryLease.MARKER_SEPARATOR
+        return [RecoveryLease.fromMarker(podsDir, name) for name in os.listdir(podsDir)
+            if RecoveryLease.MARKER_SEPARATOR in name and name.startswith(prefix) and not name.startswith('.')]
+
+    def readHeartbeat(self):
+        """
+        Returns the heartbeat time of the lease, None if the marker does not exist.
+        """
+        try:
+            with open(self.path, 'r') as markerFile:
+                content = markerFile.read()
+            if content.strip():
+                return float(json.loads(content)['heartbeat'])
+            return os.stat(self.path).st_mtime
+        except (IOError, OSError) as e:
+            if e.errno == errno.ENOENT:
+                return None
+            raise
+        except (ValueError, KeyError):
+            logger.warning('Recovery marker "%s" has unknown content, using its modification time', self.path)
+            return os.stat(self.path).st_mtime
+
+    def isLegacy(self):
+        """
+        Returns True if the marker was created by 'touch' of a recovery pod not using leases.
+        """
+        try:
+            return os.stat(self.path).st_size == 0
+        except OSError as e:
+            if e.errno == errno.ENOENT:
+                return False
+            raise
+
+    def isExpired(self, ttl, now = None, livingPods = None):
+        """
+        Returns True if the heartbeat of the lease expired. A legacy marker is expired
+        only when the living pods are known and its recovery pod is not one of them.
+        """
+        if self.isLegacy():
+            return livingPods is not None and self.owner not in livingPods
+        heartbeat = self.readHeartbeat()
+        return heartbeat is not None and (now or time.time()) - heartbeat > ttl
+
+    def write(self):
+        tmpPath = os.path.join(self.podsDir, '.' + os.path.basename(self.path) + '.tmp')
+        with open(tmpPath, 'w') as tmpFile:
+            json.dump({'owner': self.owner, 'host': socket.gethostname(), 'heartbeat': time.time()}, tmpFile)
+            tmpFile.flush()
+            os.fsync(tmpFile.fileno())
+        os.rename(tmpPath, self.path)
+
+    def create(self):
+        """
+        Creates the marker exclusively, returns False if it already exists.
+        """
+        try:
+            os.close(os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o664))
+        except OSError as e:
+            if e.errno == errno.EEXIST:
+                return False
+            raise
+        self.write()
+        return True
+
+    def remove(self):
+        try:
+            os.unlink(self.path)
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                raise
+
+
+class PodsDirLock():
+    """
+    Exclusive flock of the pods directory used for all changes of the recovery markers.
+    """
+
+    def __init__(self, podsDir):
+        self.path = os.path.join(podsDir, RecoveryLease.LOCK_FILE_NAME)
+
+    def __enter__(self):
+        self.lockFile = open(self.path, 'a')
+        fcntl.flock(self.lockFile, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *args):
+        fcntl.flock(self.lockFile, fcntl.LOCK_UN)
+        self.lockFile.close()
+
+
+class DirectoryWatch():
+    """
+    Waits for a change in a directory using inotify. When inotify is not available
+    it's just a sleep. Inotify does not report changes done by other nodes of network
+    file systems thus the wait is always limited by the poll interval.
+    """
+
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_NONBLOCK = os.O_NONBLOCK
+
+    def __init__(self, directory):
+        self.fd = None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno = True)
+            fd = libc.inotify_init1(DirectoryWatch.IN_NONBLOCK)
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+            mask = (DirectoryWatch.IN_MODIFY | DirectoryWatch.IN_ATTRIB | DirectoryWatch.IN_CLOSE_WRITE | DirectoryWatch.IN_MOVED_FROM
+                | DirectoryWatch.IN_MOVED_TO | DirectoryWatch.IN_CREATE | DirectoryWatch.IN_DELETE)
+            if libc.inotify_add_watch(fd, directory.encode(), mask) < 0:
+                os.close(fd)
+                raise OSError(ctypes.get_errno(), 'inotify_add_watch failed')
+            self.fd = fd
+        except (OSError, AttributeError) as e:
+            logger.debug('inotify is not available for "%s", polling: %s', directory, e)
+
+    def waitForChange(self, timeout):
+        if self.fd is None:
+            time.sleep(timeout)
+            return
+        (readable, writable, exceptional) = select.select([self.fd], [], [], timeout)
+        if readable:
+            try:
+                while os.read(self.fd, 4096):
+                    pass
+            except OSError as e:
+                if e.errno != errno.EAGAIN:
+                    raise
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+
+
+def acquire(podsDir, applicationPodName, owner, ttl):
+    """
+    Takes the lease of the owner on the application pod, unless another owner holds
+    an unexpired lease on it. The expired leases of other owners are removed.
+    Returns the paths of the unexpired leases of other owners.
+    """
+    lease = RecoveryLease(podsDir, applicationPodName, owner)
+    with PodsDirLock(podsDir):
+        now = time.time()
+        held = []
+        for other in RecoveryLease.listMarkers(podsDir, applicationPodName):
+            if other.owner == owner or other.applicationPodName != applicationPodName:
+                continue
+            if other.isExpired(ttl, now):
+                logger.info('Recovery lease "%s" expired, taking over from recovery pod %s', other.path, other.owner)
+                other.remove()
+            elif other.readHeartbeat() is not None:
+                held.append(other.path)
+        if held:
+            logger.info('Recovery lease on "%s" is held by %s', applicationPodName, ', '.join(held))
+            return held
+        if not lease.create():
+            lease.write()
+    logger.debug('Acquired recovery lease "%s"', lease.path)
+    return []
+
+def renew(podsDir, owner, applicationPodNames, ttl):
+    """
+    Renews the leases of the owner for the application pod names, returning names
+    of those whose leases were lost, i.e. expired and removed. An expired lease is
+    never renewed, even if its marker was not removed yet, as the application pod
+    may have been started already.
+    """
+    lost = []
+    with PodsDirLock(podsDir):
+        now = time.time()
+        for applicationPodName in applicationPodNames:
+            lease = RecoveryLease(podsDir, applicationPodName, owner)
+            if lease.readHeartbeat() is None:
+                logger.warning('Recovery lease "%s" was lost', lease.path)
+                lost.append(applicationPodName)
+            elif lease.isExpired(ttl, now):
+                logger.warning('Recovery lease "%s" expired before it was renewed, removing it', lease.path)
+                lease.remove()
+                lost.append(applicationPodName)
+            else:
+                lease.write()
+    return lost
+
+def release(podsDir, applicationPodName, owner):
+    with PodsDirLock(podsDir):
+        RecoveryLease(podsDir, applicationPodName, owner).remove()
+    return []
+
+def expire(podsDir, ttl, livingPods = None):
+    """
+    Removes the expired recovery markers, returning the removed marker paths. The legacy
+    markers are removed only when the living pods are passed and their owner is not living.
+    """
+    expired = []
+    with PodsDirLock(podsDir):
+        now = time.time()
+        for lease in RecoveryLease.listMarkers(podsDir):
+            if lease.isExpired(ttl, now, livingPods):
+                logger.info('Recovery lease "%s" expired, recovery pod %s is considered dead', lease.path, lease.owner)
+                lease.remove()
+                expired.append(lease.path)
+    return expired
+
+def waitForRecovery(podsDir, applicationPodName, ttl, pollInterval, timeout):
+    """
+    Blocks until there is no valid recovery marker for the application pod.
+    Returns the markers still in place when the timeout elapsed.
+    """
+    watch = DirectoryWatch(podsDir)
+    deadline = None if timeout is None else time.time() + timeout
+    lastReport = 0
+    try:
+        while True:
+            now = time.time()
+            markers = [lease.path for lease in RecoveryLease.listMarkers(podsDir, applicationPodName)
+                if not lease.isExpired(ttl, now) and os.path.exists(lease.path)]
+            if not markers:
+                return []
+            if deadline is not None and now >= deadline:
+                return markers
+            if now - lastReport >= 10:
+                print("Waiting to start pod %s as recovery process '%s' is currently cleaning data directory." % (applicationPodName, ' '.join(markers)))
+                lastReport = now
+            watch.waitForChange(pollInterval if deadline is None else min(pollInterval, deadline - now))
+    finally:
+        watch.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Coordinates recovery of the partitioned server data directories through lease files (recovery markers)")
+    parser.add_argument("command", type = CommandType, choices=list(CommandType), help = "What to do with the recovery markers")
+    parser.add_argument("podsDir", help = "Directory with the application pod directories and the recovery markers")
+    parser.add_argument("--pod", required = False, type = str, default = None, help = "Application pod name, more could be passed for 'renew'", nargs = "*")
+    parser.add_argument("--owner", required = False, type = str, default = None, help = "Recovery pod name owning the lease")
+    parser.add_argument("--living", required = False, type = str, default = None, nargs = "*",
+        help = "Names of the living pods, legacy recovery markers of other recovery pods are expired (relevant with 'expire')")
+    parser.add_argument("--ttl", required = False, type = int, default = 120,
+        help = "Number of seconds after the last heartbeat when the lease expires")
+    parser.add_argument("--poll", required = False, type = float, default = 1,
+        help = "Maximal number of seconds between checks of the recovery markers (relevant with 'wait')")
+    parser.add_argument("--timeout", required = False, type = float, default = None,
+        help = "Number of seconds to wait, waiting forever if not defined (relevant with 'wait')")
+    parser.add_argument("-l", "--loglevel", default="CRITICAL", help="Log level",
+        choices=["debug", "DEBUG", "info", "INFO", "warning", "WARNING", "error", "ERROR", "critical", "CRITICAL"])
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level = args.loglevel.upper())
+    logger = logging.getLogger(__name__)
+
+    logger.debug("Starting recovery lease command with args: %s", args)
+
+    if args.command in [CommandType.ACQUIRE, CommandType.RENEW, CommandType.RELEASE] and (not args.pod or args.owner is None):
+        logger.critical('command "%s" requires --pod and --owner', args.command)
+        exit(1)
+    if args.command in [CommandType.ACQUIRE, CommandType.RELEASE, CommandType.WAIT] and len(args.pod or []) != 1:
+        logger.critical('command "%s" requires exactly one --pod', args.command)
+        exit(1)
+
+    if args.command == CommandType.ACQUIRE:
+        result = acquire(args.podsDir, args.pod[0], args.owner, args.ttl)
+    elif args.command == CommandType.RENEW:
+        result = renew(args.podsDir, args.owner, args.pod, args.ttl)
+    elif args.command == CommandType.RELEASE:
+        result = release(args.podsDir, args.pod[0], args.owner)
+    elif args.command == CommandType.EXPIRE:
+        result = expire(args.podsDir, args.ttl, args.living)
+    elif args.command == CommandType.WAIT:
+        result = waitForRecovery(args.podsDir, args.pod[0], args.ttl, args.poll, args.timeout)
+    else:
+        logger.critical('No handler for command %s', args.command)
+        exit(1)
+
+    for line in result:
+        print(line)
+
+    # non-empty result of 'wait' means a timeout, of 'renew' lost leases and of 'acquire' leases of other owners
+    exit(1 if result and args.command in [CommandType.WAIT, CommandType.RENEW, CommandType.ACQUIRE] else 0)
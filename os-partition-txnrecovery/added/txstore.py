@@ -0,0 +1,131 @@
+#!/bin/python
+"""
+Copyright 2018 Red Hat, Inc.
+
+Red Hat licenses this file to you under the Apache License, version
+2.0 (the "License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+implied.  See the License for the specific language governing
+permissions and limitations under the License.
+"""
+
+import argparse
+import logging
+import os
+
+from enum import Enum
+
+
+class ScanType(Enum):
+    """
+    Represents what could be scanned.
+    COUNT: number of transaction records in object store of one server data directory
+    ORDER: application pod directories of the pods directory in order they should be migrated
+    """
+
+    COUNT = 'count'
+    ORDER = 'order'
+
+    def __str__(self):
+        return self.value
+
+
+class ObjectStoreScan():
+    """
+    Scans the transaction object store of a server data directory only by walking
+    the directory hierarchy, i.e. without starting the server. Only the file system
+    based stores (ShadowNoFileLockStore, HashedActionStore...) are understood where
+    every transaction record is a file. Any other content of the object store
+    (e.g. journal store files) makes the result unknown.
+    """
+
+    OBJECT_STORE_DIR = 'tx-object-store'
+    FILE_STORES = ['ShadowNoFileLockStore', 'ShadowingStore', 'HashedActionStore', 'ActionStore']
+    UNKNOWN = -1
+
+    def __init__(self, serverDataDir):
+        self.objectStoreDir = os.path.join(serverDataDir, ObjectStoreScan.OBJECT_STORE_DIR)
+        self.recordCount = 0
+        self.oldestRecordTime = None
+        self.__scan()
+
+    def __scan(self):
+        if not os.path.isdir(self.objectStoreDir):
+            logger.debug('no object store at "%s"', self.objectStoreDir)
+            return
+
+        for storeName in os.listdir(self.objectStoreDir):
+            storeDir = os.path.join(self.objectStoreDir, storeName)
+            if storeName not in ObjectStoreScan.FILE_STORES or not os.path.isdir(storeDir):
+                logger.debug('object store "%s" contains unknown store "%s"', self.objectStoreDir, storeName)
+                self.recordCount = ObjectStoreScan.UNKNOWN
+                return
+            for dirPath, dirNames, fileNames in os.walk(storeDir):
+                for fileName in fileNames:
+                    recordTime = os.lstat(os.path.join(dirPath, fileName)).st_mtime
+                    if self.oldestRecordTime is None or recordTime < self.oldestRecordTime:
+                        self.oldestRecordTime = recordTime
+                    self.recordCount += 1
+        logger.debug('object store "%s" contains %s records', self.objectStoreDir, self.recordCount)
+
+    def isEmpty(self):
+        return self.recordCount == 0
+
+    def sortKey(self):
+        """
+        Empty stores first as those are reclaimed without starting the server,
+        then the stores with the most records, the oldest records going first.
+        Stores of unknown content go last.
+        """
+        if self.recordCount == ObjectStoreScan.UNKNOWN:
+            return (2, 0, 0)
+        if self.isEmpty():
+            return (0, 0, 0)
+        return (1, -self.recordCount, self.oldestRecordTime)
+
+
+def getRecordCount(serverDataDir):
+    return ObjectStoreScan(serverDataDir).recordCount
+
+def getMigrationOrder(podsDir):
+    scans = []
+    for applicationPodName in os.listdir(podsDir):
+        applicationPodDir = os.path.join(podsDir, applicationPodName)
+        if not os.path.isdir(applicationPodDir):
+            continue
+        scans.append((applicationPodName, ObjectStoreScan(os.path.join(applicationPodDir, 'serverData'))))
+    scans.sort(key = lambda scan: scan[1].sortKey())
+    return ['{} {}'.format(name, scan.recordCount) for name, scan in scans]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Scans the transaction object stores of the partitioned server data directories without starting the server")
+    parser.add_argument("-q", "--query", required = False, type = ScanType, default = ScanType.COUNT, choices=list(ScanType), help = "Scan type/what to scan\n"
+      + "either number of transaction records of a server data directory (-1 when unknown), or application pod directories of the pods directory"
+      + " with their record counts in the order they should be migrated")
+    parser.add_argument("-l", "--loglevel", default="CRITICAL", help="Log level",
+        choices=["debug", "DEBUG", "info", "INFO", "warning", "WARNING", "error", "ERROR", "critical", "CRITICAL"])
+    parser.add_argument("directory", help = "Server data directory for '--query count', pods directory for '--query order'")
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level = args.loglevel.upper())
+    logger = logging.getLogger(__name__)
+
+    logger.debug("Starting object store scan with args: %s", args)
+
+    if args.query == ScanType.COUNT:
+        print(getRecordCount(args.directory))
+    elif args.query == ScanType.ORDER:
+        for line in getMigrationOrder(args.directory):
+            print(line)
+    else:
+        logger.critical('No handler for scan type %s', args.query)
+        exit(1)
+
+    exit(0)
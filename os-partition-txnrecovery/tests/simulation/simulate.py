@@ -0,0 +1,370 @@
+#!/usr/bin/env python
+"""
+Copyright 2018 Red Hat, Inc.
+
+Red Hat licenses this file to you under the Apache License, version
+2.0 (the "License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+implied.  See the License for the specific language governing
+permissions and limitations under the License.
+
+Simulation of the partition/recovery controller (partitionPV.sh) without
+a cluster. A fake OpenShift API server stands in for the endpoints used by
+query.py, synthetic pods/ trees are generated and runServer/runMigration are
+stubbed with configurable durations and exit codes. Reported per directory
+count are the cycle time, API calls per cycle, python process spawns and
+time-to-reclaim of the orphaned directories of migratePV, followed by the time
+partitionPV needs to start the server once the recovery marker is removed.
+
+Usage: simulate.py --dirs 10 50 100 [--living 0.5] [--empty 0.8] ...
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import signal
+import stat
+import subprocess
+import tempfile
+import threading
+import time
+
+try:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+except ImportError:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+
+ADDED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'added')
+RECOVERY_POD_NAME = 'recovery-pod'
+NAMESPACE = 'simulation'
+
+DRIVER_SCRIPT = '''
+source "${SIM_SANDBOX}/partitionPV.sh"
+
+function init_data_dir() {
+  :
+}
+
+function runServer() {
+  echo "SIMULATION: server started for $1"
+  sleep "${SIM_SERVER_DURATION}"
+  return "${SIM_SERVER_STATUS}"
+}
+
+function runMigration() {
+  sleep "${SIM_MIGRATION_DURATION}"
+  return "${SIM_MIGRATION_STATUS}"
+}
+
+"${SIM_COMMAND}" "${SIM_PODS_DIR}" "${SIM_PAUSE}"
+'''
+
+PYTHON_COUNTER_SCRIPT = '''#!/bin/sh
+echo "$@" >> "%(spawnsFile)s"
+exec %(python)s "$@"
+'''
+
+
+class FakeApiServer(ThreadingMixIn, HTTPServer):
+    """
+    Serves the pods list and the pod log in the form returned by the OpenShift API
+    and counts the requests.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, livingPods, deadPods):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), FakeApiHandler)
+        self.livingPods = livingPods
+        self.deadPods = deadPods
+        self.resourceVersion = 1
+        self.counts = {'pods': 0, 'log': 0}
+        self.lock = threading.Lock()
+
+    def url(self):
+        return 'http://127.0.0.1:%s' % self.server_port
+
+    def count(self, kind):
+        with self.lock:
+            self.counts[kind] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.counts)
+
+
+class FakeApiHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path == '/api/v1/namespaces/%s/pods' % NAMESPACE:
+            self.server.count('pods')
+            items = [{'metadata': {'name': name}, 'status': {'phase': 'Running'}} for name in self.server.livingPods]
+            items += [{'metadata': {'name': name}, 'status': {'phase': 'Failed'}} for name in self.server.deadPods]
+            self.__respond(json.dumps({'metadata': {'resourceVersion': str(self.server.resourceVersion)}, 'items': items}))
+        elif path.startswith('/api/v1/namespaces/%s/pods/' % NAMESPACE) and path.endswith('/log'):
+            self.server.count('log')
+            self.__respond('2018-01-01T00:00:00.000000000Z simulated log line\n')
+        else:
+            self.send_error(404)
+
+    def __respond(self, body):
+        body = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Sandbox():
+    """
+    Temporary directory with copies of the partition scripts, where the python
+    interpreter of the scripts counts its spawns, the service account files and
+    the synthetic pods/ tree.
+    """
+
+    def __init__(self, python):
+        self.root = tempfile.mkdtemp(prefix = 'partition-simulation-')
+        self.scriptsDir = os.path.join(self.root, 'partition')
+        self.podsDir = os.path.join(self.root, 'pods')
+        self.serviceAccountDir = os.path.join(self.root, 'serviceaccount')
+        self.spawnsFile = os.path.join(self.root, 'python-spawns')
+        for directory in [self.scriptsDir, self.podsDir, self.serviceAccountDir]:
+            os.makedirs(directory)
+
+        pythonCounter = os.path.join(self.root, 'python-counter')
+        with open(pythonCounter, 'w') as counter:
+            counter.write(PYTHON_COUNTER_SCRIPT % {'spawnsFile': self.spawnsFile, 'python': python})
+        os.chmod(pythonCounter, stat.S_IRWXU)
+
+        for name in os.listdir(ADDED_DIR):
+            if name.endswith('.pyc') or not os.path.isfile(os.path.join(ADDED_DIR, name)):
+                continue
+            with open(os.path.join(ADDED_DIR, name)) as source:
+                content = source.read()
+            if content.startswith('#!') and 'python' in content.split('\n', 1)[0]:
+                content = '#!' + pythonCounter + '\n' + content.split('\n', 1)[1]
+            target = os.path.join(self.scriptsDir, name)
+            with open(target, 'w') as copy:
+                copy.write(content)
+            os.chmod(target, stat.S_IRWXU)
+
+        for (name, content) in [('token', 'simulation-token'), ('namespace', NAMESPACE)]:
+            with open(os.path.join(self.serviceAccountDir, name), 'w') as accountFile:
+                accountFile.write(content)
+
+    def createPodDir(self, podName, records):
+        storeDir = os.path.join(self.podsDir, podName, 'serverData', 'tx-object-store', 'ShadowNoFileLockStore',
+            'defaultStore', 'StateManager', 'BasicAction', 'TwoPhaseCoordinator', 'AtomicAction')
+        os.makedirs(storeDir)
+        for record in range(records):
+            with open(os.path.join(storeDir, '0_ffff0a000001_%s_%s' % (podName, record)), 'w') as recordFile:
+                recordFile.write('#')
+
+    def pythonSpawns(self):
+        if not os.path.exists(self.spawnsFile):
+            return 0
+        with open(self.spawnsFile) as spawns:
+            return len(spawns.readlines())
+
+    def cleanup(self):
+        shutil.rmtree(self.root, ignore_errors = True)
+
+
+class ReclaimWatch(threading.Thread):
+    """
+    Records when the orphaned directories disappear from the pods directory.
+    """
+
+    def __init__(self, podsDir, podNames, startTime):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.podsDir = podsDir
+        self.pending = set(podNames)
+        self.startTime = startTime
+        self.reclaimTimes = {}
+        self.stopped = False
+
+    def scan(self):
+        for podName in list(self.pending):
+            if not os.path.exists(os.path.join(self.podsDir, podName)):
+                self.reclaimTimes[podName] = time.time() - self.startTime
+                self.pending.discard(podName)
+
+    def run(self):
+        while self.pending and not self.stopped:
+            self.scan()
+            time.sleep(0.05)
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def formatSeconds(value):
+    return '-' if value is None else '%.2f' % value
+
+def simulateMigration(args, dirCount):
+    sandbox = Sandbox(args.python)
+    livingCount = int(round(dirCount * args.living))
+    emptyCount = int(round((dirCount - livingCount) * args.empty))
+    livingPods = ['app-%s' % index for index in range(livingCount)]
+    orphanedPods = ['app-%s' % index for index in range(livingCount, dirCount)]
+    for index, podName in enumerate(livingPods + orphanedPods):
+        sandbox.createPodDir(podName, 0 if podName in livingPods or index - livingCount < emptyCount else args.records)
+    api = FakeApiServer(livingPods + [RECOVERY_POD_NAME], orphanedPods)
+    threading.Thread(target = api.serve_forever).start()
+
+    env = dict(os.environ)
+    env.update({
+        'SIM_SANDBOX': sandbox.scriptsDir,
+        'SIM_PODS_DIR': sandbox.podsDir,
+        'SIM_COMMAND': 'migratePV',
+        'SIM_PAUSE': str(args.pause),
+        'SIM_SERVER_DURATION': str(args.server_duration),
+        'SIM_SERVER_STATUS': str(args.server_status),
+        'SIM_MIGRATION_DURATION': str(args.migration_duration),
+        'SIM_MIGRATION_STATUS': str(args.migration_status),
+        'POD_NAME': RECOVERY_POD_NAME,
+        'OPENSHIFT_API_URL': api.url(),
+        'OPENSHIFT_SERVICE_ACCOUNT_DIR': sandbox.serviceAccountDir,
+    })
+    if args.pool_size:
+        env['MIGRATION_POOL_SIZE'] = str(args.pool_size)
+    if args.cache_ttl:
+        env['LIVING_PODS_CACHE_TTL'] = str(args.cache_ttl)
+
+    startTime = time.time()
+    watch = ReclaimWatch(sandbox.podsDir, orphanedPods, startTime)
+    watch.start()
+    driver = subprocess.Popen(['bash', '-c', DRIVER_SCRIPT], env = env, stdout = subprocess.PIPE, stderr = subprocess.STDOUT,
+        preexec_fn = os.setsid, universal_newlines = True)
+
+    cycles = []
+    cycleStart = startTime
+    countsStart = api.snapshot()
+    spawnsStart = 0
+    try:
+        for line in iter(driver.stdout.readline, ''):
+            logger.debug('driver: %s', line.rstrip())
+            if 'Finished Migration Check cycle' in line:
+                now = time.time()
+                counts = api.snapshot()
+                spawns = sandbox.pythonSpawns()
+                cycles.append({
+                    'time': now - cycleStart,
+                    'pods': counts['pods'] - countsStart['pods'],
+                    'log': counts['log'] - countsStart['log'],
+                    'spawns': spawns - spawnsStart
+                })
+                (cycleStart, countsStart, spawnsStart) = (now, counts, spawns)
+                if len(cycles) >= args.cycles:
+                    break
+    finally:
+        os.killpg(driver.pid, signal.SIGKILL)
+        driver.wait()
+        watch.stopped = True
+        watch.join()
+        # the directories reclaimed by the last cycle may not be seen by the watch yet
+        watch.scan()
+        api.shutdown()
+        api.server_close()
+        if not args.keep:
+            sandbox.cleanup()
+
+    reclaimTimes = list(watch.reclaimTimes.values())
+    first = cycles[0] if cycles else {'time': None, 'pods': None, 'log': None, 'spawns': None}
+    return [dirCount, len(orphanedPods), formatSeconds(first['time']), first['pods'], first['log'], first['spawns'],
+        '%s/%s' % (len(reclaimTimes), len(orphanedPods)), formatSeconds(percentile(reclaimTimes, 0.5)),
+        formatSeconds(percentile(reclaimTimes, 1))]
+
+def simulatePartition(args):
+    sandbox = Sandbox(args.python)
+    podName = 'app-0'
+    marker = os.path.join(sandbox.podsDir, podName + '-RECOVERY-' + RECOVERY_POD_NAME)
+    open(marker, 'w').close()
+
+    env = dict(os.environ)
+    env.update({
+        'SIM_SANDBOX': sandbox.scriptsDir,
+        'SIM_PODS_DIR': sandbox.podsDir,
+        'SIM_COMMAND': 'partitionPV',
+        'SIM_SERVER_DURATION': str(args.server_duration),
+        'SIM_SERVER_STATUS': str(args.server_status),
+        'POD_NAME': podName,
+    })
+    driver = subprocess.Popen(['bash', '-c', DRIVER_SCRIPT], env = env, stdout = subprocess.PIPE, stderr = subprocess.STDOUT,
+        preexec_fn = os.setsid, universal_newlines = True)
+
+    def removeMarker():
+        time.sleep(args.marker_duration)
+        removed[0] = time.time()
+        os.remove(marker)
+    removed = [None]
+    threading.Thread(target = removeMarker).start()
+
+    startDelay = None
+    spawns = None
+    try:
+        for line in iter(driver.stdout.readline, ''):
+            logger.debug('driver: %s', line.rstrip())
+            if 'SIMULATION: server started' in line:
+                startDelay = time.time() - removed[0]
+                break
+    finally:
+        os.killpg(driver.pid, signal.SIGKILL)
+        driver.wait()
+        spawns = sandbox.pythonSpawns()
+        if not args.keep:
+            sandbox.cleanup()
+    return (startDelay, spawns)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Simulates migratePV of partitionPV.sh against a fake OpenShift API and synthetic pods/ trees")
+    parser.add_argument("--dirs", type = int, nargs = "+", default = [10, 50, 100], help = "Numbers of application pod directories to simulate with")
+    parser.add_argument("--living", type = float, default = 0.5, help = "Fraction of the directories owned by living pods")
+    parser.add_argument("--empty", type = float, default = 0.8, help = "Fraction of the orphaned directories with empty transaction object store")
+    parser.add_argument("--records", type = int, default = 3, help = "Number of transaction records in non empty object stores")
+    parser.add_argument("--cycles", type = int, default = 1, help = "Number of migration cycles to run")
+    parser.add_argument("--pause", type = int, default = 1, help = "Pause between migration cycles (MIGRATION_PAUSE)")
+    parser.add_argument("--pool-size", type = int, default = None, help = "MIGRATION_POOL_SIZE to run with")
+    parser.add_argument("--cache-ttl", type = int, default = None, help = "LIVING_PODS_CACHE_TTL to run with")
+    parser.add_argument("--server-duration", type = float, default = 1, help = "Seconds the stubbed runServer runs")
+    parser.add_argument("--server-status", type = int, default = 0, help = "Exit code of the stubbed runServer")
+    parser.add_argument("--migration-duration", type = float, default = 1, help = "Seconds the stubbed runMigration runs")
+    parser.add_argument("--migration-status", type = int, default = 0, help = "Exit code of the stubbed runMigration")
+    parser.add_argument("--marker-duration", type = float, default = 2, help = "Seconds the recovery marker blocks partitionPV from starting the server")
+    parser.add_argument("--python", default = "python", help = "Python interpreter running the partition python scripts")
+    parser.add_argument("--keep", action = "store_true", help = "Keep the sandbox directories")
+    parser.add_argument("-l", "--loglevel", default = "WARNING", choices = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"], help = "Log level")
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level = args.loglevel.upper())
+    logger = logging.getLogger(__name__)
+
+    header = ['dirs', 'orphaned', 'cycle[s]', 'api pods', 'api logs', 'py spawns', 'reclaimed', 'reclaim p50[s]', 'reclaim max[s]']
+    rows = [simulateMigration(args, dirCount) for dirCount in args.dirs]
+    widths = [max(len(str(row[column])) for row in [header] + rows) for column in range(len(header))]
+    for row in [header] + rows:
+        print('  '.join(str(value).rjust(width) for value, width in zip(row, widths)))
+
+    (startDelay, spawns) = simulatePartition(args)
+    print('')
+    print('partitionPV server start after marker removal: %ss (%s python spawns)' % (formatSeconds(startDelay), spawns))
@@ -25,5 +25,5 @@ function add_cache_container() {
     cache_container=$(cat "${KEYCLOAK_LEGACY_CACHE_CONTAINER_FILE}" | sed ':a;N;$!ba;s|\n|\\n|g')
   fi
 
-  sed -i "s|<!-- ##KEYCLOAK_CACHE_CONTAINER## -->|${cache_container}|" "${CONFIG_FILE}"
+  sed_config "s|<!-- ##KEYCLOAK_CACHE_CONTAINER## -->|${cache_container}|" "${CONFIG_FILE}"
 }
@@ -2,6 +2,7 @@
 # Openshift EAP launch script
 
 source $JBOSS_HOME/bin/launch/logging.sh
+source $JBOSS_HOME/bin/launch/config-render.sh
 
 if [ "${SCRIPT_DEBUG}" = "true" ] ; then
     set -x
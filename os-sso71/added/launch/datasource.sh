@@ -68,7 +68,7 @@ function refresh_interval() {
 function inject_default_job_repositories() {
   defaultjobrepo="     <default-job-repository name=\"in-memory\"/>"
 
-  sed -i "s|<!-- ##DEFAULT_JOB_REPOSITORY## -->|${defaultjobrepo%$'\n'}|g" $CONFIG_FILE
+  sed_config "s|<!-- ##DEFAULT_JOB_REPOSITORY## -->|${defaultjobrepo%$'\n'}|g" $CONFIG_FILE
 }
 
 # Arguments:
@@ -76,7 +76,7 @@ function inject_default_job_repositories() {
 function inject_default_job_repository() {
   defaultjobrepo="     <default-job-repository name=\"${1}\"/>"
 
-  sed -i "s|<!-- ##DEFAULT_JOB_REPOSITORY## -->|${defaultjobrepo%$'\n'}|" $CONFIG_FILE
+  sed_config "s|<!-- ##DEFAULT_JOB_REPOSITORY## -->|${defaultjobrepo%$'\n'}|" $CONFIG_FILE
 }
 
 function inject_job_repository() {
@@ -85,5 +85,5 @@ function inject_job_repository() {
     </job-repository>\
     <!-- ##JOB_REPOSITORY## -->"
 
-  sed -i "s|<!-- ##JOB_REPOSITORY## -->|${jobrepo%$'\n'}|" $CONFIG_FILE
+  sed_config "s|<!-- ##JOB_REPOSITORY## -->|${jobrepo%$'\n'}|" $CONFIG_FILE
 }